@@ -0,0 +1,65 @@
+"""Measure a JSON-lines round trip of a generated repository.
+
+Writes generated packages to a JSON-lines file, uncompressed and with each
+supported compression, then reads it back into a repository.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/bench_json_lines.py [-n COUNT] [--lazy]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from bench_package_loading \
+    import \
+        generate_package_strings
+from depsolver.json_lines \
+    import \
+        _import_lzma, read_repository, write_repository
+from depsolver.repository \
+    import \
+        Repository
+
+COMPRESSIONS = [(None, ".jsonl"), ("gzip", ".jsonl.gz")]
+try:
+    _import_lzma()
+    COMPRESSIONS.append(("lzma", ".jsonl.xz"))
+except ImportError:
+    pass
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("-n", "--count", type=int, default=1000000,
+                   help="Number of packages in the repository")
+    p.add_argument("--lazy", action="store_true",
+                   help="Parse dependencies and provides lazily when reading")
+    namespace = p.parse_args(argv)
+
+    repository = Repository.from_package_strings(generate_package_strings(namespace.count))
+
+    prefix = tempfile.mkdtemp()
+    try:
+        print("%d packages" % namespace.count)
+        for compression, extension in COMPRESSIONS:
+            path = os.path.join(prefix, "index" + extension)
+
+            start = time.time()
+            write_repository(repository, path)
+            write_elapsed = time.time() - start
+
+            start = time.time()
+            read = read_repository(path, lazy=namespace.lazy)
+            read_elapsed = time.time() - start
+            assert len(read.list_packages()) == namespace.count
+
+            print("%-5s write %.3fs, read %.3fs (%.0f packages/s), %.1f MB"
+                  % (compression or "none", write_elapsed, read_elapsed,
+                     namespace.count / read_elapsed, os.path.getsize(path) / 1e6))
+    finally:
+        shutil.rmtree(prefix)
+
+if __name__ == "__main__":
+    main()
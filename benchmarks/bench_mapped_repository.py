@@ -0,0 +1,83 @@
+"""Measure opening and querying a memory-mapped repository file.
+
+Writes generated packages to a temporary repository file, then times opening
+it, and the memory used by decoding a given number of packages.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/bench_mapped_repository.py [-n COUNT] [-t TOUCHED]
+"""
+import argparse
+import gc
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from bench_package_loading \
+    import \
+        VERSIONS_PER_NAME, generate_package_strings
+from depsolver.mapped_repository \
+    import \
+        MappedRepository, write_repository
+from depsolver.repository \
+    import \
+        Repository
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("-n", "--count", type=int, default=1000000,
+                   help="Number of packages in the repository file")
+    p.add_argument("-t", "--touched", type=int, default=1000,
+                   help="Number of package names to look up")
+    namespace = p.parse_args(argv)
+
+    prefix = tempfile.mkdtemp()
+    try:
+        path = os.path.join(prefix, "repository.bin")
+        repository = Repository.from_package_strings(generate_package_strings(namespace.count),
+                                                     lazy=True)
+        start = time.time()
+        write_repository(repository, path)
+        print("%d packages written in %.3fs (%.1f MB)"
+              % (namespace.count, time.time() - start, os.path.getsize(path) / 1e6))
+        del repository
+        gc.collect()
+
+        n_names = max(namespace.count // VERSIONS_PER_NAME, 1)
+        names = ["pkg%d" % i
+                 for i in range(0, n_names, max(n_names // namespace.touched, 1))]
+
+        # Time without tracing, then measure memory in a second, traced, run
+        start = time.time()
+        mapped = MappedRepository(path)
+        open_elapsed = time.time() - start
+        start = time.time()
+        n_packages = sum(len(mapped.find_packages(name)) for name in names)
+        find_elapsed = time.time() - start
+        mapped.close()
+        del mapped
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            mapped = MappedRepository(path)
+            open_size = tracemalloc.get_traced_memory()[0]
+            for name in names:
+                mapped.find_packages(name)
+            gc.collect()
+            find_size = tracemalloc.get_traced_memory()[0]
+            mapped.close()
+        finally:
+            tracemalloc.stop()
+
+        print("open: %.1f ms, %.1f kB" % (1e3 * open_elapsed, open_size / 1e3))
+        print("find_packages for %d names (%d packages): %.3fs (%.1f us/package), %.1f MB"
+              % (len(names), n_packages, find_elapsed, 1e6 * find_elapsed / n_packages,
+                 find_size / 1e6))
+    finally:
+        shutil.rmtree(prefix)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Measure the memory used by the core value types.
+
+Generates a pool of packages, each with a few dependencies, and reports the
+memory allocated per object, as traced by tracemalloc.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/bench_memory.py [-n COUNT]
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+
+from depsolver.package \
+    import \
+        Package
+from depsolver.pool \
+    import \
+        Pool
+from depsolver.repository \
+    import \
+        Repository
+from depsolver.requirement \
+    import \
+        Requirement
+from depsolver.solver.rule \
+    import \
+        PackageLiteral, PackageRule
+from depsolver.version \
+    import \
+        Version
+
+VERSIONS_PER_NAME = 10
+
+def generate_packages(count, seed=0):
+    rng = random.Random(seed)
+    n_names = max(count // VERSIONS_PER_NAME, 1)
+    packages = []
+    for i in range(count):
+        name = "pkg%d" % (i // VERSIONS_PER_NAME)
+        version = Version(1, i % VERSIONS_PER_NAME, rng.randint(0, 5))
+        dependencies = []
+        for j in range(rng.randint(0, 3)):
+            dependency_name = "pkg%d" % rng.randrange(n_names)
+            dependencies.append(Requirement.from_string("%s >= 1.%d.0"
+                                                        % (dependency_name, rng.randint(0, 5))))
+        packages.append(Package(name, version, dependencies=dependencies))
+    return packages
+
+def _traced(func, *args):
+    # Return (result, bytes allocated by func and still alive)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("-n", "--count", type=int, default=1000000,
+                   help="Number of packages in the pool")
+    namespace = p.parse_args(argv)
+    count = namespace.count
+
+    versions, size = _traced(lambda: [Version(i, 2, 3) for i in range(count)])
+    print("Version:        %6.1f bytes/object" % (size / float(count)))
+    del versions
+
+    packages, size = _traced(generate_packages, count)
+    print("Package:        %6.1f bytes/package (including versions and requirements)"
+          % (size / float(count)))
+
+    pool, size = _traced(lambda: Pool([Repository(packages)]))
+    print("Pool:           %6.1f bytes/package (indexes only)" % (size / float(count)))
+
+    literals, size = _traced(lambda: [PackageLiteral.from_package(package, pool)
+                                      for package in packages])
+    print("PackageLiteral: %6.1f bytes/object" % (size / float(count)))
+
+    rules, size = _traced(lambda: [PackageRule(literals[i:i+2], pool)
+                                   for i in range(0, count - 1, 2)])
+    print("PackageRule:    %6.1f bytes/object" % (size / float(len(rules))))
+
+if __name__ == "__main__":
+    main()
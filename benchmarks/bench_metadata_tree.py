@@ -0,0 +1,58 @@
+"""Measure the throughput of load_metadata_tree, in files per second.
+
+Writes one metadata file per generated package in a temporary directory
+tree, and loads it with 1 up to the given number of worker processes.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/bench_metadata_tree.py [-n COUNT] [-p PROCESSES]
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+from bench_package_loading \
+    import \
+        generate_package_strings
+from depsolver.loader \
+    import \
+        load_metadata_tree
+
+FILES_PER_DIRECTORY = 1000
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("-n", "--count", type=int, default=50000,
+                   help="Number of metadata files")
+    p.add_argument("-p", "--processes", type=int, default=multiprocessing.cpu_count(),
+                   help="Maximum number of worker processes")
+    p.add_argument("-t", "--threads", type=int, default=None,
+                   help="Number of reading threads")
+    p.add_argument("--lazy", action="store_true",
+                   help="Parse dependencies and provides lazily")
+    namespace = p.parse_args(argv)
+
+    prefix = tempfile.mkdtemp()
+    try:
+        for i, package_string in enumerate(generate_package_strings(namespace.count)):
+            directory = os.path.join(prefix, "%04d" % (i // FILES_PER_DIRECTORY))
+            if i % FILES_PER_DIRECTORY == 0:
+                os.makedirs(directory)
+            with open(os.path.join(directory, "%d.txt" % i), "w") as fp:
+                fp.write(package_string + "\n")
+
+        print("%d metadata files" % namespace.count)
+        for processes in range(1, namespace.processes + 1):
+            repository, stats = load_metadata_tree(prefix, lazy=namespace.lazy,
+                                                   threads=namespace.threads,
+                                                   processes=processes,
+                                                   min_parallel_files=0)
+            print("%2d process(es): %.3fs (%.0f files/s)"
+                  % (processes, stats.elapsed, stats.files_per_second))
+    finally:
+        shutil.rmtree(prefix)
+
+if __name__ == "__main__":
+    main()
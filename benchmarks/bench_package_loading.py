@@ -0,0 +1,75 @@
+"""Compare eager and lazy loading of a package index.
+
+Builds a repository from the same generated package strings once with eager
+parsing, and once with lazy parsing of dependencies and provides.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/bench_package_loading.py [-n COUNT]
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from depsolver.repository \
+    import \
+        Repository
+
+VERSIONS_PER_NAME = 10
+
+def generate_package_strings(count, seed=0):
+    rng = random.Random(seed)
+    n_names = max(count // VERSIONS_PER_NAME, 1)
+    package_strings = []
+    for i in range(count):
+        package_string = "pkg%d-1.%d.%d" % (i // VERSIONS_PER_NAME, i % VERSIONS_PER_NAME,
+                                           rng.randint(0, 5))
+        n_dependencies = rng.randint(0, 4)
+        if n_dependencies > 0:
+            dependencies = ["pkg%d >= 1.%d.0" % (rng.randrange(n_names), rng.randint(0, 5))
+                            for j in range(n_dependencies)]
+            package_string += "; depends (%s)" % ", ".join(dependencies)
+        if rng.random() < 0.05:
+            package_string += "; provides (virtual%d)" % rng.randrange(100)
+        package_strings.append(package_string)
+    return package_strings
+
+def _load(package_strings, lazy):
+    # Time without tracing, then measure memory in a second, traced, run
+    gc.collect()
+    start = time.time()
+    repository = Repository.from_package_strings(package_strings, lazy=lazy)
+    elapsed = time.time() - start
+    del repository
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        # The repository is kept alive until its memory is measured
+        repository = Repository.from_package_strings(package_strings, lazy=lazy)
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+        del repository
+    finally:
+        tracemalloc.stop()
+    return elapsed, size
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("-n", "--count", type=int, default=1000000,
+                   help="Number of package strings to load")
+    namespace = p.parse_args(argv)
+
+    package_strings = generate_package_strings(namespace.count)
+
+    print("%d package strings" % namespace.count)
+    for lazy in (False, True):
+        elapsed, size = _load(package_strings, lazy)
+        print("%-5s %.3fs (%.1f us/package), %.1f MB"
+              % ("lazy" if lazy else "eager", elapsed, 1e6 * elapsed / namespace.count,
+                 size / 1e6))
+
+if __name__ == "__main__":
+    main()
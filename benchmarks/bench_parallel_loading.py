@@ -0,0 +1,53 @@
+"""Measure the throughput of load_repository for a varying number of processes.
+
+Writes generated package strings to a temporary index file, and loads it
+with 1 up to the given number of worker processes.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/bench_parallel_loading.py [-n COUNT] [-p PROCESSES]
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+from bench_package_loading \
+    import \
+        generate_package_strings
+from depsolver.loader \
+    import \
+        load_repository
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("-n", "--count", type=int, default=1000000,
+                   help="Number of package strings to load")
+    p.add_argument("-p", "--processes", type=int, default=multiprocessing.cpu_count(),
+                   help="Maximum number of worker processes")
+    p.add_argument("--lazy", action="store_true",
+                   help="Parse dependencies and provides lazily")
+    namespace = p.parse_args(argv)
+
+    prefix = tempfile.mkdtemp()
+    try:
+        path = os.path.join(prefix, "index.txt")
+        with open(path, "w") as fp:
+            for package_string in generate_package_strings(namespace.count):
+                fp.write(package_string + "\n")
+
+        print("%d package strings" % namespace.count)
+        for processes in range(1, namespace.processes + 1):
+            start = time.time()
+            load_repository(path, lazy=namespace.lazy, processes=processes,
+                            min_parallel_lines=0)
+            elapsed = time.time() - start
+            print("%2d process(es): %.3fs (%.0f packages/s)"
+                  % (processes, elapsed, namespace.count / elapsed))
+    finally:
+        shutil.rmtree(prefix)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Compare refreshing a pool with rebuilding it after a small change.
+
+Builds a pool from a generated repository, adds a few packages to the
+repository, and times Pool.refresh against building a new pool.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/bench_pool_refresh.py [-n COUNT] [-d DELTA]
+"""
+import argparse
+import time
+
+from bench_package_loading \
+    import \
+        generate_package_strings
+from depsolver.package \
+    import \
+        Package
+from depsolver.pool \
+    import \
+        Pool
+from depsolver.repository \
+    import \
+        Repository
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("-n", "--count", type=int, default=1000000,
+                   help="Number of packages in the repository")
+    p.add_argument("-d", "--delta", type=int, default=10,
+                   help="Number of packages added before refreshing")
+    namespace = p.parse_args(argv)
+
+    repository = Repository.from_package_strings(generate_package_strings(namespace.count))
+    pool = Pool([repository])
+
+    repository.add_packages(Package.from_string("new%d-1.0.0; depends (pkg0)" % i)
+                            for i in range(namespace.delta))
+
+    start = time.time()
+    n_changes = pool.refresh()
+    refresh_elapsed = time.time() - start
+
+    start = time.time()
+    Pool([repository])
+    rebuild_elapsed = time.time() - start
+
+    print("%d packages, %d changes: refresh %.3f ms, rebuild %.3f s"
+          % (namespace.count, n_changes, 1e3 * refresh_elapsed, rebuild_elapsed))
+
+if __name__ == "__main__":
+    main()
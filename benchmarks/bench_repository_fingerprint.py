@@ -0,0 +1,54 @@
+"""Measure repository fingerprints and snapshot diffs.
+
+Times the first fingerprint of a generated repository, the fingerprint
+after a few changes, and the diff between the snapshots before and after.
+Given several repository sizes, the diff time should not grow with the size.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/bench_repository_fingerprint.py [-n COUNT ...] [-d DELTA]
+"""
+import argparse
+import time
+
+from bench_package_loading \
+    import \
+        generate_package_strings
+from depsolver.package \
+    import \
+        Package
+from depsolver.repository \
+    import \
+        Repository
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("-n", "--count", type=int, nargs="+", default=[1000000],
+                   help="Numbers of packages in the repository")
+    p.add_argument("-d", "--delta", type=int, default=10,
+                   help="Number of packages added between snapshots")
+    namespace = p.parse_args(argv)
+
+    for count in namespace.count:
+        bench(count, namespace.delta)
+
+def bench(count, delta):
+    repository = Repository.from_package_strings(generate_package_strings(count), lazy=True)
+
+    start = time.time()
+    old = repository.snapshot()
+    print("%d packages: first fingerprint %.3fs" % (count, time.time() - start))
+
+    repository.add_packages(Package.from_string("new%d-1.0.0; depends (pkg0)" % i)
+                            for i in range(delta))
+    start = time.time()
+    new = repository.snapshot()
+    print("%d changes: fingerprint %.3f ms" % (delta, 1e3 * (time.time() - start)))
+
+    start = time.time()
+    diff = old.diff(new)
+    print("diff: %d added, %d removed in %.3f ms"
+          % (len(diff.added), len(diff.removed), 1e3 * (time.time() - start)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Measure the cost of Repository lookups by name and version.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/bench_repository_lookup.py [-n COUNT]
+"""
+import argparse
+import random
+import timeit
+
+from depsolver.package \
+    import \
+        Package
+from depsolver.repository \
+    import \
+        Repository
+from depsolver.version \
+    import \
+        Version
+
+VERSIONS_PER_NAME = 10
+
+def generate_packages(count):
+    return [Package("pkg%d" % (i // VERSIONS_PER_NAME), Version(1, i % VERSIONS_PER_NAME, 0))
+            for i in range(count)]
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("-n", "--count", type=int, default=100000,
+                   help="Number of packages in the repository")
+    p.add_argument("-l", "--lookups", type=int, default=100000,
+                   help="Number of lookups per measure")
+    namespace = p.parse_args(argv)
+
+    packages = generate_packages(namespace.count)
+    repository = Repository(packages)
+
+    rng = random.Random(0)
+    probes = [rng.choice(packages) for i in range(namespace.lookups)]
+    probe_strings = [(package.name, str(package.version)) for package in probes]
+    probe_versions = [(package.name, package.version) for package in probes]
+
+    def find_package_string():
+        find_package = repository.find_package
+        for name, version in probe_strings:
+            find_package(name, version)
+
+    def find_package_version():
+        find_package = repository.find_package
+        for name, version in probe_versions:
+            find_package(name, version)
+
+    def has_package():
+        has_package = repository.has_package
+        for package in probes:
+            has_package(package)
+
+    print("%d packages, %d lookups" % (namespace.count, namespace.lookups))
+    for label, func in (("find_package(name, str)", find_package_string),
+                        ("find_package(name, Version)", find_package_version),
+                        ("has_package(package)", has_package)):
+        elapsed = min(timeit.repeat(func, number=1, repeat=5))
+        print("%-28s %.0f ns/lookup" % (label, 1e9 * elapsed / namespace.lookups))
+
+if __name__ == "__main__":
+    main()
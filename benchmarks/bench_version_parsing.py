@@ -0,0 +1,68 @@
+"""Compare scalar and batch version parsing.
+
+Parses the same generated list of version strings once through
+Version.from_string, and once through parse_versions.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/bench_version_parsing.py [-n COUNT] [-d DISTINCT]
+"""
+import argparse
+import random
+import time
+
+from depsolver.errors \
+    import \
+        InvalidVersion
+from depsolver.version \
+    import \
+        Version, clear_version_cache, parse_versions
+
+def generate_version_strings(count, distinct, seed=0):
+    rng = random.Random(seed)
+    pool = []
+    for i in range(distinct):
+        s = "%d.%d.%d" % (rng.randint(0, 20), rng.randint(0, 30), rng.randint(0, 50))
+        if rng.random() < 0.1:
+            s += "-rc%d" % rng.randint(1, 5)
+        pool.append(s)
+    return [rng.choice(pool) for i in range(count)]
+
+def scalar_parse(version_strings):
+    versions = []
+    errors = []
+    for i, version_string in enumerate(version_strings):
+        try:
+            versions.append(Version.from_string(version_string))
+        except InvalidVersion:
+            errors.append((i, version_string))
+    return versions, errors
+
+def _timeit(func, *args):
+    clear_version_cache()
+    start = time.time()
+    func(*args)
+    return time.time() - start
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("-n", "--count", type=int, default=1000000,
+                   help="Number of version strings to parse")
+    p.add_argument("-d", "--distinct", type=int, default=5000,
+                   help="Number of distinct version strings")
+    namespace = p.parse_args(argv)
+
+    version_strings = generate_version_strings(namespace.count, namespace.distinct)
+
+    scalar = _timeit(scalar_parse, version_strings)
+    batch = _timeit(parse_versions, version_strings)
+
+    print("%d strings (%d distinct)" % (namespace.count, namespace.distinct))
+    print("scalar Version.from_string: %.3fs (%.0f ns/string)"
+          % (scalar, 1e9 * scalar / namespace.count))
+    print("batch parse_versions:       %.3fs (%.0f ns/string)"
+          % (batch, 1e9 * batch / namespace.count))
+    print("speedup: %.1fx" % (scalar / batch))
+
+if __name__ == "__main__":
+    main()
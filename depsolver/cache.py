@@ -0,0 +1,79 @@
+"""Small bounded caches used to intern frequently parsed objects."""
+import collections
+
+#: Snapshot of a cache statistics, as returned by LRUCache.info
+CacheInfo = collections.namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+class LRUCache(object):
+    """A bounded mapping which discards the least recently used entries first.
+
+    Lookups through get are counted as hits or misses, so that the cache can
+    be sized from real workloads.
+
+    Parameters
+    ----------
+    maxsize: int
+        Maximum number of entries kept in the cache
+    """
+    def __init__(self, maxsize):
+        if maxsize < 1:
+            raise ValueError("Invalid cache size %r" % (maxsize,))
+        self._maxsize = maxsize
+        self._data = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        """Return the value for key, and mark it as the most recently used
+        entry. Returns default if key is not in the cache."""
+        data = self._data
+        try:
+            value = data.pop(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        data[key] = value
+        self.hits += 1
+        return value
+
+    def peek(self, key, default=None):
+        """Like get, but neither updates the statistics nor the entries
+        ordering."""
+        return self._data.get(key, default)
+
+    def put(self, key, value):
+        """Insert the given value, evicting the least recently used entry if
+        the cache is full."""
+        data = self._data
+        if key in data:
+            del data[key]
+        elif len(data) >= self._maxsize:
+            data.popitem(last=False)
+        data[key] = value
+
+    def resize(self, maxsize):
+        """Change the maximum number of entries, evicting entries as needed."""
+        if maxsize < 1:
+            raise ValueError("Invalid cache size %r" % (maxsize,))
+        self._maxsize = maxsize
+        while len(self._data) > maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        """Remove every entry and reset the statistics."""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self._maxsize, len(self._data))
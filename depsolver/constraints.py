@@ -28,3 +28,12 @@ class GEQ(_VersionConstraint):
 
 class LEQ(_VersionConstraint):
     pass
+
+class NotEqual(_VersionConstraint):
+    pass
+
+class GT(_VersionConstraint):
+    pass
+
+class LT(_VersionConstraint):
+    pass
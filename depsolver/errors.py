@@ -1,6 +1,9 @@
 class DepSolverError(Exception):
     def __str__(self):
-        return self.message
+        try:
+            return self.message
+        except AttributeError:
+            return super(DepSolverError, self).__str__()
 
 class InvalidVersion(DepSolverError):
     pass
@@ -14,3 +17,19 @@ class MissingPackageInPool(DepSolverError):
     def __init__(self, package_or_package_id):
         self.requested_package_or_id = package_or_package_id
         self.message = "This pool does not have any package %r" % package_or_package_id
+
+class InvalidPackageIndex(DepSolverError):
+    def __init__(self, filename, lineno, line, reason):
+        self.filename = filename
+        self.lineno = lineno
+        self.line = line
+        self.reason = reason
+        self.message = "%s:%d: invalid package string %r (%s)" % (filename, lineno, line, reason)
+        super(InvalidPackageIndex, self).__init__(filename, lineno, line, reason)
+
+class InvalidRepositoryFile(DepSolverError):
+    def __init__(self, filename, reason):
+        self.filename = filename
+        self.reason = reason
+        self.message = "%s: invalid repository file (%s)" % (filename, reason)
+        super(InvalidRepositoryFile, self).__init__(filename, reason)
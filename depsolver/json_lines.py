@@ -0,0 +1,170 @@
+"""Streaming import and export of packages as JSON lines.
+
+Each line of a JSON-lines file is one package record, e.g.::
+
+    {"name": "numpy", "version": "1.7.0", "dependencies": ["mkl >= 11.0.0"]}
+
+"dependencies" and "provides" are lists of requirements strings, omitted when
+empty. Files may be gzip- or lzma-compressed. Records are read and written one
+at a time, so that memory use does not depend on the file size.
+"""
+import gzip
+import json
+
+import six
+
+from depsolver.errors \
+    import \
+        DepSolverError, InvalidPackageIndex
+from depsolver.package \
+    import \
+        Package, _requirement_string
+from depsolver.repository \
+    import \
+        Repository
+from depsolver.version \
+    import \
+        Version
+
+_EXTENSION_TO_COMPRESSION = {
+    ".gz": "gzip",
+    ".xz": "lzma",
+    ".lzma": "lzma",
+}
+
+def _import_lzma():
+    try:
+        import lzma
+    except ImportError:
+        raise ImportError("lzma compression requires the lzma module (python >= 3.3)")
+    return lzma
+
+def _open(path, mode, compression):
+    # Open path in binary mode, compression being None, 'gzip', 'lzma' or
+    # 'infer' (from the path extension)
+    if compression == "infer":
+        compression = None
+        for extension, extension_compression in _EXTENSION_TO_COMPRESSION.items():
+            if path.endswith(extension):
+                compression = extension_compression
+    if compression is None:
+        return open(path, mode)
+    elif compression == "gzip":
+        return gzip.open(path, mode)
+    elif compression == "lzma":
+        return _import_lzma().open(path, mode)
+    else:
+        raise ValueError("Invalid compression %r" % (compression,))
+
+def package_to_record(package):
+    """Return the JSON-serializable record of the given package.
+
+    Raises
+    ------
+    ValueError
+        If a dependency or provide cannot match any version, as such
+        requirements have no string form.
+    """
+    record = {"name": package.name, "version": str(package.version)}
+    if package.dependencies:
+        record["dependencies"] = [_requirement_string(r) for r in package.dependencies]
+    if package.provides:
+        record["provides"] = [_requirement_string(r) for r in package.provides]
+    return record
+
+def _record_requirements(record, key):
+    # Each string of the list is parsed as one requirement, since a
+    # requirement may have several constraints (see package_to_record)
+    requirements = record.get(key)
+    if not requirements:
+        return None
+    if not isinstance(requirements, list) or \
+            not all(isinstance(r, six.string_types) for r in requirements):
+        raise TypeError("%s must be a list of requirements strings, got %r"
+                        % (key, requirements))
+    return requirements
+
+def package_from_record(record, lazy=False):
+    """Create a package from a record, as returned by package_to_record.
+
+    Parameters
+    ----------
+    record: dict
+        The package record
+    lazy: bool
+        If True, dependencies and provides are only parsed when first
+        accessed (see Package.from_string)
+    """
+    name = record["name"]
+    version = Version.from_string(record["version"])
+    package = Package._from_raw(name, version, _record_requirements(record, "provides"),
+                                _record_requirements(record, "dependencies"))
+    if not lazy:
+        package.provides
+        package.dependencies
+    return package
+
+def write_packages(packages, path, compression="infer"):
+    """Write the given packages to a JSON-lines file, one record at a time.
+
+    Parameters
+    ----------
+    packages: iterable
+        Packages to write, e.g. repository.iter_packages()
+    path: str
+        Path of the file to write
+    compression: str or None
+        'gzip', 'lzma', None for no compression, or 'infer' to select it
+        from the path extension (.gz, .xz or .lzma)
+
+    Returns
+    -------
+    count: int
+        The number of packages written
+    """
+    count = 0
+    with _open(path, "wb", compression) as fp:
+        for package in packages:
+            line = json.dumps(package_to_record(package), sort_keys=True) + "\n"
+            fp.write(line.encode("utf-8"))
+            count += 1
+    return count
+
+def iter_packages(path, compression="infer", lazy=False):
+    """Yield the packages of a JSON-lines file, one record at a time.
+
+    Parameters
+    ----------
+    path: str
+        Path of the file to read
+    compression: str or None
+        See write_packages
+    lazy: bool
+        See package_from_record
+
+    Raises
+    ------
+    InvalidPackageIndex
+        For the first invalid record, with its line number
+    """
+    with _open(path, "rb", compression) as fp:
+        for lineno, line in enumerate(fp, 1):
+            line = line.decode("utf-8").strip()
+            if not line:
+                continue
+            try:
+                package = package_from_record(json.loads(line), lazy=lazy)
+            except (DepSolverError, ValueError, KeyError, TypeError) as e:
+                raise InvalidPackageIndex(path, lineno, line, str(e))
+            yield package
+
+def write_repository(repository, path, compression="infer"):
+    """Write every package of the repository to a JSON-lines file (see
+    write_packages)."""
+    return write_packages(repository.iter_packages(), path, compression)
+
+def read_repository(path, compression="infer", lazy=False):
+    """Read a JSON-lines file into a new Repository (see iter_packages)."""
+    repository = Repository()
+    repository.add_packages(iter_packages(path, compression, lazy))
+    return repository
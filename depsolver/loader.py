@@ -0,0 +1,307 @@
+"""Bulk loading of package index files.
+
+A package index file contains one package string per line, in the format
+accepted by Package.from_string. Blank lines and lines starting with '#' are
+ignored.
+
+Trees of small metadata files, e.g. one file per package build, are loaded by
+load_metadata_tree. Files with a .json extension contain one package record
+(see depsolver.json_lines), other files are package index files.
+"""
+import collections
+import io
+import itertools
+import json
+import multiprocessing
+import multiprocessing.pool
+import os
+import time
+
+import six
+
+from depsolver.errors \
+    import \
+        DepSolverError, InvalidPackageIndex
+from depsolver.json_lines \
+    import \
+        package_from_record
+from depsolver.package \
+    import \
+        Package
+from depsolver.repository \
+    import \
+        Repository
+
+DEFAULT_CHUNK_SIZE = 10000
+
+#: Inputs with fewer lines than this are parsed in-process by default
+DEFAULT_MIN_PARALLEL_LINES = 50000
+
+DEFAULT_BATCH_SIZE = 500
+
+#: Trees with fewer files than this are parsed in-process by default
+DEFAULT_MIN_PARALLEL_FILES = 5000
+
+class LoadStats(collections.namedtuple("LoadStats", ["n_files", "n_packages", "elapsed"])):
+    """Statistics of a load_metadata_tree call.
+
+    n_packages is the number of packages in the loaded repository, packages
+    found in several files being counted once.
+    """
+    __slots__ = ()
+
+    @property
+    def files_per_second(self):
+        if self.elapsed > 0:
+            return self.n_files / self.elapsed
+        return float("inf")
+
+def iter_index_files(path):
+    """Yield the index files under path, in a deterministic order.
+
+    Parameters
+    ----------
+    path: str
+        An index file, or a directory whose files (recursively, hidden files
+        excluded) are index files.
+    """
+    if not os.path.isdir(path):
+        yield path
+        return
+    for root, dirnames, filenames in os.walk(path):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for filename in sorted(filenames):
+            if not filename.startswith("."):
+                yield os.path.join(root, filename)
+
+def iter_chunks(paths, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (filename, lines) chunks of the given index files, where lines is
+    a list of at most chunk_size (line number, package string) pairs.
+
+    Files are streamed: only one chunk of lines is held at a time. They are
+    decoded as UTF-8, as by load_metadata_tree.
+    """
+    for path in paths:
+        with io.open(path, encoding="utf-8") as fp:
+            lines = []
+            for lineno, line in enumerate(fp, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                lines.append((lineno, line))
+                if len(lines) >= chunk_size:
+                    yield path, lines
+                    lines = []
+            if lines:
+                yield path, lines
+
+def _parse_chunk(args):
+    # Return (packages, error), error being None or the (filename, line
+    # number, line, reason) of the first invalid line of the chunk. Errors are
+    # returned rather than raised so that they cross process boundaries
+    # unchanged.
+    filename, lines, lazy = args
+    from_string = Package.from_string
+    packages = []
+    for lineno, line in lines:
+        try:
+            packages.append(from_string(line, lazy=lazy))
+        except (DepSolverError, ValueError) as e:
+            return packages, (filename, lineno, line, str(e))
+    return packages, None
+
+def _iter_parallel(pool, chunks, window, parse=_parse_chunk):
+    # Like pool.imap(parse, chunks), but with at most window chunks in
+    # flight, so that large inputs are not read into memory all at once
+    pending = collections.deque()
+    for chunk in chunks:
+        pending.append(pool.apply_async(parse, (chunk,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+def _iter_parsed(results):
+    for packages, error in results:
+        if error is not None:
+            raise InvalidPackageIndex(*error)
+        yield packages
+
+def load_repository(path_or_paths, lazy=False, processes=None,
+                    chunk_size=DEFAULT_CHUNK_SIZE,
+                    min_parallel_lines=DEFAULT_MIN_PARALLEL_LINES):
+    """Load the package index file(s) into a new Repository.
+
+    Chunks of lines are parsed in a pool of processes. Packages are added in
+    file and line order, whatever the number of processes.
+
+    Parameters
+    ----------
+    path_or_paths: str or seq
+        Index file or directory of index files (see iter_index_files), or a
+        sequence thereof
+    lazy: bool
+        If True, packages dependencies and provides are parsed on first
+        access (see Package.from_string)
+    processes: int or None
+        Number of worker processes. If None, the number of CPUs is used. If 1,
+        parsing is done in-process.
+    chunk_size: int
+        Number of lines sent to a worker at once
+    min_parallel_lines: int
+        Inputs with fewer lines are parsed in-process, as starting workers
+        would cost more than it saves.
+
+    Raises
+    ------
+    InvalidPackageIndex
+        For the first invalid line, with its file name and line number
+    """
+    if isinstance(path_or_paths, six.string_types):
+        path_or_paths = [path_or_paths]
+    paths = itertools.chain.from_iterable(iter_index_files(path) for path in path_or_paths)
+    chunks = ((filename, lines, lazy)
+              for filename, lines in iter_chunks(paths, chunk_size))
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+
+    # Read ahead up to min_parallel_lines lines to decide whether starting
+    # workers is worth it
+    head = []
+    n_lines = 0
+    if processes > 1:
+        for chunk in chunks:
+            head.append(chunk)
+            n_lines += len(chunk[1])
+            if n_lines >= min_parallel_lines:
+                break
+    chunks = itertools.chain(head, chunks)
+
+    repository = Repository()
+    if processes <= 1 or n_lines < min_parallel_lines:
+        for packages in _iter_parsed(_parse_chunk(chunk) for chunk in chunks):
+            repository.add_packages(packages)
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            results = _iter_parallel(pool, chunks, 2 * processes)
+            for packages in _iter_parsed(results):
+                repository.add_packages(packages)
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+    return repository
+
+def _read_file(path):
+    with io.open(path, encoding="utf-8") as fp:
+        return path, fp.read()
+
+def _parse_files(args):
+    # Like _parse_chunk, for a batch of (filename, content) pairs
+    files, lazy = args
+    from_string = Package.from_string
+    packages = []
+    for filename, content in files:
+        if filename.endswith(".json"):
+            try:
+                packages.append(package_from_record(json.loads(content), lazy=lazy))
+            except (DepSolverError, ValueError, KeyError, TypeError) as e:
+                return packages, (filename, 1, content.strip(), str(e))
+            continue
+        for lineno, line in enumerate(content.splitlines(), 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                packages.append(from_string(line, lazy=lazy))
+            except (DepSolverError, ValueError) as e:
+                return packages, (filename, lineno, line, str(e))
+    return packages, None
+
+def _batches(iterable, batch_size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def load_metadata_tree(path, lazy=False, threads=None, processes=None,
+                       batch_size=DEFAULT_BATCH_SIZE,
+                       min_parallel_files=DEFAULT_MIN_PARALLEL_FILES):
+    """Load a directory tree of metadata files into a new Repository.
+
+    Files are read on a pool of threads, and parsed by batches in a pool of
+    processes. Packages are added in file order (see iter_index_files), then
+    line order, whatever the number of threads and processes.
+
+    Parameters
+    ----------
+    path: str
+        Root of the tree, see iter_index_files. Files with a .json extension
+        contain one package record, other files are package index files.
+    lazy: bool
+        If True, packages dependencies and provides are parsed on first
+        access
+    threads: int or None
+        Number of threads reading files. If None, 4 times the number of CPUs
+        is used, as reads mostly wait on I/O.
+    processes: int or None
+        Number of worker processes. If None, the number of CPUs is used. If 1,
+        parsing is done in-process.
+    batch_size: int
+        Number of files sent to a worker process at once
+    min_parallel_files: int
+        Trees with fewer files are parsed in-process.
+
+    Returns
+    -------
+    repository: Repository
+        The loaded repository
+    stats: LoadStats
+        Number of files read, number of packages in the repository, and the
+        elapsed time in seconds
+
+    Raises
+    ------
+    InvalidPackageIndex
+        For the first invalid file, in file order
+    """
+    start = time.time()
+
+    paths = list(iter_index_files(path))
+    if threads is None:
+        threads = 4 * multiprocessing.cpu_count()
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+
+    repository = Repository()
+    n_packages = 0
+    thread_pool = multiprocessing.pool.ThreadPool(max(threads, 1))
+    try:
+        # Batches are read one at a time, while previous batches are parsed
+        # by the worker processes
+        batches = ((thread_pool.map(_read_file, batch_paths), lazy)
+                   for batch_paths in _batches(paths, batch_size))
+        if processes <= 1 or len(paths) < min_parallel_files:
+            results = (_parse_files(batch) for batch in batches)
+            for packages in _iter_parsed(results):
+                n_packages += repository.add_packages(packages).added
+        else:
+            pool = multiprocessing.Pool(processes)
+            try:
+                results = _iter_parallel(pool, batches, 2 * processes, _parse_files)
+                for packages in _iter_parsed(results):
+                    n_packages += repository.add_packages(packages).added
+                pool.close()
+            finally:
+                pool.terminate()
+                pool.join()
+        thread_pool.close()
+    finally:
+        thread_pool.terminate()
+        thread_pool.join()
+
+    return repository, LoadStats(len(paths), n_packages, time.time() - start)
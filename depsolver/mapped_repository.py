@@ -0,0 +1,394 @@
+"""Compact binary repository format, read through mmap.
+
+A repository file is made of a header followed by arrays of little-endian
+unsigned 32 bits integers, and a string data blob:
+
+    strings         string i is the utf-8 data[offsets[i]:offsets[i+1]]
+    names           (name, first package, package count) records, sorted by
+                    name
+    packages        (name, version) string records, grouped by name and sorted
+                    by version key within a name
+    depends         CSR-encoded requirement indices of each package
+    provides        CSR-encoded requirement indices of each package
+    requirements    name string of each requirement, and the CSR-encoded
+                    (lower, upper, flags) version range intervals
+    providers       (provided name, first, count) records sorted by name,
+                    indexing a list of package indices
+
+Versions are stored as their string, which str(version) gives losslessly.
+
+Opening a file only reads its header. Packages (and the requirements and
+versions they refer to) are decoded when first requested, and then cached.
+"""
+import array
+import bisect
+import mmap
+import struct
+import sys
+
+from depsolver.errors \
+    import \
+        InvalidRepositoryFile
+from depsolver.package \
+    import \
+        Package
+from depsolver.requirement \
+    import \
+        Requirement
+from depsolver.version \
+    import \
+        MaxVersion, MinVersion, Version
+from depsolver.version_range \
+    import \
+        VersionRange
+
+MAGIC = b"DEPSOLVR"
+# Version 1 files may hold lossy version strings (identifiers joined with '-'
+# or '+'), and are rejected
+FORMAT_VERSION = 2
+
+_SECTIONS = ("string_offsets", "names", "packages", "depends_indptr", "depends_indices",
+             "provides_indptr", "provides_indices", "requirements",
+             "requirements_indptr", "intervals", "providers", "provider_packages",
+             "string_data")
+
+_HEADER = struct.Struct("<8sII")
+_SECTION = struct.Struct("<QQ")
+_U32 = struct.Struct("<I")
+_U32x2 = struct.Struct("<II")
+_U32x3 = struct.Struct("<III")
+
+# Version string index standing for an unbounded interval end
+_UNBOUNDED = 0xFFFFFFFF
+
+_LOWER_CLOSED = 1
+_UPPER_CLOSED = 2
+
+_MIN_VERSION = MinVersion()
+_MAX_VERSION = MaxVersion()
+
+def _to_bytes(values):
+    data = array.array("I", values)
+    if data.itemsize != 4:
+        data = array.array("L", values)
+    if sys.byteorder == "big":
+        data.byteswap()
+    try:
+        return data.tobytes()
+    except AttributeError:
+        return data.tostring()
+
+class _StringTable(object):
+    def __init__(self):
+        self._indices = {}
+        self.strings = []
+
+    def add(self, s):
+        index = self._indices.get(s)
+        if index is None:
+            index = self._indices[s] = len(self.strings)
+            self.strings.append(s)
+        return index
+
+def write_repository(repository, path):
+    """Write the given repository in the binary format to path.
+
+    Parameters
+    ----------
+    repository: Repository
+        Any object with an iter_packages method
+    path: str
+        Path of the file to write
+    """
+    strings = _StringTable()
+
+    name_to_packages = {}
+    for package in repository.iter_packages():
+        name_to_packages.setdefault(package.name, []).append(package)
+
+    names = []
+    packages = []
+    ordered_packages = []
+    for name in sorted(name_to_packages):
+        same_name = sorted(name_to_packages[name], key=lambda p: p.version._key)
+        name_index = strings.add(name)
+        names.extend((name_index, len(ordered_packages), len(same_name)))
+        for package in same_name:
+            packages.extend((name_index, strings.add(str(package.version))))
+            ordered_packages.append(package)
+
+    requirement_indices = {}
+    requirements = []
+    requirements_indptr = [0]
+    intervals = []
+
+    def add_requirement(requirement):
+        index = requirement_indices.get(requirement)
+        if index is None:
+            index = requirement_indices[requirement] = len(requirements)
+            requirements.append(strings.add(requirement.name))
+            for lower, lower_closed, upper, upper_closed in requirement.version_range.intervals:
+                flags = (_LOWER_CLOSED if lower_closed else 0) \
+                        | (_UPPER_CLOSED if upper_closed else 0)
+                intervals.extend((
+                    _UNBOUNDED if isinstance(lower, MinVersion) else strings.add(str(lower)),
+                    _UNBOUNDED if isinstance(upper, MaxVersion) else strings.add(str(upper)),
+                    flags))
+            requirements_indptr.append(len(intervals) // 3)
+        return index
+
+    depends_indptr = [0]
+    depends_indices = []
+    provides_indptr = [0]
+    provides_indices = []
+    provide_name_to_packages = {}
+    for i, package in enumerate(ordered_packages):
+        for requirement in package.dependencies:
+            depends_indices.append(add_requirement(requirement))
+        depends_indptr.append(len(depends_indices))
+        for requirement in package.provides:
+            provides_indices.append(add_requirement(requirement))
+            provided = provide_name_to_packages.setdefault(requirement.name, [])
+            if not provided or provided[-1] != i:
+                provided.append(i)
+        provides_indptr.append(len(provides_indices))
+
+    providers = []
+    provider_packages = []
+    for name in sorted(provide_name_to_packages):
+        provided = provide_name_to_packages[name]
+        providers.extend((strings.add(name), len(provider_packages), len(provided)))
+        provider_packages.extend(provided)
+
+    encoded = [s.encode("utf-8") for s in strings.strings]
+    string_offsets = [0]
+    for s in encoded:
+        string_offsets.append(string_offsets[-1] + len(s))
+
+    sections = {
+        "string_offsets": _to_bytes(string_offsets),
+        "names": _to_bytes(names),
+        "packages": _to_bytes(packages),
+        "depends_indptr": _to_bytes(depends_indptr),
+        "depends_indices": _to_bytes(depends_indices),
+        "provides_indptr": _to_bytes(provides_indptr),
+        "provides_indices": _to_bytes(provides_indices),
+        "requirements": _to_bytes(requirements),
+        "requirements_indptr": _to_bytes(requirements_indptr),
+        "intervals": _to_bytes(intervals),
+        "providers": _to_bytes(providers),
+        "provider_packages": _to_bytes(provider_packages),
+        "string_data": b"".join(encoded),
+    }
+
+    with open(path, "wb") as fp:
+        offset = _HEADER.size + _SECTION.size * len(_SECTIONS)
+        fp.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(_SECTIONS)))
+        for name in _SECTIONS:
+            fp.write(_SECTION.pack(offset, len(sections[name])))
+            offset += len(sections[name])
+        for name in _SECTIONS:
+            fp.write(sections[name])
+
+class MappedRepository(object):
+    """A read-only repository backed by a binary repository file (see
+    write_repository).
+
+    The file is memory-mapped: opening it is independent of its size, and
+    packages are only decoded when requested.
+
+    Parameters
+    ----------
+    path: str
+        Path of the repository file
+    """
+    def __init__(self, path):
+        self._fp = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file
+            self._fp.close()
+            raise InvalidRepositoryFile(path, "file is empty")
+        self._sections = self._read_header(path)
+
+        self._n_names = self._section_length("names") // _U32x3.size
+        self._n_packages = self._section_length("packages") // _U32x2.size
+        self._n_providers = self._section_length("providers") // _U32x3.size
+
+        # Decoded objects, only for the requested packages
+        self._packages = {}
+        self._requirements = {}
+        self._name_to_range = {}
+        # first package index of a name -> sorted version keys of the name
+        self._version_keys = {}
+
+    def _read_header(self, path):
+        mm = self._mmap
+        if len(mm) < _HEADER.size:
+            raise InvalidRepositoryFile(path, "truncated header")
+        magic, format_version, n_sections = _HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise InvalidRepositoryFile(path, "not a repository file")
+        if format_version != FORMAT_VERSION or n_sections != len(_SECTIONS):
+            raise InvalidRepositoryFile(path, "unsupported format version %d" % format_version)
+        sections = {}
+        for i, name in enumerate(_SECTIONS):
+            offset, length = _SECTION.unpack_from(mm, _HEADER.size + i * _SECTION.size)
+            if offset + length > len(mm):
+                raise InvalidRepositoryFile(path, "truncated section %s" % name)
+            sections[name] = offset
+            sections[name + "_length"] = length
+        return sections
+
+    def close(self):
+        self._mmap.close()
+        self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *a):
+        self.close()
+
+    def _section_length(self, name):
+        return self._sections[name + "_length"]
+
+    def _u32(self, section, i):
+        return _U32.unpack_from(self._mmap, self._sections[section] + 4 * i)[0]
+
+    def _string(self, i):
+        start, end = _U32x2.unpack_from(self._mmap, self._sections["string_offsets"] + 4 * i)
+        offset = self._sections["string_data"]
+        return self._mmap[offset + start:offset + end].decode("utf-8")
+
+    def _bisect_records(self, section, n, name):
+        # Binary search of name in the (name, first, count) records of
+        # section, returning (first, count), or None if name is absent
+        offset = self._sections[section]
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record_name = self._string(_U32.unpack_from(self._mmap, offset + 12 * mid)[0])
+            if record_name < name:
+                lo = mid + 1
+            elif record_name > name:
+                hi = mid
+            else:
+                return _U32x3.unpack_from(self._mmap, offset + 12 * mid)[1:]
+        return None
+
+    def _name_range(self, name):
+        try:
+            return self._name_to_range[name]
+        except KeyError:
+            name_range = self._bisect_records("names", self._n_names, name)
+            self._name_to_range[name] = name_range
+            return name_range
+
+    def _requirement(self, i):
+        try:
+            return self._requirements[i]
+        except KeyError:
+            name = self._string(self._u32("requirements", i))
+            start, end = _U32x2.unpack_from(self._mmap,
+                                            self._sections["requirements_indptr"] + 4 * i)
+            intervals = []
+            offset = self._sections["intervals"]
+            for j in range(start, end):
+                lower, upper, flags = _U32x3.unpack_from(self._mmap, offset + 12 * j)
+                intervals.append((
+                    _MIN_VERSION if lower == _UNBOUNDED else Version.from_string(self._string(lower)),
+                    bool(flags & _LOWER_CLOSED),
+                    _MAX_VERSION if upper == _UNBOUNDED else Version.from_string(self._string(upper)),
+                    bool(flags & _UPPER_CLOSED)))
+            requirement = Requirement.from_range(name, VersionRange(intervals))
+            self._requirements[i] = requirement
+            return requirement
+
+    def _requirements_of(self, section, i):
+        start, end = _U32x2.unpack_from(self._mmap, self._sections[section + "_indptr"] + 4 * i)
+        return [self._requirement(self._u32(section + "_indices", j)) for j in range(start, end)]
+
+    def _package(self, i):
+        try:
+            return self._packages[i]
+        except KeyError:
+            name, version = _U32x2.unpack_from(self._mmap, self._sections["packages"] + 8 * i)
+            package = Package(self._string(name), Version.from_string(self._string(version)),
+                              self._requirements_of("provides", i),
+                              self._requirements_of("depends", i))
+            self._packages[i] = package
+            return package
+
+    def __len__(self):
+        return self._n_packages
+
+    def iter_packages(self):
+        """Return an iterator over every package contained in this repo.
+
+        Note
+        ----
+        This decodes every package of the file. Packages are sorted by name,
+        then version.
+        """
+        for i in range(self._n_packages):
+            yield self._package(i)
+
+    def list_packages(self):
+        """Return the list of every package contained in this repo."""
+        return list(self.iter_packages())
+
+    def has_package(self, package):
+        """Returns True if a package with the same name and version is present
+        in the repo."""
+        return self.find_package(package.name, package.version) is not None
+
+    def has_package_name(self, name):
+        """Returns True if one package with the given package name is present
+        in the repo."""
+        return self._name_range(name) is not None
+
+    def find_package(self, name, version):
+        """Find the package with the given name and version (Version instance
+        or string), or None if not found.
+
+        Only the package found, if any, is decoded. The versions of a name
+        are decoded on the first lookup of that name.
+        """
+        name_range = self._name_range(name)
+        if name_range is None:
+            return None
+        if not isinstance(version, Version):
+            version = Version.from_string(version)
+        first, count = name_range
+        keys = self._version_keys.get(first)
+        if keys is None:
+            offset = self._sections["packages"]
+            keys = [Version.from_string(self._string(_U32x2.unpack_from(self._mmap,
+                                                                        offset + 8 * i)[1]))._key
+                    for i in range(first, first + count)]
+            self._version_keys[first] = keys
+        i = bisect.bisect_left(keys, version._key)
+        if i < count and keys[i] == version._key:
+            return self._package(first + i)
+        return None
+
+    def find_packages(self, name):
+        """Returns the list of packages with the given name, sorted by
+        version."""
+        name_range = self._name_range(name)
+        if name_range is None:
+            return []
+        first, count = name_range
+        return [self._package(i) for i in range(first, first + count)]
+
+    def find_providers(self, name):
+        """Returns the list of packages whose provides include a requirement
+        on the given name."""
+        provider_range = self._bisect_records("providers", self._n_providers, name)
+        if provider_range is None:
+            return []
+        first, count = provider_range
+        return [self._package(self._u32("provider_packages", i))
+                for i in range(first, first + count)]
@@ -1,26 +1,48 @@
 class Operation(object):
+    __slots__ = ("_hash",)
+
+    def _values(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __reduce__(self):
+        return (self.__class__, self._values())
+
     def __eq__(self, other):
-        return self.__class__ == other.__class__ and self.__dict__ == other.__dict__
+        return self.__class__ == other.__class__ and self._values() == other._values()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return self._hash
 
 class Update(Operation):
+    __slots__ = ("from_package", "to_package")
+
     def __init__(self, from_package, to_package):
         self.from_package = from_package
         self.to_package = to_package
+        self._hash = hash((Update, from_package, to_package))
 
     def __repr__(self):
         return "Update from %s to %s" % (self.from_package, self.to_package)
 
 class Install(Operation):
+    __slots__ = ("package",)
+
     def __init__(self, package):
         self.package = package
+        self._hash = hash((Install, package))
 
     def __repr__(self):
         return "Install %s" % (self.package,)
 
 class Remove(Operation):
+    __slots__ = ("package",)
+
     def __init__(self, package):
         self.package = package
+        self._hash = hash((Remove, package))
 
     def __repr__(self):
         return "Remove %s" % (self.package,)
-
@@ -1,6 +1,8 @@
 import hashlib
 import re
 
+import six
+
 from depsolver.requirement \
     import \
         Requirement
@@ -26,18 +28,53 @@ def _parse_name_version_part(name_version, loose):
 
         return name, version
 
-def _parse_requirements_string(s):
+def _requirements_section(s):
+    # Return the text between the parenthesis of a 'depends (...)' or
+    # 'provides (...)' section
     m = _SECTION_RE.search(s)
     if m is None:
         raise ValueError("invalid requirement string: %r" % s)
     else:
-        requirements_string = m.groups()[1]
-        requirements = set()
-        for requirement_string in requirements_string.split(","):
-            requirements.add(R(requirement_string))
-        return requirements
+        return m.groups()[1]
 
-def parse_package_string(package_string, loose=False):
+def _parse_requirements_string(requirements_string):
+    requirements = set()
+    for requirement_string in requirements_string.split(","):
+        requirements.add(R(requirement_string))
+    return requirements
+
+def _is_raw_requirements(requirements):
+    # Unparsed requirements are either a requirements string, as in package
+    # strings, or a list of requirement strings, one per requirement
+    if isinstance(requirements, six.string_types):
+        return True
+    return isinstance(requirements, list) and \
+        all(isinstance(r, six.string_types) for r in requirements)
+
+def _parse_raw_requirements(requirements):
+    # Unlike a requirements string, which is split on commas, each string of
+    # a list is one requirement, which may have several constraints
+    if isinstance(requirements, six.string_types):
+        return _parse_requirements_string(requirements)
+    return set(R(requirement_string) for requirement_string in requirements)
+
+def _requirement_string(requirement):
+    # Unlike str(requirement), unconstrained requirements are written as
+    # their bare name, which the requirement parser accepts back. No string
+    # parses back to a requirement no version can match.
+    if requirement.version_range.is_any():
+        return requirement.name
+    elif requirement.version_range.is_empty():
+        raise ValueError("Cannot write requirement %r, which no version can match"
+                         % requirement)
+    return str(requirement)
+
+def _sorted_requirements(requirements):
+    return tuple(sorted(set(requirements), key=lambda req: req._key))
+
+def split_package_string(package_string, loose=False):
+    """Split a package string into its name, version, and the unparsed text
+    of its provides and dependencies sections (None if absent)."""
     parts = package_string.split(";")
 
     if len(parts) < 1:
@@ -52,24 +89,48 @@ def parse_package_string(package_string, loose=False):
         for part in parts[1:]:
             part = part.strip()
             if part.startswith("depends"):
-                dependencies = _parse_requirements_string(part)
+                dependencies = _requirements_section(part)
             elif part.startswith("provides"):
-                provides = _parse_requirements_string(part)
+                provides = _requirements_section(part)
             else:
                 raise ValueError("syntax error: %r" % part)
 
     return name, version, provides, dependencies
 
+def parse_package_string(package_string, loose=False):
+    name, version, provides, dependencies = split_package_string(package_string, loose)
+    if provides is not None:
+        provides = _parse_requirements_string(provides)
+    if dependencies is not None:
+        dependencies = _parse_requirements_string(dependencies)
+    return name, version, provides, dependencies
+
 class Package(object):
+    __slots__ = ("name", "version", "_provides", "_dependencies", "_raw_provides",
+                 "_raw_dependencies", "_fingerprint")
+
     @classmethod
-    def from_loose_string(cls, package_string):
+    def from_loose_string(cls, package_string, lazy=False):
+        if lazy:
+            return cls._from_raw(*split_package_string(package_string, loose=True))
         name, version, provides, dependencies = parse_package_string(package_string, loose=True)
         return cls(name, version, provides, dependencies)
 
     @classmethod
-    def from_string(cls, package_string):
+    def from_string(cls, package_string, lazy=False):
         """Create a new package from a string.
 
+        Parameters
+        ----------
+        package_string: str
+            The package string
+        lazy: bool
+            If True, the dependencies and provides sections are only parsed
+            when first accessed. Syntax errors in the requirements are then
+            only raised at that point. Hashing the package does not parse
+            them, while comparing it to a package with the same name and
+            version, or computing its fingerprint, does.
+
         Example
         -------
         >>> P = Package.from_string
@@ -79,9 +140,28 @@ class Package(object):
         >>> P("numpy-1.3.0; depends (mkl <= 10.4.0, mkl >= 10.3.0)")
         Package('numpy-1.3.0; depends (mkl <= 10.4.0, mkl >= 10.3.0)')
         """
+        if lazy:
+            return cls._from_raw(*split_package_string(package_string))
         name, version, provides, dependencies = parse_package_string(package_string)
         return cls(name, version, provides, dependencies)
 
+    @classmethod
+    def _from_raw(cls, name, version, provides, dependencies):
+        # Create a package where provides and dependencies may be given
+        # unparsed (see _is_raw_requirements), parsed on first access
+        raw_provides = _is_raw_requirements(provides)
+        raw_dependencies = _is_raw_requirements(dependencies)
+        package = cls(name, version,
+                      None if raw_provides else provides,
+                      None if raw_dependencies else dependencies)
+        if raw_provides:
+            package._provides = None
+            package._raw_provides = provides
+        if raw_dependencies:
+            package._dependencies = None
+            package._raw_dependencies = dependencies
+        return package
+
     def __init__(self, name, version, provides=None, dependencies=None):
         """Create a new package instance.
 
@@ -102,21 +182,47 @@ class Package(object):
         self.name = name
         self.version = version
 
-        def _sorted(requirements):
-            return sorted(requirements, key=lambda req: repr(req))
-
         if provides is None:
-            self.provides = ()
+            self._provides = ()
         else:
-            self.provides = tuple(_sorted(set(provides)))
+            self._provides = _sorted_requirements(provides)
+        self._raw_provides = None
 
         if dependencies is None:
-            self.dependencies = ()
+            self._dependencies = ()
         else:
-            self.dependencies = tuple(_sorted(set(dependencies)))
+            self._dependencies = _sorted_requirements(dependencies)
+        self._raw_dependencies = None
 
-        # FIXME: id detail should be implemented outside Package interface
-        self.id = hashlib.md5(self.unique_name.encode("ascii")).hexdigest()
+        self._fingerprint = None
+
+    @property
+    def provides(self):
+        """Tuple of Requirements provided by this package."""
+        provides = self._provides
+        if provides is None:
+            provides = _sorted_requirements(_parse_raw_requirements(self._raw_provides))
+            self._provides = provides
+            self._raw_provides = None
+        return provides
+
+    @property
+    def dependencies(self):
+        """Tuple of Requirements this package depends on."""
+        dependencies = self._dependencies
+        if dependencies is None:
+            dependencies = _sorted_requirements(_parse_raw_requirements(self._raw_dependencies))
+            self._dependencies = dependencies
+            self._raw_dependencies = None
+        return dependencies
+
+    def __reduce__(self):
+        # Unparsed sections are kept unparsed
+        provides = self._raw_provides if self._provides is None else self._provides
+        dependencies = self._raw_dependencies if self._dependencies is None \
+            else self._dependencies
+        return (_package_from_state, (self.__class__, self.name, self.version, provides,
+                                      dependencies))
 
     @property
     def unique_name(self):
@@ -137,10 +243,62 @@ class Package(object):
     def __str__(self):
         return self.unique_name
 
+    @property
+    def fingerprint(self):
+        """Content fingerprint of this package, as a hex string.
+
+        The fingerprint is the sha1 of the name, and of the version,
+        dependencies and provides keys, which identify them exactly (unlike
+        their strings, equal requirements may be written several ways). It is
+        computed once, and is stable across processes, so that it may be used
+        as a cache key, or to detect whether a republished package changed.
+        """
+        fingerprint = self._fingerprint
+        if fingerprint is None:
+            canonical = repr((self.name, self.version._key,
+                              tuple(r._key for r in self.dependencies),
+                              tuple(r._key for r in self.provides)))
+            fingerprint = hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+            self._fingerprint = fingerprint
+        return fingerprint
+
     def __eq__(self, other):
-        return self.name == other.name and self.version == other.version \
-                and self.provides == other.provides \
-                and self.dependencies == other.dependencies
+        # Packages with different names or versions are told apart without
+        # computing fingerprints, which parses the requirements of lazy
+        # packages
+        if self is other:
+            return True
+        elif isinstance(other, Package):
+            return self.name == other.name and self.version._key == other.version._key \
+                and self.fingerprint == other.fingerprint
+        else:
+            return False
+
+    def __ne__(self, other):
+        return not self == other
 
     def __hash__(self):
-        return hash(repr(self))
+        # Equal packages have the same name and version, and hashing them
+        # does not parse the requirements of lazy packages
+        return hash((self.name, self.version._key))
+
+def _package_from_state(cls, name, version, provides, dependencies):
+    # Rebuild a pickled package. provides and dependencies are either sorted
+    # tuples of requirements, or unparsed requirements.
+    package = cls.__new__(cls)
+    package.name = name
+    package.version = version
+    if _is_raw_requirements(provides):
+        package._provides = None
+        package._raw_provides = provides
+    else:
+        package._provides = provides
+        package._raw_provides = None
+    if _is_raw_requirements(dependencies):
+        package._dependencies = None
+        package._raw_dependencies = dependencies
+    else:
+        package._dependencies = dependencies
+        package._raw_dependencies = None
+    package._fingerprint = None
+    return package
@@ -3,9 +3,6 @@ import collections
 from depsolver.errors \
     import \
         MissingPackageInPool
-from depsolver.requirement \
-    import \
-        Requirement
 
 MATCH_NAME = 1
 MATCH = 2
@@ -18,46 +15,219 @@ class Pool(object):
     the provides concept from package metadata).
     """
     def __init__(self, repositories=None):
-        self._id_to_package = {}
+        # package id -> package. Package ids are dense integers assigned when
+        # packages are added, starting at 1.
+        self._packages = [None]
+        # (package.name, package.version) -> package id
+        self._key_to_id = {}
 
-        # provide.name -> package.id mapping
+        # provide.name -> package id mapping
         self._provide_name_to_ids = collections.defaultdict(set)
 
+        # package.name -> (sorted version keys, packages) index, built lazily
+        # by _sorted_packages
+        self._name_to_sorted_packages = {}
+
+        # Repositories read on demand, and the names already read from them
+        self._lazy_repositories = []
+        self._loaded_names = set()
+
+        # [repository, revision] of every repository, in the order they were
+        # added, revision being the repository revision last read by the pool
+        # (None for lazily read repositories)
+        self._repositories = []
+
         if repositories:
             for repository in repositories:
                 self.add_repository(repository)
 
     def has_package(self, package):
-        package_id = package.id
-        return package_id in self._id_to_package
+        self._load_name(package.name)
+        return (package.name, package.version) in self._key_to_id
 
     def add_repository(self, repository):
         """Add a repository to this pool.
 
+        Each package not yet in the pool is assigned a new package id. When
+        several repositories hold a package with the same name and version,
+        the one of the repository added last is used.
+
+        Repositories implementing find_providers (e.g. SQLiteRepository) are
+        read lazily: the packages called or providing a given name are only
+        added when that name is first looked up. Other repositories are read
+        at once; changes made to them afterwards are applied by refresh.
+
         Arguments
         ---------
         repository: Repository
             repository
         """
-        for package in repository.iter_packages():
-            self._id_to_package[package.id] = package
+        if hasattr(repository, "find_providers"):
+            self._lazy_repositories.append(repository)
+            self._repositories.append([repository, None])
+            for name in self._loaded_names:
+                self._add_packages(repository.find_packages(name))
+                self._add_packages(repository.find_providers(name))
+        else:
+            self._repositories.append([repository, getattr(repository, "revision", None)])
+            self._add_packages(repository.iter_packages())
+
+    def refresh(self):
+        """Apply the changes made to the repositories of this pool since they
+        were added or last refreshed.
+
+        Only the names of the added, replaced or removed packages are
+        reindexed, from the repositories change journal (see
+        Repository.changes_since). If a journal does not go back far enough,
+        the pool is rebuilt from its repositories, and package ids change.
+
+        Returns
+        -------
+        n_changes: int
+            Number of changes applied, or None if the pool was rebuilt.
+        """
+        n_changes = 0
+        for entry in self._repositories:
+            repository, revision = entry
+            if revision is None:
+                continue
+            changes = repository.changes_since(revision)
+            if changes is None:
+                self._rebuild()
+                return None
+            for kind, package in changes:
+                self._update_package(package.name, package.version)
+            entry[1] = repository.revision
+            n_changes += len(changes)
+        return n_changes
+
+    def _rebuild(self):
+        repositories = [repository for repository, revision in self._repositories]
+        self.__init__()
+        for repository in repositories:
+            self.add_repository(repository)
+
+    def _update_package(self, name, version):
+        # Set the package with the given name and version to the one of the
+        # last repository holding it, as adding the repositories again would
+        for repository, revision in reversed(self._repositories):
+            if repository in self._lazy_repositories and not name in self._loaded_names:
+                continue
+            package = repository.find_package(name, version)
+            if package is not None:
+                package_id = self._key_to_id.get((name, version))
+                if package_id is None or self._packages[package_id] is not package:
+                    self._add_packages([package])
+                return
+        self._remove_package(name, version)
+
+    def _remove_package(self, name, version):
+        package_id = self._key_to_id.pop((name, version), None)
+        if package_id is None:
+            return
+        # Ids are never reused, so that ids of other packages stay valid
+        removed = self._packages[package_id]
+        self._packages[package_id] = None
+        self._provide_name_to_ids[removed.name].discard(package_id)
+        self._name_to_sorted_packages.pop(removed.name, None)
+        for provide in removed.provides:
+            self._provide_name_to_ids[provide.name].discard(package_id)
+
+    def _is_shadowed(self, package, repository):
+        # True if a repository added after the given one holds a package with
+        # the same name and version
+        repositories = [entry[0] for entry in self._repositories]
+        i = next(i for i, other in enumerate(repositories) if other is repository)
+        return any(other.find_package(package.name, package.version) is not None
+                   for other in repositories[i+1:])
 
-            self._provide_name_to_ids[package.name].add(package.id)
+    def _add_packages(self, packages):
+        packages_by_id = self._packages
+        key_to_id = self._key_to_id
+        for package in packages:
+            key = (package.name, package.version)
+            package_id = key_to_id.get(key)
+            if package_id is None:
+                package_id = len(packages_by_id)
+                packages_by_id.append(package)
+                key_to_id[key] = package_id
+            else:
+                # The replaced package may have different provides
+                for provide in packages_by_id[package_id].provides:
+                    self._provide_name_to_ids[provide.name].discard(package_id)
+                packages_by_id[package_id] = package
+
+            self._provide_name_to_ids[package.name].add(package_id)
+            self._name_to_sorted_packages.pop(package.name, None)
             for provide in package.provides:
-                self._provide_name_to_ids[provide.name].add(package.id)
+                self._provide_name_to_ids[provide.name].add(package_id)
+
+    def _load_name(self, name):
+        # Add the packages called or providing name from the lazily read
+        # repositories, once per name
+        if self._lazy_repositories and not name in self._loaded_names:
+            self._loaded_names.add(name)
+            for repository in self._lazy_repositories:
+                packages = repository.find_packages(name) + repository.find_providers(name)
+                self._add_packages(package for package in packages
+                                   if not self._is_shadowed(package, repository))
+
+    def _load_provider_names(self, name):
+        # Load the names of the packages providing name: a package read at
+        # once may be replaced by one of a lazily read repository added after
+        # it, which may not have the same provides.
+        while self._lazy_repositories:
+            names = set(self._packages[package_id].name
+                        for package_id in self._provide_name_to_ids.get(name, ()))
+            names.difference_update(self._loaded_names)
+            if not names:
+                return
+            for provider_name in names:
+                self._load_name(provider_name)
+
+    def package_id(self, package):
+        """Retrieve the id of a package of this pool.
+
+        Arguments
+        ---------
+        package: Package
+            A package
+        """
+        try:
+            return self._key_to_id[(package.name, package.version)]
+        except KeyError:
+            raise MissingPackageInPool(package)
 
     def package_by_id(self, package_id):
         """Retrieve a package from its id.
 
         Arguments
         ---------
-        package_id: str
+        package_id: int
             A package id
         """
         try:
-            return self._id_to_package[package_id]
+            if package_id > 0:
+                package = self._packages[package_id]
+                if package is not None:
+                    return package
+        except (IndexError, TypeError):
+            pass
+        raise MissingPackageInPool(package_id)
+
+    def _sorted_packages(self, name):
+        # Return the (keys, packages) pair of the packages called name, sorted
+        # by increasing version.
+        try:
+            return self._name_to_sorted_packages[name]
         except KeyError:
-            raise MissingPackageInPool(package_id)
+            packages = [self._packages[package_id]
+                        for package_id in self._provide_name_to_ids.get(name, ())]
+            packages = sorted((package for package in packages if package.name == name),
+                              key=lambda package: package.version._key)
+            keys = [package.version._key for package in packages]
+            self._name_to_sorted_packages[name] = (keys, packages)
+            return keys, packages
 
     def what_provides(self, requirement, mode='composer'):
         """Returns a list of packages that provide the given requirement.
@@ -87,22 +257,26 @@ class Pool(object):
         if not mode in ['composer', 'direct_only', 'include_indirect', 'any']:
             raise ValueError("Invalid mode %r" % mode)
 
-        any_matches = []
+        self._load_name(requirement.name)
+        self._load_provider_names(requirement.name)
+        keys, packages = self._sorted_packages(requirement.name)
+        # Packages matching directly are found by binary search over the
+        # versions sorted index instead of matching every candidate. They are
+        # returned from the highest to the lowest version.
+        slices = requirement.version_range.slices(keys)
         strict_matches = []
-        provided_match = []
+        for start, stop in reversed(slices):
+            strict_matches.extend(reversed(packages[start:stop]))
 
-        for candidate_id in self._provide_name_to_ids[requirement.name]:
-            package = self._id_to_package[candidate_id]
-            match = self.matches(package, requirement)
-            if match == MATCH_NAME:
-                any_matches.append(package)
-            elif match == MATCH:
-                strict_matches.append(package)
-            elif match == MATCH_PROVIDE:
+        provided_match = []
+        for candidate_id in self._provide_name_to_ids.get(requirement.name, ()):
+            package = self._packages[candidate_id]
+            if package.name != requirement.name \
+                    and self.matches(package, requirement) == MATCH_PROVIDE:
                 provided_match.append(package)
 
         if mode == 'composer':
-            if len(any_matches) > 0 or len(strict_matches) > 0:
+            if len(packages) > 0:
                 return strict_matches
             else:
                 return provided_match
@@ -111,6 +285,11 @@ class Pool(object):
         elif mode == 'include_indirect':
             return strict_matches + provided_match
         elif mode == 'any':
+            in_range = set()
+            for start, stop in slices:
+                in_range.update(range(start, stop))
+            any_matches = [packages[i] for i in range(len(packages) - 1, -1, -1)
+                           if not i in in_range]
             return strict_matches + provided_match + any_matches
 
     def matches(self, candidate, requirement):
@@ -143,9 +322,7 @@ class Pool(object):
         True
         """
         if requirement.name == candidate.name:
-            candidate_requirement_string = "%s == %s" % (candidate.name, candidate.version)
-            candidate_requirement = Requirement.from_string(candidate_requirement_string)
-            if requirement.matches(candidate_requirement):
+            if requirement.matches_version(candidate.version):
                 return MATCH
             else:
                 return MATCH_NAME
@@ -3,10 +3,23 @@ import collections
 from depsolver.package \
     import \
         Package
+from depsolver.repository_fingerprint \
+    import \
+        MerkleIndex
 from depsolver.version \
     import \
         Version
 
+#: Counts of packages reported by Repository.add_packages
+AddedPackages = collections.namedtuple("AddedPackages", ["added", "replaced", "unchanged"])
+
+#: Kinds of changes recorded in a Repository journal
+ADD = "add"
+REMOVE = "remove"
+
+#: Maximum number of changes kept in a Repository journal
+DEFAULT_JOURNAL_SIZE = 2 ** 16
+
 class Repository(object):
     """Creates a new repository instance.
     
@@ -16,14 +29,115 @@ class Repository(object):
     ----------
     packages: seq
         A sequence of packages
+    journal_size: int
+        Maximum number of changes kept in the journal (see changes_since)
     """
-    def __init__(self, packages=None):
-        if packages is None:
-            packages = []
-        self._package_name_to_ids = collections.defaultdict(list)
-        for package in packages:
-            self._package_name_to_ids[package.name].append(package.unique_name)
-        self._id_to_package = dict((p.unique_name, p) for p in packages)
+    @classmethod
+    def from_package_strings(cls, package_strings, lazy=False):
+        """Create a repository from package strings, as accepted by
+        Package.from_string.
+
+        Parameters
+        ----------
+        package_strings: seq
+            Sequence of package strings
+        lazy: bool
+            If True, the dependencies and provides of each package are only
+            parsed when first accessed, which makes loading large indexes
+            much cheaper.
+        """
+        from_string = Package.from_string
+        return cls([from_string(package_string, lazy=lazy)
+                    for package_string in package_strings])
+
+    def __init__(self, packages=None, journal_size=DEFAULT_JOURNAL_SIZE):
+        # package name -> {version: package} index. Versions are hashable, so
+        # that lookups by name and version are two dict lookups.
+        self._name_to_packages = {}
+
+        # Journal of the latest (kind, package) changes: _journal[i] is the
+        # change which led to revision _journal_start + i + 1
+        self._revision = 0
+        self._journal = []
+        self._journal_start = 0
+        self._journal_size = journal_size
+        self._journaling = False
+
+        # Hash tree of the content, built on first use of fingerprint or
+        # snapshot, and names changed since it was last updated
+        self._merkle_index = None
+        self._dirty_names = set()
+
+        # The initial packages are not journaled: no pool has read an earlier
+        # revision, so the journal starts at the revision reached after them
+        if packages is not None:
+            self.add_packages(packages)
+        self._journal_start = self._revision
+        self._journaling = True
+
+    @property
+    def revision(self):
+        """Number of changes made to this repository since its creation."""
+        return self._revision
+
+    @property
+    def fingerprint(self):
+        """Hex digest of the repository content, independent of the order
+        packages were added in.
+
+        The first access hashes every package. Afterwards, only the names
+        changed since the previous access are hashed again.
+        """
+        return self._updated_merkle_index().fingerprint
+
+    def snapshot(self):
+        """Return an immutable RepositorySnapshot of the repository content.
+
+        Snapshots share unchanged data with the repository, and may be
+        compared with RepositorySnapshot.diff.
+        """
+        return self._updated_merkle_index().snapshot()
+
+    def _updated_merkle_index(self):
+        if self._merkle_index is None:
+            self._merkle_index = MerkleIndex()
+            self._dirty_names = set(self._name_to_packages)
+        name_to_packages = self._name_to_packages
+        for name in self._dirty_names:
+            self._merkle_index.update(name, name_to_packages.get(name, {}).values())
+        self._dirty_names.clear()
+        return self._merkle_index
+
+    def _record(self, kind, package):
+        if self._merkle_index is not None:
+            self._dirty_names.add(package.name)
+        self._revision += 1
+        if not self._journaling:
+            return
+        journal = self._journal
+        journal.append((kind, package))
+        if len(journal) > self._journal_size:
+            # Drop the oldest half at once, to amortize the cost of trimming
+            n_dropped = len(journal) - self._journal_size // 2
+            del journal[:n_dropped]
+            self._journal_start += n_dropped
+
+    def changes_since(self, revision):
+        """Return the list of (kind, package) changes made after the given
+        revision, kind being ADD (for new or replaced packages) or REMOVE.
+
+        Returns None if the journal does not go back that far, in which case
+        the whole repository should be read again. The journal starts after
+        the packages given at creation.
+
+        Parameters
+        ----------
+        revision: int
+            A revision, as returned by the revision property
+        """
+        if revision < self._journal_start or revision > self._revision:
+            return None
+        return self._journal[revision - self._journal_start:]
 
     def iter_packages(self):
         """Return an iterator over every package contained in this repo.
@@ -32,7 +146,9 @@ class Repository(object):
         ----
         Order is undefined.
         """
-        return self._id_to_package.values()
+        for packages in self._name_to_packages.values():
+            for package in packages.values():
+                yield package
 
     def list_packages(self):
         """Return the list of every package contained in this repo.
@@ -46,13 +162,83 @@ class Repository(object):
     def add_package(self, package):
         """Add the given package to the repo.
 
+        A package with the same name and version as a package already in the
+        repo replaces it, unless both have the same content (see
+        add_packages).
+
         Parameters
         ----------
         package: Package
             Package to look for.
         """
-        self._package_name_to_ids[package.name].append(package.unique_name)
-        self._id_to_package[package.unique_name] = package
+        packages = self._name_to_packages.get(package.name)
+        if packages is None:
+            packages = self._name_to_packages[package.name] = {}
+        existing = packages.get(package.version)
+        if existing is not None and \
+                (existing is package or existing.fingerprint == package.fingerprint):
+            return
+        packages[package.version] = package
+        self._record(ADD, package)
+
+    def remove_package(self, package):
+        """Remove the package with the same name and version as the given
+        package from the repo.
+
+        Parameters
+        ----------
+        package: Package
+            Package to remove.
+
+        Returns
+        -------
+        removed: bool
+            False if no such package was in the repo.
+        """
+        packages = self._name_to_packages.get(package.name)
+        if packages is None or not package.version in packages:
+            return False
+        removed = packages.pop(package.version)
+        if not packages:
+            del self._name_to_packages[package.name]
+        self._record(REMOVE, removed)
+        return True
+
+    def add_packages(self, packages):
+        """Add the given packages to the repo, in a single pass.
+
+        A package with the same name and version as a package already in the
+        repo replaces it, unless both have the same content, in which case
+        the package already in the repo is kept.
+
+        Parameters
+        ----------
+        packages: iterable
+            Packages to add
+
+        Returns
+        -------
+        counts: AddedPackages
+            Namedtuple of the numbers of packages added, replaced and
+            unchanged.
+        """
+        name_to_packages = self._name_to_packages
+        added = replaced = unchanged = 0
+        for package in packages:
+            version_to_package = name_to_packages.get(package.name)
+            if version_to_package is None:
+                version_to_package = name_to_packages[package.name] = {}
+            existing = version_to_package.get(package.version)
+            if existing is None:
+                added += 1
+            elif existing is package or existing.fingerprint == package.fingerprint:
+                unchanged += 1
+                continue
+            else:
+                replaced += 1
+            version_to_package[package.version] = package
+            self._record(ADD, package)
+        return AddedPackages(added, replaced, unchanged)
 
     def has_package(self, package):
         """Returns True if the given package is present in the repo, False
@@ -63,7 +249,8 @@ class Repository(object):
         package: Package
             Package to look for.
         """
-        return self.find_package(package.name, str(package.version)) is not None
+        packages = self._name_to_packages.get(package.name)
+        return packages is not None and package.version in packages
 
     def has_package_name(self, name):
         """Returns True if one package with the given package name is present in
@@ -74,7 +261,7 @@ class Repository(object):
         name: str
             Package name to look for.
         """
-        return len(self.find_packages(name)) > 0
+        return name in self._name_to_packages
 
     def find_package(self, name, version):
         """Find the package with the given name and version (exact match).
@@ -83,16 +270,20 @@ class Repository(object):
         ----------
         name: str
             Name of the package(s) to look for
-        version: str
-            Name of the package(s) to look for
+        version: Version or str
+            Version of the package to look for
 
         Returns
         -------
         package: Package or None
             The package if found, None otherwise.
         """
-        package = Package(name, Version.from_string(version))
-        return self._id_to_package.get(package.unique_name, None)
+        packages = self._name_to_packages.get(name)
+        if packages is None:
+            return None
+        if not isinstance(version, Version):
+            version = Version.from_string(version)
+        return packages.get(version)
 
     def find_packages(self, name):
         """Returns a list of packages with the given name.
@@ -113,5 +304,8 @@ class Repository(object):
         Even if package A provides package B, find_packages(b_name) will not
         include A
         """
-        return [self._id_to_package[package_id] \
-                for package_id in self._package_name_to_ids[name]]
+        packages = self._name_to_packages.get(name)
+        if packages is None:
+            return []
+        else:
+            return list(packages.values())
@@ -0,0 +1,234 @@
+"""Content-addressed fingerprints of repositories.
+
+The fingerprint of a repository is the root of a two-level hash tree:
+
+    - the digest of a name is the sha1 of the name and of the sorted
+      fingerprints of the packages with that name,
+    - names are spread over a fixed number of buckets, and the digest of a
+      bucket is the sha1 of its sorted (name, name digest) pairs,
+    - the repository fingerprint is the sha1 of the bucket digests.
+
+It only depends on the content of the repository, not on the order packages
+were added in. When packages change, only the digests of their names and
+buckets are computed again.
+
+Indexes also log the names they update, so that diffing two snapshots of the
+same index only compares the names updated between them.
+"""
+import collections
+import hashlib
+import zlib
+
+DEFAULT_N_BUCKETS = 1024
+
+#: Maximum number of names kept in the update log of a MerkleIndex
+DEFAULT_NAME_LOG_SIZE = 2 ** 16
+
+#: Packages added and removed between two snapshots, as returned by
+#: RepositorySnapshot.diff
+RepositoryDiff = collections.namedtuple("RepositoryDiff", ["added", "removed"])
+
+_EMPTY_BUCKET_DIGEST = hashlib.sha1().digest()
+
+def _bucket_index(name, n_buckets):
+    # Must not depend on the process, unlike hash(name)
+    return zlib.crc32(name.encode("utf-8")) % n_buckets
+
+def _name_digest(name, packages):
+    h = hashlib.sha1(name.encode("utf-8"))
+    for fingerprint in sorted(package.fingerprint for package in packages):
+        h.update(fingerprint.encode("ascii"))
+    return h.digest()
+
+def _bucket_digest(bucket):
+    h = hashlib.sha1()
+    for name in sorted(bucket):
+        h.update(name.encode("utf-8") + b"\0" + bucket[name][0])
+    return h.digest()
+
+def _package_sort_key(package):
+    return (package.name, package.version._key)
+
+class _NameLog(object):
+    # Names updated in a MerkleIndex, in update order, shared with its
+    # snapshots. names[i] is the name of the update start + i.
+    def __init__(self, max_size):
+        self.names = []
+        self.start = 0
+        self.max_size = max_size
+
+    @property
+    def end(self):
+        return self.start + len(self.names)
+
+    def append(self, name):
+        names = self.names
+        names.append(name)
+        if len(names) > self.max_size:
+            # Drop the oldest half at once, to amortize the cost of trimming
+            n_dropped = len(names) - self.max_size // 2
+            del names[:n_dropped]
+            self.start += n_dropped
+
+    def between(self, start, end):
+        # Set of the names updated between the start and end positions, or
+        # None if the log does not go back that far
+        if start < self.start:
+            return None
+        return set(self.names[start - self.start:end - self.start])
+
+class RepositorySnapshot(object):
+    """Immutable state of a repository, as returned by Repository.snapshot.
+
+    Snapshots share their unchanged parts with the repository and with each
+    other, so taking a snapshot does not copy the repository.
+    """
+    def __init__(self, buckets, bucket_digests, fingerprint, name_log=None, position=0):
+        # buckets[i] is a name -> (name digest, packages tuple) dict, never
+        # modified once shared with a snapshot
+        self._buckets = buckets
+        self._bucket_digests = bucket_digests
+        self._fingerprint = fingerprint
+        # Update log of the index the snapshot was taken from, and position
+        # of the snapshot in it
+        self._name_log = name_log
+        self._position = position
+
+    @property
+    def fingerprint(self):
+        """Hex digest of the snapshot content."""
+        return self._fingerprint
+
+    def iter_packages(self):
+        """Return an iterator over every package of the snapshot."""
+        for bucket in self._buckets:
+            for digest, packages in bucket.values():
+                for package in packages:
+                    yield package
+
+    def find_packages(self, name):
+        """Returns the list of packages of the snapshot with the given
+        name."""
+        bucket = self._buckets[_bucket_index(name, len(self._buckets))]
+        if name in bucket:
+            return list(bucket[name][1])
+        return []
+
+    def diff(self, other):
+        """Returns the packages added and removed from this snapshot to the
+        other snapshot.
+
+        For snapshots of the same repository, only the names updated between
+        them are compared, so that the cost depends on the number of changed
+        names, not on the size of the repository. Otherwise, or if the update
+        log of the repository does not go back far enough, every name of the
+        buckets whose digests differ is compared. A replaced package is both
+        removed and added.
+
+        Parameters
+        ----------
+        other: RepositorySnapshot
+            A snapshot of the same repository, or of a repository with the
+            same number of buckets
+
+        Returns
+        -------
+        diff: RepositoryDiff
+            Namedtuple of the lists of added and removed packages, sorted by
+            name and version.
+        """
+        if len(self._buckets) != len(other._buckets):
+            raise ValueError("Cannot diff snapshots with different numbers of buckets")
+
+        added = []
+        removed = []
+        if self._fingerprint == other._fingerprint:
+            return RepositoryDiff(added, removed)
+
+        n_buckets = len(self._buckets)
+        names = self._changed_names(other)
+        if names is None:
+            bucket_names = ((i, set(self._buckets[i]).union(other._buckets[i]))
+                            for i, (digest, other_digest)
+                            in enumerate(zip(self._bucket_digests, other._bucket_digests))
+                            if digest != other_digest)
+        else:
+            bucket_names = ((_bucket_index(name, n_buckets), (name,)) for name in names)
+
+        for i, names in bucket_names:
+            bucket = self._buckets[i]
+            other_bucket = other._buckets[i]
+            for name in names:
+                name_digest, packages = bucket.get(name, (None, ()))
+                other_name_digest, other_packages = other_bucket.get(name, (None, ()))
+                if name_digest != other_name_digest:
+                    packages = set(packages)
+                    other_packages = set(other_packages)
+                    added.extend(other_packages.difference(packages))
+                    removed.extend(packages.difference(other_packages))
+
+        added.sort(key=_package_sort_key)
+        removed.sort(key=_package_sort_key)
+        return RepositoryDiff(added, removed)
+
+    def _changed_names(self, other):
+        # Set of the names updated between this snapshot and the other, or
+        # None if they cannot be found from the update log
+        name_log = self._name_log
+        if name_log is None or other._name_log is not name_log:
+            return None
+        start, end = sorted((self._position, other._position))
+        return name_log.between(start, end)
+
+class MerkleIndex(object):
+    """Incrementally maintained hash tree of a repository content.
+
+    Parameters
+    ----------
+    n_buckets: int
+        Number of buckets names are spread over
+    name_log_size: int
+        Maximum number of updated names logged to speed up snapshot diffs
+    """
+    def __init__(self, n_buckets=DEFAULT_N_BUCKETS, name_log_size=DEFAULT_NAME_LOG_SIZE):
+        self._name_log = _NameLog(name_log_size)
+        self._buckets = [{} for i in range(n_buckets)]
+        self._bucket_digests = [_EMPTY_BUCKET_DIGEST] * n_buckets
+        # True for buckets referenced by a snapshot, which must be copied
+        # before being modified
+        self._shared = [False] * n_buckets
+        self._dirty_buckets = set()
+        self._fingerprint = None
+
+    def update(self, name, packages):
+        """Set the packages with the given name, an empty sequence removing
+        the name."""
+        i = _bucket_index(name, len(self._buckets))
+        if self._shared[i]:
+            self._buckets[i] = dict(self._buckets[i])
+            self._shared[i] = False
+        packages = tuple(packages)
+        if packages:
+            self._buckets[i][name] = (_name_digest(name, packages), packages)
+        else:
+            self._buckets[i].pop(name, None)
+        self._name_log.append(name)
+        self._dirty_buckets.add(i)
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self):
+        """Hex digest of the indexed content."""
+        if self._fingerprint is None:
+            for i in self._dirty_buckets:
+                self._bucket_digests[i] = _bucket_digest(self._buckets[i])
+            self._dirty_buckets.clear()
+            self._fingerprint = hashlib.sha1(b"".join(self._bucket_digests)).hexdigest()
+        return self._fingerprint
+
+    def snapshot(self):
+        """Return a RepositorySnapshot of the indexed content."""
+        fingerprint = self.fingerprint
+        self._shared = [True] * len(self._buckets)
+        return RepositorySnapshot(tuple(self._buckets), tuple(self._bucket_digests),
+                                  fingerprint, self._name_log, self._name_log.end)
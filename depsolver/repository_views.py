@@ -0,0 +1,184 @@
+"""Read-only views over repositories.
+
+Views do not copy packages: every query is forwarded to the underlying
+repositories when it is made, so that views reflect later changes to them.
+Views over repositories read lazily by pools (i.e. implementing
+find_providers) are read lazily as well.
+"""
+from depsolver.repository \
+    import \
+        ADD, REMOVE
+
+#: LayeredRepository shadowing modes
+SHADOW_NAME = "name"
+SHADOW_VERSION = "version"
+
+class _RepositoryView(object):
+    def list_packages(self):
+        """Return the list of every package visible in this view."""
+        return list(self.iter_packages())
+
+    def has_package(self, package):
+        """Returns True if a package with the same name and version is visible
+        in this view."""
+        return self.find_package(package.name, package.version) is not None
+
+    def has_package_name(self, name):
+        """Returns True if one package with the given name is visible in this
+        view."""
+        return len(self.find_packages(name)) > 0
+
+class FilteredRepository(_RepositoryView):
+    """A view of the packages of a repository for which a predicate is true.
+
+    Parameters
+    ----------
+    repository: Repository
+        The filtered repository
+    predicate: callable
+        Called with a package, returns True if the package is visible.
+
+    Examples
+    --------
+    >>> from depsolver import Package, Repository
+    >>> repository = Repository([Package.from_string("numpy-1.6.0"),
+    ...                          Package.from_string("numpy-1.7.0")])
+    >>> view = FilteredRepository(repository, lambda p: str(p.version) != "1.7.0")
+    >>> view.find_packages("numpy")
+    [Package('numpy-1.6.0')]
+    """
+    def __init__(self, repository, predicate):
+        self.repository = repository
+        self.predicate = predicate
+        if hasattr(repository, "find_providers"):
+            self.find_providers = self._find_providers
+
+    def iter_packages(self):
+        """Return an iterator over every package visible in this view."""
+        predicate = self.predicate
+        for package in self.repository.iter_packages():
+            if predicate(package):
+                yield package
+
+    def find_package(self, name, version):
+        """Find the visible package with the given name and version (Version
+        instance or string), or None if not found."""
+        package = self.repository.find_package(name, version)
+        if package is not None and self.predicate(package):
+            return package
+        return None
+
+    def find_packages(self, name):
+        """Returns the list of visible packages with the given name."""
+        return [package for package in self.repository.find_packages(name)
+                if self.predicate(package)]
+
+    def _find_providers(self, name):
+        return [package for package in self.repository.find_providers(name)
+                if self.predicate(package)]
+
+    @property
+    def revision(self):
+        """Revision of the filtered repository, or None if it has none."""
+        return getattr(self.repository, "revision", None)
+
+    def changes_since(self, revision):
+        """Return the changes visible in this view made after the given
+        revision (see Repository.changes_since).
+
+        An added package which is not visible is reported as removed, since
+        it may replace a visible package.
+        """
+        changes = self.repository.changes_since(revision)
+        if changes is None:
+            return None
+        predicate = self.predicate
+        return [(kind, package) if kind != ADD or predicate(package) else (REMOVE, package)
+                for kind, package in changes]
+
+class LayeredRepository(_RepositoryView):
+    """A view of ordered layers of repositories, where the packages of later
+    layers shadow those of earlier ones.
+
+    Parameters
+    ----------
+    layers: seq
+        Repositories, from the bottom to the top layer
+    shadow: str
+        SHADOW_NAME: a layer with packages of a given name hides every
+        package of that name in the layers below it. SHADOW_VERSION: a
+        layer only hides packages with the same name and version.
+
+    Note
+    ----
+    Layered views have no change journal: Pool.refresh does not see changes
+    made to their layers.
+
+    Examples
+    --------
+    >>> from depsolver import Package, Repository
+    >>> main = Repository([Package.from_string("numpy-1.6.0"),
+    ...                    Package.from_string("scipy-0.12.0")])
+    >>> overlay = Repository([Package.from_string("numpy-1.7.0")])
+    >>> LayeredRepository([main, overlay]).find_packages("numpy")
+    [Package('numpy-1.7.0')]
+    >>> view = LayeredRepository([main, overlay], SHADOW_VERSION)
+    >>> sorted(view.find_packages("numpy"), key=lambda p: p.version)
+    [Package('numpy-1.6.0'), Package('numpy-1.7.0')]
+    """
+    def __init__(self, layers, shadow=SHADOW_NAME):
+        if not shadow in (SHADOW_NAME, SHADOW_VERSION):
+            raise ValueError("Invalid shadow mode %r" % (shadow,))
+        self.layers = list(layers)
+        self.shadow = shadow
+        if len(self.layers) > 0 and \
+                all(hasattr(layer, "find_providers") for layer in self.layers):
+            self.find_providers = self._find_providers
+
+    def _is_shadowed(self, package, i):
+        # True if the package of the i-th layer is hidden by an upper layer
+        if self.shadow == SHADOW_NAME:
+            return any(layer.has_package_name(package.name) for layer in self.layers[i+1:])
+        else:
+            return any(layer.has_package(package) for layer in self.layers[i+1:])
+
+    def iter_packages(self):
+        """Return an iterator over every package visible in this view."""
+        for i, layer in enumerate(self.layers):
+            for package in layer.iter_packages():
+                if not self._is_shadowed(package, i):
+                    yield package
+
+    def find_package(self, name, version):
+        """Find the visible package with the given name and version (Version
+        instance or string), or None if not found."""
+        for layer in reversed(self.layers):
+            if self.shadow == SHADOW_NAME:
+                if layer.has_package_name(name):
+                    return layer.find_package(name, version)
+            else:
+                package = layer.find_package(name, version)
+                if package is not None:
+                    return package
+        return None
+
+    def find_packages(self, name):
+        """Returns the list of visible packages with the given name."""
+        if self.shadow == SHADOW_NAME:
+            for layer in reversed(self.layers):
+                packages = layer.find_packages(name)
+                if len(packages) > 0:
+                    return packages
+            return []
+        else:
+            version_to_package = {}
+            for layer in self.layers:
+                for package in layer.find_packages(name):
+                    version_to_package[package.version] = package
+            return list(version_to_package.values())
+
+    def _find_providers(self, name):
+        return [package
+                for i, layer in enumerate(self.layers)
+                for package in layer.find_providers(name)
+                if not self._is_shadowed(package, i)]
@@ -1,18 +1,72 @@
+import operator
+import threading
+import weakref
+
+from depsolver.cache \
+    import \
+        LRUCache
 from depsolver.errors \
     import \
         DepSolverError
 from depsolver.constraints \
     import \
-        Equal, GEQ, LEQ
+        Any, Equal, GEQ, GT, LEQ, LT, NotEqual
 from depsolver.requirement_parser \
     import \
         RawRequirementParser
 from depsolver.version \
     import \
-        MaxVersion, MinVersion, Version
+        Version, VersionArray
+from depsolver.version_range \
+    import \
+        VersionRange
 
 V = Version.from_string
 
+#: Default maximum number of requirements kept by the Requirement.from_string
+#: cache
+DEFAULT_REQUIREMENT_CACHE_SIZE = 2 ** 14
+
+_REQUIREMENT_CACHE = LRUCache(DEFAULT_REQUIREMENT_CACHE_SIZE)
+
+def requirement_cache_info():
+    """Return the (hits, misses, maxsize, currsize) statistics of the cache used
+    by Requirement.from_string."""
+    return _REQUIREMENT_CACHE.info()
+
+def set_requirement_cache_size(maxsize):
+    """Set the maximum number of requirements kept by Requirement.from_string
+    cache."""
+    _REQUIREMENT_CACHE.resize(maxsize)
+
+def clear_requirement_cache():
+    """Empty the Requirement.from_string cache, and reset its statistics."""
+    _REQUIREMENT_CACHE.clear()
+
+_SPEC_TO_OPERATOR = {
+        Equal: "==",
+        NotEqual: "!=",
+        GEQ: ">=",
+        GT: ">",
+        LEQ: "<=",
+        LT: "<",
+}
+
+_version_key = operator.attrgetter("_key")
+
+# Canonical key -> Requirement table used to hash-cons requirements
+_REQUIREMENTS = weakref.WeakValueDictionary()
+# Held to insert into _REQUIREMENTS, so that threads creating the same
+# requirement get the same instance
+_REQUIREMENTS_LOCK = threading.Lock()
+
+def _as_version(version):
+    # Constraints may hold either a version string or a Version instance
+    if isinstance(version, Version):
+        return version
+    else:
+        return V(version)
+
 class Requirement(object):
     """Requirements instances represent a 'package requirement', that is a
     package + version constraints.
@@ -23,7 +77,43 @@ class Requirement(object):
         Package name
     specs: seq
         Sequence of constraints
+
+    Note
+    ----
+    Requirements are immutable and hash-consed: equivalent requirements are
+    the same object, e.g. Requirement("numpy", [GEQ("1.0.0"), GEQ("1.0.0")])
+    is Requirement("numpy", [GEQ("1.0.0")]).
     """
+    __slots__ = ("name", "version_range", "_key", "_hash", "__weakref__")
+
+    @classmethod
+    def from_range(cls, name, version_range):
+        """Returns the requirement matching the given VersionRange for
+        package name.
+
+        Arguments
+        ---------
+        name: str
+            Package name
+        version_range: VersionRange
+            The range of versions to match
+        """
+        key = (name, version_range._key)
+        requirement = _REQUIREMENTS.get(key)
+        if requirement is None:
+            with _REQUIREMENTS_LOCK:
+                requirement = _REQUIREMENTS.get(key)
+                if requirement is None:
+                    requirement = object.__new__(cls)
+                    _set = object.__setattr__
+                    _set(requirement, "name", name)
+                    #: VersionRange of the versions matching this requirement
+                    _set(requirement, "version_range", version_range)
+                    _set(requirement, "_key", key)
+                    _set(requirement, "_hash", hash(key))
+                    _REQUIREMENTS[key] = requirement
+        return requirement
+
     @classmethod
     def from_string(cls, requirement_string):
         """Creates a new Requirement from a requirement string.
@@ -43,67 +133,62 @@ class Requirement(object):
         # This creates a requirement that will only version of numpy >= 1.3.0
         >>> Requirement.from_string("numpy >= 1.3.0")
         numpy >= 1.3.0
+
+        # Requirements are immutable, and shared between identical strings
+        >>> Requirement.from_string("numpy") is Requirement.from_string("numpy")
+        True
         """
-        parser = RequirementParser()
-        requirements = parser.parse(requirement_string)
-        if len(requirements) != 1:
-            raise DepSolverError("Invalid requirement string %r" % requirement_string)
-        else:
-            return requirements[0]
-
-    def __init__(self, name, specs):
-        self.name = name
-
-        self._min_bound = MinVersion()
-        self._max_bound = MaxVersion()
-
-        # transform GE and LE into NOT + corresponding GEQ/LEQ
-        # Take the min of GEQ, max of LEQ
-        equals = [req for req in specs if isinstance(req, Equal)]
-        if len(equals) > 1:
-            self._cannot_match = True
-            self._equal = None
-        elif len(equals) == 1:
-            self._cannot_match = False
-            self._equal = V(equals[0].version)
-            self._min_bound = self._max_bound = self._equal
-        else:
-            self._cannot_match = False
-            self._equal = None
+        requirement = _REQUIREMENT_CACHE.get(requirement_string)
+        if requirement is None:
+            requirements = _PARSER.parse(requirement_string)
+            if len(requirements) != 1:
+                raise DepSolverError("Invalid requirement string %r" % requirement_string)
+            requirement = requirements[0]
+            _REQUIREMENT_CACHE.put(requirement_string, requirement)
+        return requirement
+
+    def __new__(cls, name, specs):
+        # The requirement matches the intersection of every constraint range
+        version_range = VersionRange.any()
+        for spec in specs:
+            if isinstance(spec, Any):
+                continue
+            operator = _SPEC_TO_OPERATOR.get(spec.__class__)
+            if operator is None:
+                raise DepSolverError("Unsupported constraint %r" % (spec,))
+            version_range &= VersionRange.from_constraint(operator, _as_version(spec.version))
+        return cls.from_range(name, version_range)
 
-        geq = [req for req in specs if isinstance(req, GEQ)]
-        geq_versions = [V(g.version) for g in geq]
-        if len(geq_versions) > 0:
-            self._min_bound = max(geq_versions)
+    def __setattr__(self, name, value):
+        raise AttributeError("Requirement instances are immutable")
 
-        leq = [req for req in specs if isinstance(req, LEQ)]
-        leq_versions = [V(l.version) for l in leq]
-        if len(leq_versions) > 0:
-            self._max_bound = min(leq_versions)
+    def __reduce__(self):
+        # Go through the hash-consing table when unpickling/copying
+        return (_requirement_from_range, (self.name, self.version_range))
 
-        if self._min_bound > self._max_bound:
-            self._cannot_match = True
+    @property
+    def _cannot_match(self):
+        return self.version_range.is_empty()
 
     def __repr__(self):
-        r = []
-        if self._cannot_match:
-            r.append("%s None" % self.name)
-        elif self._equal:
-            r.append("%s == %s" % (self.name, self._equal))
+        version_range = self.version_range
+        if version_range.is_empty():
+            return "%s None" % self.name
+        elif version_range.is_any():
+            return "%s *" % self.name
         else:
-            if self._min_bound != MinVersion():
-                r.append("%s >= %s" % (self.name, self._min_bound))
-            if self._max_bound != MaxVersion():
-                r.append("%s <= %s" % (self.name, self._max_bound))
-            if self._min_bound == MinVersion() and self._max_bound == MaxVersion():
-                r.append("%s *" % self.name)
-        return ", ".join(r)
+            return ", ".join("%s %s %s" % (self.name, operator, version)
+                             for operator, version in version_range.iter_constraints())
 
+    # Equivalent requirements are the same object
     def __eq__(self, other):
-        return repr(self) == repr(other)
+        return self is other
+
+    def __ne__(self, other):
+        return self is not other
 
     def __hash__(self):
-        return hash(repr(self))
+        return self._hash
 
     def matches(self, provider):
         """Return True if provider requirement and this requirement are
@@ -123,27 +208,69 @@ class Requirement(object):
         True
         >>> req.matches(Requirement.from_string("numpy >= 1.4.0"))
         True
+        >>> req.matches(Requirement.from_string("numpy < 1.3.0"))
+        False
         """
         if self.name != provider.name:
             return False
-        if self._cannot_match:
-            return False
-        if self._equal is None:
-            if provider._equal is None:
-                if self._min_bound > provider._min_bound:
-                    return provider.matches(self)
-                else:
-                    return self._max_bound >= provider._min_bound
-            else:
-                if provider._equal >= self._min_bound and provider._equal <= self._max_bound:
-                    return True
-                else:
-                    return False
-        else:
-            if provider._equal is not None:
-                return provider._equal == self._equal
-            else:
-                return provider.matches(self)
+        return self.version_range.intersects(provider.version_range)
+
+    def matches_version(self, version):
+        """Return True if the given version of a package with the same name
+        fulfills this requirement.
+
+        Arguments
+        ---------
+        version: Version
+            The version to check
+
+        Examples
+        --------
+        >>> req = Requirement.from_string("numpy >= 1.3.0, numpy != 1.4.0")
+        >>> req.matches_version(Version.from_string("1.4.0"))
+        False
+        >>> req.matches_version(Version.from_string("1.4.1"))
+        True
+        """
+        return self.version_range.contains(version)
+
+    def filter(self, versions, presorted=False):
+        """Return the versions fulfilling this requirement, sorted in
+        increasing order.
+
+        The versions are sorted on their keys (unless presorted is True), and
+        each range bound is then located by binary search, instead of matching
+        every version one by one.
+
+        Arguments
+        ---------
+        versions: seq or VersionArray
+            Versions to filter
+        presorted: bool
+            If True, versions must already be sorted in increasing order
+
+        Examples
+        --------
+        >>> V = Version.from_string
+        >>> req = Requirement.from_string("numpy >= 1.3.0, numpy != 1.4.0")
+        >>> req.filter([V("1.4.0"), V("1.5.0"), V("1.2.0"), V("1.3.0")])
+        [Version(1, 3, 0), Version(1, 5, 0)]
+        """
+        if isinstance(versions, VersionArray):
+            versions = versions.select(self.filter_mask(versions))
+            return sorted(versions, key=_version_key)
+        if not presorted:
+            versions = sorted(versions, key=_version_key)
+        keys = [version._key for version in versions]
+        ret = []
+        for start, stop in self.version_range.slices(keys):
+            ret.extend(versions[start:stop])
+        return ret
+
+    def filter_mask(self, version_array):
+        """Return the boolean mask of the versions of the given VersionArray
+        fulfilling this requirement."""
+        return self.version_range.mask(version_array)
 
 class RequirementParser(object):
     def __init__(self):
@@ -155,3 +282,24 @@ class RequirementParser(object):
 
     def parse(self, requirement_string):
         return [r for r in self.iter_parse(requirement_string)]
+
+    def parse_many(self, requirement_strings):
+        """Parse every requirement string of the given iterable in one call.
+
+        Returns the list of parsed requirements lists (see parse), in the
+        input order. Identical strings are only parsed once.
+        """
+        parsed = {}
+        ret = []
+        for requirement_string in requirement_strings:
+            requirements = parsed.get(requirement_string)
+            if requirements is None:
+                requirements = parsed[requirement_string] = self.parse(requirement_string)
+            ret.append(list(requirements))
+        return ret
+
+def _requirement_from_range(name, version_range):
+    return Requirement.from_range(name, version_range)
+
+# Parser shared by every Requirement.from_string call
+_PARSER = RequirementParser()
@@ -8,7 +8,7 @@ from depsolver.errors \
         DepSolverError
 from depsolver.constraints \
     import \
-        Any, Equal, GEQ, LEQ
+        Any, Equal, GEQ, GT, LEQ, LT, NotEqual
 from depsolver.version \
     import \
         Version
@@ -19,11 +19,11 @@ _DEFAULT_SCANNER = re.Scanner([
     (r"[a-zA-Z_]\w*", lambda scanner, token: DistributionNameToken(token)),
     (r"\d[\w\.\-\+]*", lambda scanner, token: VersionToken(token)),
     (r"==", lambda scanner, token: EqualToken(token)),
+    (r"!=", lambda scanner, token: NotEqualToken(token)),
     (r">=", lambda scanner, token: GEQToken(token)),
-    #(r">", lambda scanner, token: ComparisonToken(token)),
+    (r">", lambda scanner, token: GTToken(token)),
     (r"<=", lambda scanner, token: LEQToken(token)),
-    #(r"<", lambda scanner, token: ComparisonToken(token)),
-    #(r"!=", lambda scanner, token: ComparisonToken(token)),
+    (r"<", lambda scanner, token: LTToken(token)),
     (",", lambda scanner, token: CommaToken(token)),
     (" +", lambda scanner, token: None),
 ])
@@ -58,9 +58,18 @@ class LEQToken(ComparisonToken):
 class GEQToken(ComparisonToken):
     typ = "geq"
 
+class GTToken(ComparisonToken):
+    typ = "gt"
+
+class LTToken(ComparisonToken):
+    typ = "lt"
+
 class EqualToken(ComparisonToken):
     typ = "equal"
 
+class NotEqualToken(ComparisonToken):
+    typ = "not_equal"
+
 def iter_over_requirement(tokens):
     """Yield a single requirement 'block' (i.e. a sequence of tokens between
     comma).
@@ -72,28 +81,112 @@ def iter_over_requirement(tokens):
     """
     while True:
         block = []
-        token = six.next(tokens)
+        try:
+            token = six.next(tokens)
+        except StopIteration:
+            return
         try:
             while not isinstance(token, CommaToken):
                 block.append(token)
                 token = six.next(tokens)
             yield block
-        except StopIteration as e:
+        except StopIteration:
             yield block
-            raise e
+            return
+
+# Same lexemes as _DEFAULT_SCANNER, as one pattern matched in a single pass by
+# scan_requirement_string
+_LEXEME_RE = re.compile(r"""
+     (?P<distribution_name>[a-zA-Z_]\w*)
+    |(?P<version>\d[\w\.\-\+]*)
+    |(?P<operator>==|!=|>=|<=|>|<)
+    |(?P<comma>,)
+    |(?P<space>\ +)
+""", re.VERBOSE)
+
+_OPERATOR_STRING_TO_SPEC = {
+        "==": Equal,
+        "!=": NotEqual,
+        ">=": GEQ,
+        ">": GT,
+        "<=": LEQ,
+        "<": LT,
+}
 
-_OPERATOR_TO_SPEC = {
-        EqualToken: Equal,
-        GEQToken: GEQ,
-        LEQToken: LEQ,
+_OPERATOR_STRING_TO_TOKEN = {
+        "==": EqualToken,
+        "!=": NotEqualToken,
+        ">=": GEQToken,
+        ">": GTToken,
+        "<=": LEQToken,
+        "<": LTToken,
 }
 
-def _spec_factory(comparison_token):
-    klass = _OPERATOR_TO_SPEC.get(comparison_token.__class__, None)
-    if klass is None:
-        raise DepSolverError("Unsupported comparison token %s" % comparison_token)
+def _lexeme_as_token(lexeme):
+    # Only used to format error messages the same way as the token-based
+    # parser
+    kind, value = lexeme
+    if kind == "distribution_name":
+        return DistributionNameToken(value)
+    elif kind == "version":
+        return VersionToken(value)
     else:
-        return klass
+        return _OPERATOR_STRING_TO_TOKEN[value](value)
+
+def scan_requirement_string(requirement_string):
+    """Scan the given requirement string in a single pass, and return the list
+    of its (distribution_name, operator, version) blocks.
+
+    operator and version are None for blocks without a version constraint.
+
+    Parameters
+    ----------
+    requirement_string: str
+        The requirement string, e.g. 'numpy >= 1.3.0, numpy <= 2.0.0'
+
+    Examples
+    --------
+    >>> scan_requirement_string("numpy >= 1.3.0, numpy <= 2.0.0, mkl")
+    [('numpy', '>=', '1.3.0'), ('numpy', '<=', '2.0.0'), ('mkl', None, None)]
+    """
+    match = _LEXEME_RE.match
+    end = len(requirement_string)
+    pos = 0
+
+    raw_blocks = []
+    block = []
+    while pos < end:
+        m = match(requirement_string, pos)
+        if m is None:
+            raise DepSolverError("Invalid requirement string: %r" % requirement_string)
+        pos = m.end()
+        kind = m.lastgroup
+        if kind == "space":
+            continue
+        elif kind == "comma":
+            raw_blocks.append(block)
+            block = []
+        else:
+            block.append((kind, m.group()))
+    if len(block) > 0:
+        raw_blocks.append(block)
+
+    blocks = []
+    for block in raw_blocks:
+        if len(block) == 3:
+            (name_kind, name), (operator_kind, operator), (version_kind, version) = block
+            if operator_kind != "operator":
+                raise DepSolverError("Unsupported comparison token %s" % _lexeme_as_token(block[1]))
+            if name_kind != "distribution_name" or version_kind != "version":
+                raise DepSolverError("Invalid requirement block: %s" % \
+                                     [_lexeme_as_token(lexeme) for lexeme in block])
+            blocks.append((name, operator, version))
+        elif len(block) == 1 and block[0][0] == "distribution_name":
+            blocks.append((block[0][1], None, None))
+        else:
+            raise DepSolverError("Invalid requirement block: %s" % \
+                                 [_lexeme_as_token(lexeme) for lexeme in block])
+    return blocks
 
 class RawRequirementParser(object):
     """A simple parser for requirement strings."""
@@ -109,15 +202,16 @@ class RawRequirementParser(object):
 
     def parse(self, requirement_string):
         parsed = collections.defaultdict(list)
-        tokens_stream = self.tokenize(requirement_string)
-        for requirement_block in iter_over_requirement(tokens_stream):
-            if len(requirement_block) == 3:
-                distribution, operator, version = requirement_block
-                parsed[distribution.value].append(_spec_factory(operator)(version.value))
-            elif len(requirement_block) == 1:
-                distribution = requirement_block[0]
-                parsed[distribution.value].append(Any())
+        for name, operator, version in scan_requirement_string(requirement_string):
+            if operator is None:
+                parsed[name].append(Any())
             else:
-                raise DepSolverError("Invalid requirement block: %s" % requirement_block)
+                parsed[name].append(_OPERATOR_STRING_TO_SPEC[operator](version))
 
         return parsed
+
+    def parse_many(self, requirement_strings):
+        """Parse every requirement string of the given iterable, and return the
+        list of parsed results (see parse)."""
+        parse = self.parse
+        return [parse(requirement_string) for requirement_string in requirement_strings]
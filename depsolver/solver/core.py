@@ -12,6 +12,9 @@ from depsolver.solver.create_clauses \
 from depsolver.solver.policy \
     import \
         DefaultPolicy
+from depsolver.solver.range_propagation \
+    import \
+        propagate_version_ranges
 from depsolver.solver.rule \
     import \
         Not, PackageLiteral
@@ -145,8 +148,11 @@ class Solver(object):
             policy = DefaultPolicy()
         self.policy = policy
 
-        self._id_to_installed_package = dict((p.id, p) for p in
-                                             installed_repository.iter_packages())
+        # Installed packages which are not in the pool can never be decided
+        # upon, and are left aside
+        self._id_to_installed_package = dict((pool.package_id(p), p) for p in
+                                             installed_repository.iter_packages()
+                                             if pool.has_package(p))
         self._id_to_updated_package = {}
 
     def _run_dpll(self, clauses, variables):
@@ -241,6 +247,7 @@ class Solver(object):
             List of operations to apply to the system to fulfill the requirement.
         """
         clauses = create_install_rules(self.pool, requirement)
+        clauses = propagate_version_ranges(self.pool, clauses)
         job_clauses = clauses[:1]
 
         variables = DecisionsSet(self.pool)
@@ -266,7 +273,8 @@ class Solver(object):
                     to_update_packages = self.installed_repository.find_packages(package.name)
                     assert len(to_update_packages) == 1
                     to_update_package = to_update_packages[0]
-                    update_package_ids.add(to_update_package.id)
+                    if self.pool.has_package(to_update_package):
+                        update_package_ids.add(self.pool.package_id(to_update_package))
                     operations.append(Update(to_update_package,
                                              self.pool.package_by_id(literal_name)))
                 else:
@@ -51,15 +51,17 @@ class DefaultPolicy(object):
             self._compute_prefered_packages_installed_first(pool, installed_map,
                 decision_queue)
 
-        def package_id_to_version(package_id):
+        max_version_key = MaxVersion()._key
+
+        def package_id_to_version_key(package_id):
             if package_id in installed_map:
-                return MaxVersion()
+                return max_version_key
             else:
                 package = pool.package_by_id(package_id)
-                return package.version
+                return package.version._key
 
         for package_name, package_queue in package_queues.items():
-            sorted_package_queue = sorted(package_queue, key=package_id_to_version)[::-1]
+            sorted_package_queue = sorted(package_queue, key=package_id_to_version_key)[::-1]
             package_queues[package_name] = sorted_package_queue
 
         for package_name, package_queue in package_queues.items():
@@ -84,7 +86,7 @@ def prune_to_best_version(pool, package_ids):
         best_version_only = [package_ids[0]]
         for package_id in package_ids[1:]:
             package = pool.package_by_id(package_id)
-            if package.version < best_package.version:
+            if package.version._key < best_package.version._key:
                 break
             else:
                 best_version_only.append(package_id)
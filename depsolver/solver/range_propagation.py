@@ -0,0 +1,160 @@
+"""Pre-pass shrinking the install rules before they reach the SAT solver.
+
+The rules generated by create_install_rules contain every candidate of every
+name in the dependency closure, even when the versions required by the whole
+closure for a name rule most of them out. This module propagates, for each
+name, the versions which are forced by the job rule, by assertion rules and by
+the dependencies shared by all the forced candidates of another name, and
+removes the candidates which can never be selected.
+"""
+import collections
+
+from depsolver.solver.rule \
+    import \
+        Not, PackageRule
+
+class _Clause(object):
+    # Clause split into its negative and positive literals
+    def __init__(self, rule):
+        self.rule = rule
+        self.negatives = [literal.name for literal in rule.literals if isinstance(literal, Not)]
+        self.positives = [literal.name for literal in rule.literals if not isinstance(literal, Not)]
+
+def _find_dead_packages(pool, clauses):
+    # Return the set of package ids which cannot be installed in any solution,
+    # or None if the rules are found to be unsatisfiable.
+    def name(package_id):
+        return pool.package_by_id(package_id).name
+
+    dead = set()
+    # package id -> set of package ids it conflicts with
+    conflicts = collections.defaultdict(set)
+    for clause in clauses:
+        if len(clause.negatives) == 1 and len(clause.positives) == 0:
+            dead.add(clause.negatives[0])
+        elif len(clause.negatives) == 2 and len(clause.positives) == 0:
+            left, right = clause.negatives
+            conflicts[left].add(right)
+            conflicts[right].add(left)
+
+    name_to_ids = collections.defaultdict(set)
+    for clause in clauses:
+        for package_id in clause.negatives + clause.positives:
+            name_to_ids[name(package_id)].add(package_id)
+
+    changed = True
+    while changed:
+        changed = False
+
+        # name -> set of package ids, one of which has to be installed
+        forced = {}
+        # package id -> list of its dependencies, as sets of alive package ids
+        dependencies = collections.defaultdict(list)
+
+        def force(package_name, package_ids):
+            if package_name in forced:
+                forced[package_name] &= package_ids
+            else:
+                forced[package_name] = set(package_ids)
+
+        for clause in clauses:
+            if any(package_id in dead for package_id in clause.negatives):
+                continue
+            positives = set(package_id for package_id in clause.positives
+                            if not package_id in dead)
+            if len(clause.negatives) == 0:
+                if len(positives) == 0:
+                    return None
+                names = set(name(package_id) for package_id in positives)
+                if len(names) == 1:
+                    force(names.pop(), positives)
+            elif len(clause.negatives) == 1:
+                if len(positives) == 0:
+                    dead.add(clause.negatives[0])
+                    changed = True
+                else:
+                    dependencies[clause.negatives[0]].append(positives)
+
+        # Propagate the forced candidates of a name to the names all of them
+        # depend on: one of the union of their dependencies has to be
+        # installed.
+        queue = collections.deque(forced)
+        while len(queue) > 0:
+            package_name = queue.popleft()
+            package_ids = forced[package_name]
+
+            implied = None
+            for package_id in package_ids:
+                # dependency name -> candidates allowed by all the
+                # dependencies of package_id on this name
+                allowed = {}
+                for dependency in dependencies[package_id]:
+                    names = set(name(dependency_id) for dependency_id in dependency)
+                    if len(names) == 1:
+                        dependency_name = names.pop()
+                        if dependency_name in allowed:
+                            allowed[dependency_name] &= dependency
+                        else:
+                            allowed[dependency_name] = set(dependency)
+                if implied is None:
+                    implied = allowed
+                else:
+                    for dependency_name in list(implied):
+                        if dependency_name in allowed:
+                            implied[dependency_name] |= allowed[dependency_name]
+                        else:
+                            del implied[dependency_name]
+
+            for dependency_name, dependency_ids in (implied or {}).items():
+                previous = forced.get(dependency_name)
+                force(dependency_name, dependency_ids)
+                if forced[dependency_name] != previous:
+                    queue.append(dependency_name)
+
+        # A candidate outside of the forced candidates of its name, and
+        # conflicting with all of them, cannot be installed.
+        for package_name, package_ids in forced.items():
+            if len(package_ids) == 0:
+                return None
+            for package_id in name_to_ids[package_name] - package_ids:
+                if not package_id in dead and package_ids <= conflicts[package_id]:
+                    dead.add(package_id)
+                    changed = True
+
+    return dead
+
+def propagate_version_ranges(pool, rules):
+    """Remove from the given install rules the candidates which can never be
+    selected.
+
+    Parameters
+    ----------
+    pool: Pool
+        Pool the rules' package ids refer to
+    rules: seq
+        Rules as created by create_install_rules (the job rule first)
+
+    Returns
+    -------
+    rules: list
+        The simplified rules, the job rule still first. Rules which become
+        trivially satisfied are dropped. If the rules are found to be
+        unsatisfiable, they are returned unchanged so that the solver reports
+        the failure.
+    """
+    clauses = [_Clause(rule) for rule in rules]
+    dead = _find_dead_packages(pool, clauses)
+    if dead is None or len(dead) == 0:
+        return list(rules)
+
+    new_rules = []
+    for clause in clauses:
+        if any(package_id in dead for package_id in clause.negatives):
+            continue
+        literals = [literal for literal in clause.rule.literals
+                    if isinstance(literal, Not) or not literal.name in dead]
+        if len(literals) == len(clause.rule.literals):
+            new_rules.append(clause.rule)
+        else:
+            new_rules.append(PackageRule(literals, pool))
+    return new_rules
@@ -2,9 +2,6 @@ import re
 
 import six
 
-from depsolver.errors \
-    import \
-        MissingPackageInPool
 from depsolver.package \
     import \
         Package
@@ -22,6 +19,8 @@ class Literal(object):
     name: str
         Name of the literal (must consists of alphanumerical characters only)
     """
+    __slots__ = ("_name",)
+
     def __init__(self, name):
         if not _IS_VALID_LITERAL.match(name):
             raise ValueError("Invalid literal name: %s" % name)
@@ -35,7 +34,9 @@ class Literal(object):
         return self.__class__ == other.__class__ and self.name == other._name
 
     def __hash__(self):
-        return hash(repr(self))
+        # Cheap enough not to be cached: literal names are short strings or
+        # package ids
+        return hash(self._name)
 
     def __repr__(self):
         return "L('%s')" % self.name
@@ -53,6 +54,11 @@ class Literal(object):
             return values[self.name]
 
 class Not(Literal):
+    __slots__ = ()
+
+    def __hash__(self):
+        return ~hash(self._name)
+
     def __repr__(self):
         return "L('~%s')" % self.name
 
@@ -60,6 +66,8 @@ class Not(Literal):
         return not super(Not, self).evaluate(values)
 
 class Rule(object):
+    __slots__ = ("literals", "literal_names", "_hash")
+
     @classmethod
     def from_string(cls, clause_string):
         literals = []
@@ -76,15 +84,14 @@ class Rule(object):
 
     def __init__(self, literals):
         def key(literal):
-            # FIXME: hack to sort not literal before the others
+            # Sort not literals before the others
             if isinstance(literal, Not):
-                return "\0%s" % literal.name
+                return (0, literal.name)
             else:
-                return literal.name
+                return (1, literal.name)
         self.literals = tuple(sorted(set(literals), key=key))
         self.literal_names = tuple(l.name for l in self.literals)
-
-        self._name_to_literal = dict((literal.name, literal) for literal in literals)
+        self._hash = hash(self.literals)
 
     @property
     def is_assertion(self):
@@ -141,7 +148,7 @@ class Rule(object):
         return self.__class__ == other.__class__ and self.literals == other.literals
 
     def __hash__(self):
-        return hash(self.literals)
+        return self._hash
 
     def is_unit(self, variables):
         """Computes whether this clause is decidable with the given variables,
@@ -187,7 +194,10 @@ class Rule(object):
             return False, None
 
 class PackageLiteral(Literal):
-    """A Literal whose name is a package id attached to a pool."""
+    """A Literal whose name is a package id (an integer) attached to a
+    pool."""
+    __slots__ = ("_pool",)
+
     @classmethod
     def from_string(cls, literal_string, pool):
         if literal_string.startswith("-"):
@@ -196,20 +206,19 @@ class PackageLiteral(Literal):
         else:
             is_not = False
             name, version = literal_string.split("-")
-        package = Package(name, Version.from_string(version))
-        if not pool.has_package(package):
-            raise MissingPackageInPool(package)
+        package_id = pool.package_id(Package(name, Version.from_string(version)))
         if is_not:
-            return PackageNot(package.id, pool)
+            return PackageNot(package_id, pool)
         else:
-            return PackageLiteral(package.id, pool)
+            return PackageLiteral(package_id, pool)
 
     @classmethod
     def from_package(cls, package, pool):
-        return cls(package.id, pool)
+        return cls(pool.package_id(package), pool)
 
     def __init__(self, name, pool):
-        super(PackageLiteral, self).__init__(name)
+        # name is a package id assigned by the pool, no need to validate it
+        self._name = name
         self._pool = pool
 
     def __repr__(self):
@@ -222,6 +231,8 @@ class PackageLiteral(Literal):
             return PackageRule([self, other], self._pool)
 
 class PackageNot(PackageLiteral, Not):
+    __slots__ = ()
+
     def __repr__(self):
         package = self._pool.package_by_id(self.name)
         return "-%s" % package
@@ -232,6 +243,8 @@ class PackageRule(Rule):
     It essentially allows for pretty-printing package names instead of internal
     ids as used by the SAT solver underneath.
     """
+    __slots__ = ("_pool",)
+
     @classmethod
     def from_string(cls, packages_string, pool):
         literals = []
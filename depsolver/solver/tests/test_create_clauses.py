@@ -56,7 +56,8 @@ class TestPackageRule(unittest.TestCase):
         rule = PackageRule.from_packages([mkl_10_1_0, mkl_10_2_0], self.pool)
         rule |= PackageNot.from_package(mkl_11_0_0, self.pool)
 
-        self.assertTrue(rule.literals, set([mkl_11_0_0.id, mkl_10_1_0.id, mkl_10_2_0.id]))
+        self.assertEqual(set(rule.literal_names),
+                         set(self.pool.package_id(p) for p in (mkl_11_0_0, mkl_10_1_0, mkl_10_2_0)))
 
     def test_repr(self):
         rule_repr = repr(PackageRule.from_packages([mkl_11_0_0, mkl_10_1_0, mkl_10_2_0], self.pool))
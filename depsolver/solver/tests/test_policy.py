@@ -22,27 +22,27 @@ class TestDefaultPolicy(unittest.TestCase):
     def test_simple(self):
         """Ensure the policy returns the highest version across a set of
         packages with the same name."""
-        r_candidates = [mkl_10_3_0.id, mkl_11_0_0.id]
         repository = Repository([mkl_10_3_0, mkl_11_0_0])
 
         pool = Pool()
         pool.add_repository(repository)
+        r_candidates = [pool.package_id(mkl_10_3_0), pool.package_id(mkl_11_0_0)]
 
         policy = DefaultPolicy()
 
         candidates = policy.prefered_package_ids(pool, {}, r_candidates)
-        self.assertEqual(list(candidates), [mkl_11_0_0.id])
+        self.assertEqual(list(candidates), [pool.package_id(mkl_11_0_0)])
 
     def test_simple_fulfilled_installed(self):
         """Ensure the policy returns the installed version first if it fulfills
         the requirement, even if higher versions are available."""
-        r_candidates = [mkl_10_3_0.id, mkl_11_0_0.id]
         repository = Repository([mkl_10_3_0, mkl_11_0_0])
 
         pool = Pool()
         pool.add_repository(repository)
+        r_candidates = [pool.package_id(mkl_10_3_0), pool.package_id(mkl_11_0_0)]
 
         policy = DefaultPolicy()
 
-        candidates = policy.prefered_package_ids(pool, {mkl_10_3_0.id: mkl_10_3_0}, r_candidates)
-        self.assertEqual(list(candidates), [mkl_10_3_0.id, mkl_11_0_0.id])
+        candidates = policy.prefered_package_ids(pool, {pool.package_id(mkl_10_3_0): mkl_10_3_0}, r_candidates)
+        self.assertEqual(list(candidates), r_candidates)
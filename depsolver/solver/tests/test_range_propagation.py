@@ -0,0 +1,87 @@
+import unittest
+
+from depsolver.package \
+    import \
+        Package
+from depsolver.pool \
+    import \
+        Pool
+from depsolver.repository \
+    import \
+        Repository
+from depsolver.requirement \
+    import \
+        Requirement
+
+from depsolver.solver.create_clauses \
+    import \
+        create_install_rules
+from depsolver.solver.range_propagation \
+    import \
+        propagate_version_ranges
+from depsolver.solver.rule \
+    import \
+        PackageRule
+
+P = Package.from_string
+R = Requirement.from_string
+
+numpy_1_5_0 = P("numpy-1.5.0")
+numpy_1_6_0 = P("numpy-1.6.0")
+numpy_1_7_0 = P("numpy-1.7.0")
+
+scipy_0_10_0 = P("scipy-0.10.0; depends (numpy >= 1.6.0)")
+scipy_0_11_0 = P("scipy-0.11.0; depends (numpy >= 1.6.0)")
+scipy_0_12_0 = P("scipy-0.12.0; depends (numpy >= 1.7.0)")
+
+def _packages(pool, rules):
+    return set(pool.package_by_id(literal.name) for rule in rules for literal in rule.literals)
+
+class TestPropagateVersionRanges(unittest.TestCase):
+    def test_job_range(self):
+        pool = Pool([Repository([numpy_1_5_0, numpy_1_6_0, numpy_1_7_0,
+                                 scipy_0_10_0, scipy_0_11_0, scipy_0_12_0])])
+
+        rules = propagate_version_ranges(pool, create_install_rules(pool, R("scipy")))
+        self.assertEqual(rules[0],
+                         PackageRule.from_packages([scipy_0_10_0, scipy_0_11_0, scipy_0_12_0], pool))
+        # Every scipy requires numpy >= 1.6.0
+        self.assertFalse(numpy_1_5_0 in _packages(pool, rules))
+        self.assertTrue(numpy_1_6_0 in _packages(pool, rules))
+
+    def test_intersect_ranges(self):
+        pool = Pool([Repository([numpy_1_5_0, numpy_1_6_0, numpy_1_7_0,
+                                 scipy_0_10_0, scipy_0_11_0, scipy_0_12_0])])
+
+        rules = create_install_rules(pool, R("scipy >= 0.12.0"))
+        self.assertTrue(numpy_1_6_0 in _packages(pool, rules))
+
+        rules = propagate_version_ranges(pool, rules)
+        self.assertEqual(_packages(pool, rules), set([scipy_0_12_0, numpy_1_7_0]))
+
+    def test_dead_dependency(self):
+        """A candidate whose dependencies were all removed is removed."""
+        mkl_10_3_0 = P("mkl-10.3.0")
+        mkl_11_0_0 = P("mkl-11.0.0")
+        numpy_1_7_0 = P("numpy-1.7.0; depends (mkl)")
+        numpy_1_8_0 = P("numpy-1.8.0; depends (mkl == 10.3.0)")
+        app_1_0_0 = P("app-1.0.0; depends (numpy, mkl >= 11.0.0)")
+        pool = Pool([Repository([mkl_10_3_0, mkl_11_0_0, numpy_1_7_0, numpy_1_8_0, app_1_0_0])])
+
+        rules = create_install_rules(pool, R("app"))
+        self.assertTrue(numpy_1_8_0 in _packages(pool, rules))
+
+        rules = propagate_version_ranges(pool, rules)
+        self.assertEqual(_packages(pool, rules),
+                         set([app_1_0_0, numpy_1_7_0, mkl_11_0_0]))
+
+    def test_unsatisfiable(self):
+        """Unsatisfiable rules are returned unchanged."""
+        mkl_10_3_0 = P("mkl-10.3.0")
+        mkl_11_0_0 = P("mkl-11.0.0")
+        numpy_1_8_0 = P("numpy-1.8.0; depends (mkl == 10.3.0)")
+        app_1_0_0 = P("app-1.0.0; depends (numpy == 1.8.0, mkl >= 11.0.0)")
+        pool = Pool([Repository([mkl_10_3_0, mkl_11_0_0, numpy_1_8_0, app_1_0_0])])
+
+        rules = create_install_rules(pool, R("app"))
+        self.assertEqual(propagate_version_ranges(pool, rules), rules)
@@ -23,6 +23,13 @@ class TestLiteral(unittest.TestCase):
         self.assertEqual(repr(a), "L('a')")
         self.assertEqual(repr(~a), "L('~a')")
 
+    def test_hash(self):
+        a = Literal("a")
+        self.assertEqual(hash(a), hash(Literal("a")))
+        self.assertEqual(len(set([a, Literal("a"), ~a, ~Literal("a")])), 2)
+        self.assertFalse(hasattr(a, "__dict__"))
+        self.assertFalse(hasattr(~a, "__dict__"))
+
     def test_clause(self):
         a = Literal("a")
         b = Literal("b")
@@ -0,0 +1,244 @@
+"""Repository stored in a SQLite database file.
+
+Packages are stored one per row, with their version in its canonical string
+form (which keeps every pre-release and build identifier, see Version.__str__)
+and their dependencies and provides kept as JSON lists of requirement strings,
+so that the index does not have to fit in memory. Every query goes through an
+index, and packages are only materialized when returned.
+"""
+import json
+import sqlite3
+
+from depsolver.cache \
+    import \
+        LRUCache
+from depsolver.errors \
+    import \
+        InvalidRepositoryFile
+from depsolver.package \
+    import \
+        Package, _requirement_string
+from depsolver.repository \
+    import \
+        AddedPackages
+from depsolver.version \
+    import \
+        Version
+
+DEFAULT_PACKAGE_CACHE_SIZE = 2 ** 12
+
+# Stored as the database user_version. Databases without one may hold version
+# strings with lost pre-release or build separators, and databases of version
+# 1 comma-separated requirements strings, which split requirements with
+# several constraints: both are rejected.
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS packages (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    version TEXT NOT NULL,
+    provides TEXT,
+    dependencies TEXT,
+    fingerprint TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS packages_name ON packages (name);
+CREATE UNIQUE INDEX IF NOT EXISTS packages_name_version ON packages (name, version);
+CREATE TABLE IF NOT EXISTS provides (
+    name TEXT NOT NULL,
+    package_id INTEGER NOT NULL REFERENCES packages (id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS provides_name ON provides (name);
+CREATE INDEX IF NOT EXISTS provides_package_id ON provides (package_id);
+"""
+
+_COLUMNS = "id, name, version, provides, dependencies"
+
+def _requirements_json(requirements):
+    # Each requirement is kept as its own string, since a requirement may
+    # have several constraints
+    if not requirements:
+        return None
+    return json.dumps([_requirement_string(requirement) for requirement in requirements])
+
+def _version_string(version):
+    # Versions are stored in their canonical string form, so that equal
+    # versions are found whatever the string they were parsed from
+    if not isinstance(version, Version):
+        version = Version.from_string(version)
+    return str(version)
+
+class SQLiteRepository(object):
+    """A repository backed by a SQLite database file.
+
+    Only the packages returned by a query are read from disk. The most
+    recently returned packages are kept in an in-memory LRU cache.
+
+    Parameters
+    ----------
+    path: str
+        Path of the database file, created if it does not exist. ':memory:'
+        creates a temporary in-memory database.
+    packages: seq
+        Packages to add to the repository
+    cache_size: int
+        Maximum number of materialized packages kept in memory
+    """
+    def __init__(self, path, packages=None, cache_size=DEFAULT_PACKAGE_CACHE_SIZE):
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        try:
+            self._create_schema(path)
+        except InvalidRepositoryFile:
+            self._connection.close()
+            raise
+        # package row id -> Package
+        self._cache = LRUCache(cache_size)
+        if packages is not None:
+            self.add_packages(packages)
+
+    def _create_schema(self, path):
+        connection = self._connection
+        schema_version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if schema_version == 0:
+            if connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                                  "AND name = 'packages'").fetchone() is not None:
+                raise InvalidRepositoryFile(path, "unsupported schema version 0")
+            connection.executescript(_SCHEMA)
+            connection.execute("PRAGMA user_version = %d" % SCHEMA_VERSION)
+        elif schema_version != SCHEMA_VERSION:
+            raise InvalidRepositoryFile(path, "unsupported schema version %d" % schema_version)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *a):
+        self.close()
+
+    def _package(self, row):
+        package_id, name, version, provides, dependencies = row
+        package = self._cache.get(package_id)
+        if package is None:
+            package = Package._from_raw(name, Version.from_string(version),
+                                        json.loads(provides) if provides else None,
+                                        json.loads(dependencies) if dependencies else None)
+            self._cache.put(package_id, package)
+        return package
+
+    def _query(self, sql, parameters=()):
+        return [self._package(row) for row in self._connection.execute(sql, parameters)]
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM packages").fetchone()[0]
+
+    def iter_packages(self):
+        """Return an iterator over every package contained in this repo.
+
+        Note
+        ----
+        Packages are sorted by name, then in insertion order.
+        """
+        cursor = self._connection.execute("SELECT %s FROM packages ORDER BY name, id"
+                                          % _COLUMNS)
+        for row in cursor:
+            yield self._package(row)
+
+    def list_packages(self):
+        """Return the list of every package contained in this repo."""
+        return list(self.iter_packages())
+
+    def add_package(self, package):
+        """Add the given package to the repo, replacing any package with the
+        same name and version.
+
+        Parameters
+        ----------
+        package: Package
+            Package to add
+        """
+        self.add_packages([package])
+
+    def add_packages(self, packages):
+        """Add the given packages to the repo, in a single transaction.
+
+        A package with the same name and version as a package already in the
+        repo replaces it, unless both have the same content.
+
+        Parameters
+        ----------
+        packages: iterable
+            Packages to add
+
+        Returns
+        -------
+        counts: AddedPackages
+            Namedtuple of the numbers of packages added, replaced and
+            unchanged.
+        """
+        added = replaced = unchanged = 0
+        with self._connection as connection:
+            for package in packages:
+                version = str(package.version)
+                row = connection.execute("SELECT id, fingerprint FROM packages "
+                                         "WHERE name = ? AND version = ?",
+                                         (package.name, version)).fetchone()
+                if row is not None:
+                    package_id, fingerprint = row
+                    if fingerprint == package.fingerprint:
+                        unchanged += 1
+                        continue
+                    connection.execute("DELETE FROM packages WHERE id = ?", (package_id,))
+                    # Row ids may be reused by SQLite
+                    self._cache.put(package_id, None)
+                    replaced += 1
+                else:
+                    added += 1
+                cursor = connection.execute(
+                    "INSERT INTO packages (name, version, provides, dependencies, fingerprint) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (package.name, version,
+                     _requirements_json(package.provides),
+                     _requirements_json(package.dependencies),
+                     package.fingerprint))
+                connection.executemany("INSERT INTO provides (name, package_id) VALUES (?, ?)",
+                                       [(name, cursor.lastrowid) for name in
+                                        set(provide.name for provide in package.provides)])
+        return AddedPackages(added, replaced, unchanged)
+
+    def has_package(self, package):
+        """Returns True if a package with the same name and version is present
+        in the repo."""
+        return self._connection.execute(
+            "SELECT 1 FROM packages WHERE name = ? AND version = ?",
+            (package.name, str(package.version))).fetchone() is not None
+
+    def has_package_name(self, name):
+        """Returns True if one package with the given package name is present
+        in the repo."""
+        return self._connection.execute("SELECT 1 FROM packages WHERE name = ? LIMIT 1",
+                                        (name,)).fetchone() is not None
+
+    def find_package(self, name, version):
+        """Find the package with the given name and version (Version instance
+        or string), or None if not found."""
+        packages = self._query("SELECT %s FROM packages WHERE name = ? AND version = ?"
+                               % _COLUMNS, (name, _version_string(version)))
+        if len(packages) > 0:
+            return packages[0]
+        return None
+
+    def find_packages(self, name):
+        """Returns the list of packages with the given name, sorted by
+        version."""
+        packages = self._query("SELECT %s FROM packages WHERE name = ?" % _COLUMNS, (name,))
+        return sorted(packages, key=lambda package: package.version._key)
+
+    def find_providers(self, name):
+        """Returns the list of packages whose provides include a requirement
+        on the given name."""
+        return self._query("SELECT %s FROM packages WHERE id IN "
+                           "(SELECT package_id FROM provides WHERE name = ?) ORDER BY id"
+                           % _COLUMNS, (name,))
@@ -0,0 +1,145 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from depsolver.errors \
+    import \
+        InvalidPackageIndex
+from depsolver.json_lines \
+    import \
+        iter_packages, package_from_record, package_to_record, read_repository, \
+        write_packages, write_repository
+from depsolver.package \
+    import \
+        Package
+from depsolver.repository \
+    import \
+        Repository
+from depsolver.requirement \
+    import \
+        Requirement
+
+P = Package.from_string
+R = Requirement.from_string
+
+PACKAGE_STRINGS = [
+    "mkl-10.3.0",
+    "numpy-1.6.0; depends (mkl)",
+    "numpy-1.7.0; depends (mkl >= 11.0.0, mkl != 11.0.1)",
+    "nomkl_numpy-1.7.0; provides (numpy == 1.7.0)",
+]
+
+try:
+    import lzma
+    HAS_LZMA = True
+except ImportError:
+    HAS_LZMA = False
+
+class TestJSONLines(unittest.TestCase):
+    def setUp(self):
+        self.prefix = tempfile.mkdtemp()
+        self.packages = [P(s) for s in PACKAGE_STRINGS]
+
+    def tearDown(self):
+        shutil.rmtree(self.prefix)
+
+    def test_record(self):
+        self.assertEqual(package_to_record(self.packages[1]),
+                         {"name": "numpy", "version": "1.6.0", "dependencies": ["mkl"]})
+        self.assertEqual(package_to_record(self.packages[3]),
+                         {"name": "nomkl_numpy", "version": "1.7.0",
+                          "provides": ["numpy == 1.7.0"]})
+        for package in self.packages:
+            record = package_to_record(package)
+            self.assertEqual(package_from_record(record), package)
+            self.assertEqual(package_from_record(record, lazy=True), package)
+
+    def test_record_dotted_versions(self):
+        packages = [P("foo-1.0.0-alpha.1"), P("foo-1.0.0-alpha-1"), P("foo-1.0.0+build.1"),
+                    P("bar-1.0.0; depends (foo >= 1.0.0-rc.1, foo != 1.0.0+build.1)")]
+        self.assertEqual(package_to_record(packages[0]),
+                         {"name": "foo", "version": "1.0.0-alpha.1"})
+        self.assertEqual(package_to_record(packages[3])["dependencies"],
+                         ["foo != 1.0.0+build.1", "foo >= 1.0.0-rc.1"])
+        for package in packages:
+            self.assertEqual(package_from_record(package_to_record(package)), package)
+
+        path = os.path.join(self.prefix, "index.jsonl")
+        write_packages(packages, path)
+        self.assertEqual([p.version.parts for p in iter_packages(path)],
+                         [p.version.parts for p in packages])
+
+    def test_record_compound_requirement(self):
+        """A requirement with several constraints is read back as one
+        requirement."""
+        package = Package("numpy", P("numpy-1.7.0").version,
+                          dependencies=[R("mkl >= 10.0.0, mkl < 11.0.0"), R("libgfortran")],
+                          provides=[R("blas >= 1.0.0, blas != 1.1.0")])
+        record = package_to_record(package)
+        self.assertEqual(record["dependencies"],
+                         ["libgfortran", "mkl >= 10.0.0, mkl < 11.0.0"])
+        for lazy in (False, True):
+            read = package_from_record(record, lazy=lazy)
+            self.assertEqual(len(read.dependencies), 2)
+            self.assertEqual(read.dependencies, package.dependencies)
+            self.assertEqual(read.provides, package.provides)
+            self.assertEqual(read.fingerprint, package.fingerprint)
+
+        path = os.path.join(self.prefix, "index.jsonl")
+        write_packages([package], path)
+        self.assertEqual(list(iter_packages(path, lazy=True)), [package])
+
+    def test_record_invalid_requirements(self):
+        record = {"name": "numpy", "version": "1.7.0", "dependencies": "mkl"}
+        self.assertRaises(TypeError, package_from_record, record)
+
+    def test_record_empty_requirement(self):
+        package = Package("numpy", P("numpy-1.7.0").version,
+                          dependencies=[R("mkl > 11.0.0, mkl < 10.0.0")])
+        self.assertRaises(ValueError, package_to_record, package)
+
+    def _test_round_trip(self, filename, compression="infer"):
+        path = os.path.join(self.prefix, filename)
+        self.assertEqual(write_packages(iter(self.packages), path, compression), 4)
+        self.assertEqual(list(iter_packages(path, compression)), self.packages)
+        return path
+
+    def test_round_trip(self):
+        path = self._test_round_trip("index.jsonl")
+        with open(path) as fp:
+            self.assertEqual(fp.readline(), '{"name": "mkl", "version": "10.3.0"}\n')
+
+    def test_gzip(self):
+        path = self._test_round_trip("index.jsonl.gz")
+        with gzip.open(path) as fp:
+            self.assertEqual(len(fp.readlines()), 4)
+
+        self._test_round_trip("index", compression="gzip")
+
+    @unittest.skipIf(not HAS_LZMA, "lzma is not available")
+    def test_lzma(self):
+        path = self._test_round_trip("index.jsonl.xz")
+        with lzma.open(path) as fp:
+            self.assertEqual(len(fp.readlines()), 4)
+
+    def test_repository(self):
+        path = os.path.join(self.prefix, "index.jsonl.gz")
+        write_repository(Repository(self.packages), path)
+        repository = read_repository(path, lazy=True)
+        self.assertEqual(sorted(repository.list_packages(), key=lambda p: p.package_string),
+                         sorted(self.packages, key=lambda p: p.package_string))
+
+    def test_errors(self):
+        path = os.path.join(self.prefix, "index.jsonl")
+        with open(path, "w") as fp:
+            fp.write('{"name": "mkl", "version": "10.3.0"}\n\n{"name": "mkl"}\n')
+        try:
+            list(iter_packages(path))
+            self.fail("InvalidPackageIndex not raised")
+        except InvalidPackageIndex as e:
+            self.assertEqual(e.lineno, 3)
+            self.assertEqual(e.line, '{"name": "mkl"}')
+
+        self.assertRaises(ValueError, write_packages, self.packages, path, "bz2")
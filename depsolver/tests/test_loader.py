@@ -0,0 +1,183 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from depsolver.errors \
+    import \
+        InvalidPackageIndex
+from depsolver.loader \
+    import \
+        iter_chunks, iter_index_files, load_metadata_tree, load_repository
+from depsolver.package \
+    import \
+        Package
+
+P = Package.from_string
+
+PACKAGE_STRINGS = [
+    "mkl-10.3.0",
+    "mkl-11.0.0",
+    "numpy-1.6.0; depends (mkl)",
+    "numpy-1.7.0; depends (mkl >= 11.0.0)",
+    "nomkl_numpy-1.7.0; provides (numpy == 1.7.0)",
+]
+
+class TestLoader(unittest.TestCase):
+    def setUp(self):
+        self.prefix = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.prefix)
+
+    def _write(self, filename, lines):
+        path = os.path.join(self.prefix, filename)
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, "w") as fp:
+            fp.write("\n".join(lines) + "\n")
+        return path
+
+    def test_iter_index_files(self):
+        b = self._write("b.txt", [])
+        a = self._write(os.path.join("sub", "a.txt"), [])
+        self._write(".hidden", [])
+
+        self.assertEqual(list(iter_index_files(self.prefix)), [b, a])
+        self.assertEqual(list(iter_index_files(a)), [a])
+
+    def test_iter_chunks(self):
+        path = self._write("index.txt", ["# comment", "mkl-10.3.0", "", "mkl-11.0.0",
+                                         "numpy-1.6.0"])
+        self.assertEqual(list(iter_chunks([path], chunk_size=2)),
+                         [(path, [(2, "mkl-10.3.0"), (4, "mkl-11.0.0")]),
+                          (path, [(5, "numpy-1.6.0")])])
+
+    def test_simple(self):
+        path = self._write("index.txt", PACKAGE_STRINGS)
+        r_packages = [P(s) for s in PACKAGE_STRINGS]
+
+        repository = load_repository(path, processes=1)
+        self.assertEqual(repository.list_packages(), r_packages)
+
+        repository = load_repository(self.prefix, lazy=True, chunk_size=2)
+        self.assertEqual(repository.list_packages(), r_packages)
+
+    def test_parallel(self):
+        self._write("a.txt", PACKAGE_STRINGS[:3])
+        self._write("b.txt", PACKAGE_STRINGS[3:])
+        r_packages = [P(s) for s in PACKAGE_STRINGS]
+
+        repository = load_repository(self.prefix, processes=2, chunk_size=1,
+                                     min_parallel_lines=0)
+        self.assertEqual(repository.list_packages(), r_packages)
+
+    def test_parallel_dotted_versions(self):
+        """Parallel loading gives the same versions as serial loading."""
+        package_strings = ["foo-1.0.0-alpha.1", "foo-1.0.0-alpha-1", "foo-1.0.0+build.1",
+                           "bar-1.0.0; depends (foo >= 1.0.0-rc.1)"]
+        self._write("index.txt", package_strings)
+
+        serial = load_repository(self.prefix, processes=1).list_packages()
+        parallel = load_repository(self.prefix, processes=2, chunk_size=1,
+                                   min_parallel_lines=0).list_packages()
+        self.assertEqual([repr(p.version) for p in parallel],
+                         [repr(p.version) for p in serial])
+        self.assertEqual([p.package_string for p in parallel], package_strings)
+
+    def test_utf8(self):
+        """Index files are read as UTF-8 by both loaders, whatever the
+        locale."""
+        with open(os.path.join(self.prefix, "index.txt"), "wb") as fp:
+            fp.write(b"# caf\xc3\xa9\nmkl-10.3.0\n")
+
+        self.assertEqual(load_repository(self.prefix, processes=1).list_packages(),
+                         [P("mkl-10.3.0")])
+        repository, stats = load_metadata_tree(self.prefix, processes=1)
+        self.assertEqual(repository.list_packages(), [P("mkl-10.3.0")])
+
+    def test_errors(self):
+        self._write("a.txt", PACKAGE_STRINGS)
+        path = self._write("b.txt", ["mkl-10.3.0", "", "numpy 1.6.0", "numpy-1.7.0"])
+
+        for processes, min_parallel_lines in ((1, 0), (2, 0)):
+            try:
+                load_repository(self.prefix, processes=processes, chunk_size=2,
+                                min_parallel_lines=min_parallel_lines)
+                self.fail("InvalidPackageIndex not raised")
+            except InvalidPackageIndex as e:
+                self.assertEqual(e.filename, path)
+                self.assertEqual(e.lineno, 3)
+                self.assertEqual(e.line, "numpy 1.6.0")
+                self.assertTrue(str(e).startswith("%s:3: " % path))
+
+class TestLoadMetadataTree(unittest.TestCase):
+    def setUp(self):
+        self.prefix = tempfile.mkdtemp()
+        for i, package_string in enumerate(PACKAGE_STRINGS):
+            subdirectory = os.path.join(self.prefix, "sub%d" % (i % 2))
+            if not os.path.exists(subdirectory):
+                os.makedirs(subdirectory)
+            with open(os.path.join(subdirectory, "%d.txt" % i), "w") as fp:
+                fp.write("# build %d\n%s\n" % (i, package_string))
+        with open(os.path.join(self.prefix, "scipy.json"), "w") as fp:
+            fp.write('{"name": "scipy", "version": "0.12.0", "dependencies": ["numpy"]}')
+
+    def tearDown(self):
+        shutil.rmtree(self.prefix)
+
+    def _r_packages(self):
+        # Files are read in the scipy.json, sub0/0.txt, sub0/2.txt, sub0/4.txt,
+        # sub1/1.txt, sub1/3.txt order, and listed by name of first occurrence
+        return [P("scipy-0.12.0; depends (numpy)")] \
+            + [P(PACKAGE_STRINGS[i]) for i in (0, 1, 2, 3, 4)]
+
+    def test_simple(self):
+        repository, stats = load_metadata_tree(self.prefix, threads=2, processes=1)
+        self.assertEqual(repository.list_packages(), self._r_packages())
+        self.assertEqual((stats.n_files, stats.n_packages), (6, 6))
+        self.assertTrue(stats.files_per_second > 0)
+
+    def test_parallel(self):
+        repository, stats = load_metadata_tree(self.prefix, lazy=True, threads=3, processes=2,
+                                               batch_size=2, min_parallel_files=0)
+        self.assertEqual(repository.list_packages(), self._r_packages())
+
+    def test_duplicates(self):
+        """Packages found in several files are counted once."""
+        with open(os.path.join(self.prefix, "sub1", "copy.txt"), "w") as fp:
+            fp.write("%s\n%s\n" % (PACKAGE_STRINGS[0], PACKAGE_STRINGS[1]))
+
+        for processes in (1, 2):
+            repository, stats = load_metadata_tree(self.prefix, processes=processes,
+                                                   batch_size=2, min_parallel_files=0)
+            self.assertEqual((stats.n_files, stats.n_packages), (7, 6))
+            self.assertEqual(stats.n_packages, len(repository.list_packages()))
+
+    def test_parallel_dotted_versions(self):
+        """Parallel loading gives the same versions as serial loading."""
+        with open(os.path.join(self.prefix, "sub0", "foo.txt"), "w") as fp:
+            fp.write("foo-1.0.0-alpha.1\nfoo-1.0.0-alpha-1\nfoo-1.0.0+build.1\n")
+
+        serial, serial_stats = load_metadata_tree(self.prefix, processes=1)
+        parallel, parallel_stats = load_metadata_tree(self.prefix, processes=2, batch_size=2,
+                                                      min_parallel_files=0)
+        self.assertEqual([repr(p.version) for p in parallel.list_packages()],
+                         [repr(p.version) for p in serial.list_packages()])
+        self.assertEqual(len(parallel.find_packages("foo")), 3)
+        self.assertEqual(parallel_stats.n_packages, serial_stats.n_packages)
+
+    def test_errors(self):
+        path = os.path.join(self.prefix, "sub1", "4.txt")
+        with open(path, "w") as fp:
+            fp.write("\nnumpy 1.6.0\n")
+
+        for processes in (1, 2):
+            try:
+                load_metadata_tree(self.prefix, processes=processes, batch_size=2,
+                                   min_parallel_files=0)
+                self.fail("InvalidPackageIndex not raised")
+            except InvalidPackageIndex as e:
+                self.assertEqual(e.filename, path)
+                self.assertEqual(e.lineno, 2)
+                self.assertEqual(e.line, "numpy 1.6.0")
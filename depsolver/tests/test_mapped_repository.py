@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from depsolver.errors \
+    import \
+        InvalidRepositoryFile
+from depsolver.mapped_repository \
+    import \
+        MappedRepository, write_repository
+from depsolver.package \
+    import \
+        Package
+from depsolver.repository \
+    import \
+        Repository
+from depsolver.version \
+    import \
+        Version
+
+P = Package.from_string
+V = Version.from_string
+
+PACKAGE_STRINGS = [
+    "numpy-1.7.0; depends (mkl >= 11.0.0, mkl < 12.0.0)",
+    "mkl-11.0.0",
+    "mkl-10.3.0",
+    "numpy-1.6.0; depends (mkl)",
+    "nomkl_numpy-1.7.0; provides (numpy == 1.7.0)",
+    "scipy-0.12.0; depends (numpy != 1.6.0, mkl == 11.0.0)",
+]
+
+class TestMappedRepository(unittest.TestCase):
+    def setUp(self):
+        self.prefix = tempfile.mkdtemp()
+        self.path = os.path.join(self.prefix, "repository.bin")
+        self.packages = [P(s) for s in PACKAGE_STRINGS]
+        write_repository(Repository(self.packages), self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.prefix)
+
+    def test_iter_packages(self):
+        r_packages = sorted(self.packages, key=lambda p: (p.name, p.version))
+        with MappedRepository(self.path) as repository:
+            self.assertEqual(len(repository), 6)
+            self.assertEqual(repository.list_packages(), r_packages)
+            self.assertEqual([p.package_string for p in repository.iter_packages()],
+                             [p.package_string for p in r_packages])
+
+    def test_lazy(self):
+        with MappedRepository(self.path) as repository:
+            self.assertEqual(repository._packages, {})
+            repository.find_package("numpy", "1.7.0")
+            self.assertEqual(len(repository._packages), 1)
+
+    def test_find_package(self):
+        with MappedRepository(self.path) as repository:
+            self.assertEqual(repository.find_package("numpy", "1.7.0"), P(PACKAGE_STRINGS[0]))
+            self.assertEqual(repository.find_package("mkl", V("10.3.0")), P("mkl-10.3.0"))
+            self.assertTrue(repository.find_package("mkl", "10.3.1") is None)
+            self.assertTrue(repository.find_package("floupi", "1.0.0") is None)
+
+            self.assertTrue(repository.has_package(P("mkl-11.0.0")))
+            self.assertFalse(repository.has_package(P("mkl-12.0.0")))
+
+            self.assertTrue(repository.has_package_name("scipy"))
+            self.assertFalse(repository.has_package_name("floupi"))
+
+    def test_find_packages(self):
+        with MappedRepository(self.path) as repository:
+            self.assertEqual(repository.find_packages("mkl"),
+                             [P("mkl-10.3.0"), P("mkl-11.0.0")])
+            self.assertEqual(repository.find_packages("floupi"), [])
+
+    def test_find_providers(self):
+        with MappedRepository(self.path) as repository:
+            self.assertEqual(repository.find_providers("numpy"), [P(PACKAGE_STRINGS[4])])
+            self.assertEqual(repository.find_providers("mkl"), [])
+
+    def test_dotted_versions(self):
+        package_strings = ["foo-1.0.0+build.1", "foo-1.0.0-alpha-1", "foo-1.0.0-alpha.1",
+                           "bar-1.0.0; depends (foo >= 1.0.0-rc.1, foo != 1.0.0+build.1)"]
+        packages = [P(s) for s in package_strings]
+        write_repository(Repository(packages), self.path)
+        with MappedRepository(self.path) as repository:
+            self.assertEqual(sorted(p.package_string for p in repository.iter_packages()),
+                             sorted(p.package_string for p in packages))
+            self.assertEqual(repository.find_package("foo", "1.0.0-alpha.1").version.parts,
+                             (1, 0, 0, ("alpha", "1")))
+            self.assertEqual(repository.find_package("foo", "1.0.0-alpha-1").version.parts,
+                             (1, 0, 0, ("alpha-1",)))
+            self.assertEqual(repository.find_package("bar", "1.0.0"), packages[3])
+
+    def test_empty(self):
+        write_repository(Repository(), self.path)
+        with MappedRepository(self.path) as repository:
+            self.assertEqual(len(repository), 0)
+            self.assertEqual(repository.list_packages(), [])
+            self.assertEqual(repository.find_packages("numpy"), [])
+
+    def test_invalid(self):
+        with open(self.path, "wb") as fp:
+            fp.write(b"numpy-1.6.0\n")
+        self.assertRaises(InvalidRepositoryFile, MappedRepository, self.path)
+
+        with open(self.path, "wb") as fp:
+            pass
+        self.assertRaises(InvalidRepositoryFile, MappedRepository, self.path)
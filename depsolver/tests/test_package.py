@@ -1,8 +1,9 @@
-import hashlib
+import pickle
 import unittest
 
-import six
-
+from depsolver.errors \
+    import \
+        DepSolverError
 from depsolver.package \
     import \
         Package
@@ -19,19 +20,15 @@ R = Requirement.from_string
 class TestPackage(unittest.TestCase):
     def test_construction(self):
         r_provides = ()
-        r_id = hashlib.md5(six.b("numpy-1.3.0")).hexdigest()
 
         package = Package("numpy", V("1.3.0"))
         self.assertEqual(package.provides, r_provides)
         self.assertEqual(package.dependencies, ())
-        self.assertEqual(package.id, r_id)
 
         r_provides = (R("numpy == 1.3.0"),)
-        r_id = hashlib.md5(six.b("nomkl_numpy-1.3.0")).hexdigest()
 
         package = Package("nomkl_numpy", V("1.3.0"), provides=r_provides)
         self.assertEqual(package.provides, r_provides)
-        self.assertEqual(package.id, r_id)
 
     def test_unique_name(self):
         package = Package("numpy", V("1.3.0"))
@@ -49,6 +46,54 @@ class TestPackage(unittest.TestCase):
         package = Package("numpy", V("1.6.0"), dependencies=[R("mkl >= 10.3.0")])
         self.assertEqual(repr(package), "Package('numpy-1.6.0; depends (mkl >= 10.3.0)')")
 
+    def test_hash(self):
+        package = Package("numpy", V("1.6.0"), dependencies=[R("mkl >= 10.3.0")])
+        self.assertEqual(hash(package), hash(Package.from_string(package.package_string)))
+        self.assertFalse(hasattr(package, "__dict__"))
+
+    def test_fingerprint(self):
+        package = Package.from_string("numpy-1.6.0; depends (scipy, mkl >= 10.3.0, scipy)")
+        self.assertEqual(len(package.fingerprint), 40)
+        self.assertEqual(package.fingerprint,
+                         Package.from_string("numpy-1.6.0; depends (mkl >= 10.3.0, scipy)")
+                         .fingerprint)
+
+        lazy = Package.from_string("numpy-1.6.0; depends (mkl >= 10.3.0, scipy)", lazy=True)
+        self.assertEqual(lazy.fingerprint, package.fingerprint)
+        self.assertEqual(lazy, package)
+
+        changed = Package.from_string("numpy-1.6.0; depends (mkl >= 10.3.1, scipy)")
+        self.assertNotEqual(changed.fingerprint, package.fingerprint)
+        self.assertNotEqual(changed, package)
+        self.assertNotEqual(package, "numpy-1.6.0")
+
+    def test_fingerprint_dotted_versions(self):
+        """Packages only differing by their version identifiers separators are
+        distinct."""
+        P = Package.from_string
+        for left, right in (("foo-1.0.0-alpha.1", "foo-1.0.0-alpha-1"),
+                            ("foo-1.0.0+build.1", "foo-1.0.0+build-1"),
+                            ("foo-1.0.0; depends (bar >= 1.0.0-rc.1)",
+                             "foo-1.0.0; depends (bar >= 1.0.0-rc-1)")):
+            self.assertNotEqual(P(left).fingerprint, P(right).fingerprint)
+            self.assertNotEqual(P(left), P(right))
+            self.assertEqual(len(set([P(left), P(right)])), 2)
+
+    def test_pickle(self):
+        package = Package("numpy", V("1.6.0"), dependencies=[R("mkl >= 10.3.0")])
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            unpickled = pickle.loads(pickle.dumps(package, protocol))
+            self.assertEqual(unpickled, package)
+            self.assertEqual(hash(unpickled), hash(package))
+
+    def test_lazy_pickle(self):
+        r_package = Package("numpy", V("1.6.0"), dependencies=[R("mkl >= 10.3.0")])
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            package = Package.from_string(r_package.package_string, lazy=True)
+            unpickled = pickle.loads(pickle.dumps(package, protocol))
+            self.assertEqual(unpickled._raw_dependencies, "mkl >= 10.3.0")
+            self.assertEqual(unpickled, r_package)
+
 class TestPackageFromString(unittest.TestCase):
     def test_simple(self):
         r_package = Package("numpy", V("1.3.0"))
@@ -67,3 +112,50 @@ class TestPackageFromString(unittest.TestCase):
         package = Package.from_string("nomkl_numpy-1.6.0; provides (numpy == 1.6.0)")
 
         self.assertEqual(package, r_package)
+
+    def test_lazy(self):
+        package_string = "nomkl_numpy-1.6.0; depends (mkl >= 10.3.0, mkl); " \
+                         "provides (numpy == 1.6.0)"
+        r_package = Package.from_string(package_string)
+
+        package = Package.from_string(package_string, lazy=True)
+        self.assertEqual(package._dependencies, None)
+        self.assertEqual(package._provides, None)
+        self.assertEqual(hash(package), hash(r_package))
+
+        self.assertEqual(package.dependencies, r_package.dependencies)
+        self.assertEqual(package._raw_dependencies, None)
+        self.assertEqual(package.provides, r_package.provides)
+        self.assertEqual(package, r_package)
+        self.assertEqual(package.package_string, r_package.package_string)
+
+        package = Package.from_string("numpy-1.6.0", lazy=True)
+        self.assertEqual(package.provides, ())
+        self.assertEqual(package.dependencies, ())
+
+    def test_lazy_hash(self):
+        """Hashing lazy packages, or comparing packages with different names
+        or versions, does not parse their requirements."""
+        P = Package.from_string
+        packages = [P("numpy-1.6.0; depends (mkl)", lazy=True),
+                    P("numpy-1.7.0; depends (mkl)", lazy=True),
+                    P("scipy-0.12.0; depends (numpy)", lazy=True)]
+        self.assertEqual(len(set(packages)), 3)
+        self.assertTrue(packages[0] in dict.fromkeys(packages[1:] + [packages[0]]))
+        self.assertNotEqual(packages[0], packages[1])
+        for package in packages:
+            self.assertEqual(package._dependencies, None)
+            self.assertEqual(package._fingerprint, None)
+
+        self.assertEqual(packages[0], P("numpy-1.6.0; depends (mkl)", lazy=True))
+        self.assertNotEqual(packages[0], P("numpy-1.6.0; depends (mkl >= 1.0.0)", lazy=True))
+
+    def test_lazy_errors(self):
+        """Requirements errors are raised on first access."""
+        package = Package.from_string("numpy-1.6.0; depends (mkl >=)", lazy=True)
+        self.assertRaises(DepSolverError, lambda: package.dependencies)
+
+        self.assertRaises(ValueError,
+                          lambda: Package.from_string("numpy-1.6.0; depends mkl", lazy=True))
+        self.assertRaises(ValueError,
+                          lambda: Package.from_string("numpy 1.6.0", lazy=True))
@@ -16,6 +16,9 @@ from depsolver.repository \
 from depsolver.requirement \
     import \
         Requirement
+from depsolver.sqlite_repository \
+    import \
+        SQLiteRepository
 from depsolver.version \
     import \
         Version
@@ -40,17 +43,29 @@ class TestPool(unittest.TestCase):
         pool = Pool()
         pool.add_repository(repo1)
 
-        self.assertEqual(mkl_10_1_0, pool.package_by_id(mkl_10_1_0.id))
-        self.assertEqual(mkl_10_2_0, pool.package_by_id(mkl_10_2_0.id))
-        self.assertRaises(MissingPackageInPool, lambda: pool.package_by_id(mkl_10_3_0.id))
+        self.assertEqual(mkl_10_1_0, pool.package_by_id(pool.package_id(mkl_10_1_0)))
+        self.assertEqual(mkl_10_2_0, pool.package_by_id(pool.package_id(mkl_10_2_0)))
+        self.assertRaises(MissingPackageInPool, lambda: pool.package_id(mkl_10_3_0))
 
     def test_simple2(self):
         repo = Repository([mkl_10_1_0, mkl_10_2_0])
         pool = Pool([repo])
 
-        self.assertEqual(mkl_10_1_0, pool.package_by_id(mkl_10_1_0.id))
-        self.assertEqual(mkl_10_2_0, pool.package_by_id(mkl_10_2_0.id))
-        self.assertRaises(MissingPackageInPool, lambda: pool.package_by_id(mkl_10_3_0.id))
+        self.assertEqual(mkl_10_1_0, pool.package_by_id(pool.package_id(mkl_10_1_0)))
+        self.assertEqual(mkl_10_2_0, pool.package_by_id(pool.package_id(mkl_10_2_0)))
+        self.assertRaises(MissingPackageInPool, lambda: pool.package_id(mkl_10_3_0))
+
+    def test_package_ids(self):
+        """Package ids are dense integers assigned by the pool."""
+        pool = Pool([Repository([mkl_10_1_0, mkl_10_2_0])])
+        self.assertEqual(sorted([pool.package_id(mkl_10_1_0), pool.package_id(mkl_10_2_0)]),
+                         [1, 2])
+
+        pool.add_repository(Repository([mkl_10_2_0, mkl_10_3_0]))
+        self.assertEqual(pool.package_id(mkl_10_3_0), 3)
+
+        for package_id in (0, 4, -1, "1"):
+            self.assertRaises(MissingPackageInPool, lambda: pool.package_by_id(package_id))
 
     def test_has_package(self):
         pool = Pool([Repository([mkl_10_1_0, mkl_10_2_0])])
@@ -111,3 +126,139 @@ class TestPool(unittest.TestCase):
                          set([numpy_1_7_0]))
         self.assertEqual(set(pool.what_provides(R("numpy >= 1.6.1"), 'any')),
                          set([numpy_1_6_0, numpy_1_7_0, nomkl_numpy_1_7_0]))
+
+    def test_what_provides_sorted(self):
+        """Direct matches are returned from the highest to the lowest version."""
+        repo = Repository([mkl_10_2_0, mkl_11_0_0, mkl_10_1_0, mkl_10_3_0])
+        pool = Pool([repo])
+
+        self.assertEqual(pool.what_provides(R("mkl")),
+                         [mkl_11_0_0, mkl_10_3_0, mkl_10_2_0, mkl_10_1_0])
+        self.assertEqual(pool.what_provides(R("mkl >= 10.2.0, mkl != 10.3.0")),
+                         [mkl_11_0_0, mkl_10_2_0])
+        self.assertEqual(pool.what_provides(R("mkl >= 10.2.0, mkl != 10.3.0"), 'any'),
+                         [mkl_11_0_0, mkl_10_2_0, mkl_10_3_0, mkl_10_1_0])
+        self.assertEqual(pool.what_provides(R("mkl > 11.0.0")), [])
+
+    def test_what_provides_after_add_repository(self):
+        pool = Pool([Repository([mkl_10_1_0])])
+        self.assertEqual(pool.what_provides(R("mkl")), [mkl_10_1_0])
+
+        pool.add_repository(Repository([mkl_11_0_0]))
+        self.assertEqual(pool.what_provides(R("mkl")), [mkl_11_0_0, mkl_10_1_0])
+
+    def test_lazy_repository(self):
+        """Packages of repositories implementing find_providers are only read
+        for the names looked up."""
+        repo = SQLiteRepository(":memory:", [mkl_10_3_0, mkl_11_0_0, numpy_1_6_0,
+                                             numpy_1_7_0, nomkl_numpy_1_7_0])
+        pool = Pool([repo])
+        self.assertEqual(len(pool._packages), 1)
+
+        self.assertEqual(pool.what_provides(R("numpy"), 'include_indirect'),
+                         [numpy_1_7_0, numpy_1_6_0, nomkl_numpy_1_7_0])
+        self.assertFalse(("mkl", V("11.0.0")) in pool._key_to_id)
+
+        self.assertTrue(pool.has_package(mkl_11_0_0))
+        self.assertEqual(pool.what_provides(R("mkl")), [mkl_11_0_0, mkl_10_3_0])
+
+        pool.add_repository(SQLiteRepository(":memory:", [mkl_10_1_0]))
+        self.assertEqual(pool.what_provides(R("mkl")), [mkl_11_0_0, mkl_10_3_0, mkl_10_1_0])
+
+    def test_refresh(self):
+        repo = Repository([mkl_10_3_0, numpy_1_6_0, nomkl_numpy_1_7_0])
+        pool = Pool([repo])
+        mkl_id = pool.package_id(mkl_10_3_0)
+        nomkl_numpy_id = pool.package_id(nomkl_numpy_1_7_0)
+        self.assertEqual(pool.refresh(), 0)
+
+        repo.add_package(mkl_11_0_0)
+        repo.add_package(numpy_1_7_0)
+        repo.remove_package(nomkl_numpy_1_7_0)
+        self.assertEqual(pool.what_provides(R("mkl")), [mkl_10_3_0])
+
+        self.assertEqual(pool.refresh(), 3)
+        self.assertEqual(pool.package_id(mkl_10_3_0), mkl_id)
+        self.assertEqual(pool.what_provides(R("mkl")), [mkl_11_0_0, mkl_10_3_0])
+        self.assertEqual(pool.what_provides(R("numpy"), 'include_indirect'),
+                         [numpy_1_7_0, numpy_1_6_0])
+        self.assertFalse(pool.has_package(nomkl_numpy_1_7_0))
+        self.assertRaises(MissingPackageInPool, lambda: pool.package_by_id(nomkl_numpy_id))
+
+    def test_refresh_replaced(self):
+        nomkl_numpy_1_7_0_bis = Package("nomkl_numpy", V("1.7.0"))
+        repo = Repository([nomkl_numpy_1_7_0])
+        pool = Pool([repo])
+
+        repo.add_package(nomkl_numpy_1_7_0_bis)
+        pool.refresh()
+        self.assertEqual(pool.what_provides(R("numpy")), [])
+        self.assertTrue(pool.package_by_id(1) is nomkl_numpy_1_7_0_bis)
+
+        repo.remove_package(nomkl_numpy_1_7_0_bis)
+        pool.refresh()
+        self.assertEqual(pool.what_provides(R("numpy")), [])
+        self.assertEqual(pool.what_provides(R("nomkl_numpy")), [])
+
+    def test_refresh_other_repository(self):
+        """A package removed from a repository stays in the pool if another
+        repository has it."""
+        repo1 = Repository([mkl_10_3_0])
+        repo2 = Repository([Package("mkl", V("10.3.0"))])
+        pool = Pool([repo1, repo2])
+
+        repo2.remove_package(mkl_10_3_0)
+        pool.refresh()
+        self.assertEqual(pool.what_provides(R("mkl")), [mkl_10_3_0])
+
+    def test_refresh_truncated_journal(self):
+        repo = Repository([mkl_10_1_0], journal_size=2)
+        pool = Pool([repo])
+        repo.add_packages([mkl_10_2_0, mkl_10_3_0, mkl_11_0_0])
+
+        self.assertTrue(pool.refresh() is None)
+        self.assertEqual(pool.what_provides(R("mkl")),
+                         [mkl_11_0_0, mkl_10_3_0, mkl_10_2_0, mkl_10_1_0])
+        self.assertEqual(pool.refresh(), 0)
+
+    def test_refresh_shadowed(self):
+        """Packages of later repositories take precedence after a refresh, as
+        when the pool is built again."""
+        P = Package.from_string
+        repo1 = Repository([P("foo-1.0.0; depends (a)")])
+        repo2 = Repository([P("foo-1.0.0; depends (b)")])
+        pool = Pool([repo1, repo2])
+        self.assertEqual(pool.package_by_id(1), P("foo-1.0.0; depends (b)"))
+
+        repo1.add_package(P("foo-1.0.0; depends (c)"))
+        self.assertEqual(pool.refresh(), 1)
+        self.assertEqual(pool.package_by_id(1), P("foo-1.0.0; depends (b)"))
+        self.assertEqual(pool.package_by_id(1), Pool([repo1, repo2]).package_by_id(1))
+
+        repo2.remove_package(P("foo-1.0.0"))
+        self.assertEqual(pool.refresh(), 1)
+        self.assertEqual(pool.package_by_id(1), P("foo-1.0.0; depends (c)"))
+        self.assertEqual(pool.package_by_id(1), Pool([repo1, repo2]).package_by_id(1))
+
+    def test_lazy_repository_shadowed(self):
+        """Packages read lazily do not replace those of repositories added
+        later."""
+        P = Package.from_string
+        repo1 = SQLiteRepository(":memory:", [P("foo-1.0.0; depends (a)")])
+        repo2 = Repository([P("foo-1.0.0; depends (b)")])
+        pool = Pool([repo1, repo2])
+        self.assertEqual(pool.what_provides(R("foo")), [P("foo-1.0.0; depends (b)")])
+
+    def test_lazy_repository_shadows_provider(self):
+        """A provider read at once is replaced by a package of a lazily read
+        repository added later, whatever the names looked up before."""
+        P = Package.from_string
+        base = Repository([P("mkl-1.0.0"), P("nomkl-1.0.0; provides (mkl)")])
+        overlay = SQLiteRepository(":memory:", [P("nomkl-1.0.0")])
+
+        pool = Pool([base, overlay])
+        self.assertEqual(pool.what_provides(R("mkl"), "include_indirect"), [P("mkl-1.0.0")])
+        pool.what_provides(R("nomkl"))
+        self.assertEqual(pool.what_provides(R("mkl"), "include_indirect"), [P("mkl-1.0.0")])
+        self.assertEqual(Pool([base, Repository(overlay.list_packages())])
+                         .what_provides(R("mkl"), "include_indirect"), [P("mkl-1.0.0")])
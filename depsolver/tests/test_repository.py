@@ -5,13 +5,14 @@ from depsolver.package \
         Package
 from depsolver.repository \
     import \
-        Repository
+        ADD, REMOVE, Repository
 from depsolver.version \
     import \
         Version
 
 numpy_1_6_1 = Package("numpy", Version.from_string("1.6.1"))
 numpy_1_7_0 = Package("numpy", Version.from_string("1.7.0"))
+numpy_1_7_0_build = Package("numpy", Version.from_string("1.7.0+build.1"))
 
 scipy_0_11_0 = Package("scipy", Version.from_string("0.11.0"))
 
@@ -26,6 +27,15 @@ class TestRepository(unittest.TestCase):
         packages = set(repo.iter_packages())
         self.assertEqual(packages, set(r_packages))
 
+    def test_from_package_strings(self):
+        package_strings = ["numpy-1.6.1", "numpy-1.7.0; depends (mkl >= 10.3.0)"]
+        r_packages = set(Package.from_string(s) for s in package_strings)
+
+        self.assertEqual(set(Repository.from_package_strings(package_strings).iter_packages()),
+                         r_packages)
+        repo = Repository.from_package_strings(package_strings, lazy=True)
+        self.assertEqual(set(repo.iter_packages()), r_packages)
+
     def test_has_package(self):
         packages = [numpy_1_6_1, numpy_1_7_0, scipy_0_11_0]
         repo = Repository(packages)
@@ -43,3 +53,86 @@ class TestRepository(unittest.TestCase):
 
         self.assertTrue(repo.has_package(numpy_1_6_1))
         self.assertTrue(repo.has_package_name("numpy"))
+
+    def test_add_packages(self):
+        repo = Repository([numpy_1_6_1])
+
+        counts = repo.add_packages([numpy_1_6_1, numpy_1_7_0, scipy_0_11_0])
+        self.assertEqual(counts, (2, 0, 1))
+        self.assertEqual(counts.added, 2)
+
+        # Re-adding packages does not duplicate them
+        numpy_1_7_0_copy = Package("numpy", Version.from_string("1.7.0"))
+        numpy_1_7_0_changed = Package.from_string("numpy-1.7.0; depends (mkl)")
+        counts = repo.add_packages([numpy_1_7_0_copy, scipy_0_11_0])
+        self.assertEqual((counts.added, counts.replaced, counts.unchanged), (0, 0, 2))
+        self.assertTrue(repo.find_package("numpy", "1.7.0") is numpy_1_7_0)
+        self.assertEqual(repo.find_packages("numpy"), [numpy_1_6_1, numpy_1_7_0])
+
+        counts = repo.add_packages(iter([numpy_1_7_0_changed]))
+        self.assertEqual(counts, (0, 1, 0))
+        self.assertTrue(repo.find_package("numpy", "1.7.0") is numpy_1_7_0_changed)
+        self.assertEqual(len(repo.list_packages()), 3)
+
+    def test_find_package(self):
+        repo = Repository([numpy_1_6_1, numpy_1_7_0, numpy_1_7_0_build, scipy_0_11_0])
+
+        self.assertTrue(repo.find_package("numpy", "1.7.0") is numpy_1_7_0)
+        self.assertTrue(repo.find_package("numpy", "1.7.0+build.1") is numpy_1_7_0_build)
+        self.assertTrue(repo.find_package("numpy", "1.8.0") is None)
+        self.assertTrue(repo.find_package("scipy", "1.7.0") is None)
+        self.assertTrue(repo.find_package("floupi", "1.7.0") is None)
+
+        self.assertTrue(repo.find_package("numpy", Version(1, 7, 0)) is numpy_1_7_0)
+        self.assertTrue(repo.find_package("numpy", Version.from_string("1.7.0+build.1"))
+                        is numpy_1_7_0_build)
+        self.assertTrue(repo.find_package("numpy", Version(1, 8, 0)) is None)
+
+        self.assertTrue(repo.has_package(Package("numpy", Version(1, 7, 0))))
+        self.assertFalse(repo.has_package(Package("scipy", Version(1, 7, 0))))
+
+    def test_remove_package(self):
+        repo = Repository([numpy_1_6_1, numpy_1_7_0])
+
+        self.assertTrue(repo.remove_package(Package("numpy", Version.from_string("1.6.1"))))
+        self.assertFalse(repo.has_package(numpy_1_6_1))
+        self.assertEqual(repo.find_packages("numpy"), [numpy_1_7_0])
+
+        self.assertFalse(repo.remove_package(numpy_1_6_1))
+        self.assertFalse(repo.remove_package(scipy_0_11_0))
+
+        self.assertTrue(repo.remove_package(numpy_1_7_0))
+        self.assertFalse(repo.has_package_name("numpy"))
+
+    def test_changes_since(self):
+        repo = Repository([numpy_1_6_1])
+        self.assertEqual(repo.revision, 1)
+        # The initial packages are not journaled
+        self.assertTrue(repo.changes_since(0) is None)
+        self.assertEqual(repo.changes_since(1), [])
+
+        repo.add_packages([numpy_1_6_1, numpy_1_7_0])
+        repo.remove_package(numpy_1_6_1)
+        repo.remove_package(numpy_1_6_1)
+        self.assertEqual(repo.revision, 3)
+        self.assertEqual(repo.changes_since(1), [(ADD, numpy_1_7_0), (REMOVE, numpy_1_6_1)])
+        self.assertEqual(repo.changes_since(3), [])
+        self.assertTrue(repo.changes_since(4) is None)
+
+    def test_changes_since_unchanged(self):
+        repo = Repository([numpy_1_6_1])
+        repo.add_package(numpy_1_6_1)
+        repo.add_package(Package("numpy", Version.from_string("1.6.1")))
+        self.assertEqual(repo.revision, 1)
+        self.assertEqual(repo.changes_since(1), [])
+
+    def test_changes_since_truncated(self):
+        repo = Repository(journal_size=4)
+        for package in [numpy_1_6_1, numpy_1_7_0, numpy_1_7_0_build, scipy_0_11_0]:
+            repo.add_package(package)
+        self.assertEqual(len(repo.changes_since(0)), 4)
+
+        repo.remove_package(scipy_0_11_0)
+        self.assertEqual(repo.revision, 5)
+        self.assertTrue(repo.changes_since(0) is None)
+        self.assertEqual(repo.changes_since(3), [(ADD, scipy_0_11_0), (REMOVE, scipy_0_11_0)])
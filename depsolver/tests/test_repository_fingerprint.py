@@ -0,0 +1,134 @@
+import unittest
+
+from depsolver.package \
+    import \
+        Package
+from depsolver.repository \
+    import \
+        Repository
+from depsolver.repository_fingerprint \
+    import \
+        MerkleIndex, RepositoryDiff
+
+P = Package.from_string
+
+mkl_10_3_0 = P("mkl-10.3.0")
+mkl_11_0_0 = P("mkl-11.0.0")
+numpy_1_6_0 = P("numpy-1.6.0; depends (mkl)")
+numpy_1_7_0 = P("numpy-1.7.0; depends (mkl >= 11.0.0)")
+scipy_0_12_0 = P("scipy-0.12.0; depends (numpy)")
+
+class TestRepositoryFingerprint(unittest.TestCase):
+    def test_order_independent(self):
+        packages = [mkl_10_3_0, mkl_11_0_0, numpy_1_6_0, numpy_1_7_0]
+        fingerprint = Repository(packages).fingerprint
+        self.assertEqual(Repository(packages[::-1]).fingerprint, fingerprint)
+
+        repo = Repository(packages[:2])
+        repo.add_packages(packages[2:])
+        self.assertEqual(repo.fingerprint, fingerprint)
+
+        self.assertNotEqual(Repository(packages[:3]).fingerprint, fingerprint)
+        self.assertNotEqual(Repository().fingerprint, fingerprint)
+
+    def test_incremental(self):
+        repo = Repository([mkl_10_3_0, numpy_1_6_0])
+        fingerprint = repo.fingerprint
+
+        repo.add_package(scipy_0_12_0)
+        self.assertEqual(repo.fingerprint,
+                         Repository([mkl_10_3_0, numpy_1_6_0, scipy_0_12_0]).fingerprint)
+
+        repo.add_package(P("numpy-1.6.0; depends (mkl >= 10.3.0)"))
+        self.assertEqual(repo.fingerprint,
+                         Repository([mkl_10_3_0, P("numpy-1.6.0; depends (mkl >= 10.3.0)"),
+                                     scipy_0_12_0]).fingerprint)
+
+        repo.add_package(numpy_1_6_0)
+        repo.remove_package(scipy_0_12_0)
+        self.assertEqual(repo.fingerprint, fingerprint)
+
+    def test_same_names_in_bucket(self):
+        """Names sharing a bucket have different digests."""
+        index = MerkleIndex(n_buckets=1)
+        index.update("mkl", [mkl_10_3_0])
+        fingerprint = index.fingerprint
+        index.update("numpy", [numpy_1_6_0])
+        self.assertNotEqual(index.fingerprint, fingerprint)
+        index.update("numpy", [])
+        self.assertEqual(index.fingerprint, fingerprint)
+
+class TestRepositorySnapshot(unittest.TestCase):
+    def test_snapshot(self):
+        repo = Repository([mkl_10_3_0, numpy_1_6_0])
+        snapshot = repo.snapshot()
+        self.assertEqual(snapshot.fingerprint, repo.fingerprint)
+
+        repo.add_package(mkl_11_0_0)
+        repo.remove_package(numpy_1_6_0)
+        self.assertNotEqual(repo.fingerprint, snapshot.fingerprint)
+
+        self.assertEqual(set(snapshot.iter_packages()), set([mkl_10_3_0, numpy_1_6_0]))
+        self.assertEqual(snapshot.find_packages("mkl"), [mkl_10_3_0])
+        self.assertEqual(snapshot.find_packages("scipy"), [])
+        self.assertEqual(set(repo.snapshot().iter_packages()), set([mkl_10_3_0, mkl_11_0_0]))
+
+    def test_diff(self):
+        repo = Repository([mkl_10_3_0, numpy_1_6_0, scipy_0_12_0])
+        old = repo.snapshot()
+        self.assertEqual(old.diff(repo.snapshot()), RepositoryDiff([], []))
+
+        numpy_1_6_0_bis = P("numpy-1.6.0; depends (mkl >= 10.3.0)")
+        repo.add_packages([mkl_11_0_0, numpy_1_7_0, numpy_1_6_0_bis])
+        repo.remove_package(scipy_0_12_0)
+        new = repo.snapshot()
+
+        diff = old.diff(new)
+        self.assertEqual(diff.added, [mkl_11_0_0, numpy_1_6_0_bis, numpy_1_7_0])
+        self.assertEqual(diff.removed, [numpy_1_6_0, scipy_0_12_0])
+
+        diff = new.diff(old)
+        self.assertEqual(diff.added, [numpy_1_6_0, scipy_0_12_0])
+        self.assertEqual(diff.removed, [mkl_11_0_0, numpy_1_6_0_bis, numpy_1_7_0])
+
+    def test_diff_changed_names(self):
+        """Diffs of snapshots of the same index only compare the names
+        updated between them, whatever the size of the index."""
+        for n_names in (10, 1000):
+            index = MerkleIndex(n_buckets=4)
+            for i in range(n_names):
+                index.update("pkg%d" % i, [P("pkg%d-1.0.0" % i)])
+            old = index.snapshot()
+            index.update("pkg0", [P("pkg0-1.0.0"), P("pkg0-2.0.0")])
+            index.update("new", [P("new-1.0.0")])
+            new = index.snapshot()
+
+            self.assertEqual(old._changed_names(new), set(["pkg0", "new"]))
+            self.assertEqual(new._changed_names(old), set(["pkg0", "new"]))
+            self.assertEqual(old.diff(new), RepositoryDiff([P("new-1.0.0"), P("pkg0-2.0.0")], []))
+
+    def test_diff_without_log(self):
+        """Snapshots of different indexes, or older than the update log, are
+        diffed bucket by bucket."""
+        repo = Repository([mkl_10_3_0, numpy_1_6_0])
+        other = Repository([mkl_10_3_0, numpy_1_7_0])
+        self.assertTrue(repo.snapshot()._changed_names(other.snapshot()) is None)
+        self.assertEqual(repo.snapshot().diff(other.snapshot()),
+                         RepositoryDiff([numpy_1_7_0], [numpy_1_6_0]))
+
+        index = MerkleIndex(n_buckets=4, name_log_size=4)
+        index.update("mkl", [mkl_10_3_0])
+        old = index.snapshot()
+        for i in range(10):
+            index.update("pkg%d" % i, [P("pkg%d-1.0.0" % i)])
+        index.update("mkl", [])
+        new = index.snapshot()
+        self.assertTrue(old._changed_names(new) is None)
+        diff = old.diff(new)
+        self.assertEqual(diff.removed, [mkl_10_3_0])
+        self.assertEqual(len(diff.added), 10)
+
+    def test_diff_buckets(self):
+        index = MerkleIndex(n_buckets=4)
+        index.update("mkl", [mkl_10_3_0])
+        self.assertRaises(ValueError, index.snapshot().diff, MerkleIndex(8).snapshot())
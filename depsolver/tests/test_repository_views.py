@@ -0,0 +1,113 @@
+import unittest
+
+from depsolver.package \
+    import \
+        Package
+from depsolver.pool \
+    import \
+        Pool
+from depsolver.repository \
+    import \
+        REMOVE, Repository
+from depsolver.repository_views \
+    import \
+        FilteredRepository, LayeredRepository, SHADOW_VERSION
+from depsolver.requirement \
+    import \
+        Requirement
+from depsolver.sqlite_repository \
+    import \
+        SQLiteRepository
+
+P = Package.from_string
+R = Requirement.from_string
+
+mkl_10_3_0 = P("mkl-10.3.0")
+mkl_11_0_0 = P("mkl-11.0.0")
+numpy_1_6_0 = P("numpy-1.6.0; depends (mkl)")
+numpy_1_7_0 = P("numpy-1.7.0; depends (mkl >= 11.0.0)")
+nomkl_numpy_1_7_0 = P("nomkl_numpy-1.7.0; provides (numpy == 1.7.0)")
+
+def _not_mkl_11(package):
+    return package.unique_name != "mkl-11.0.0"
+
+class TestFilteredRepository(unittest.TestCase):
+    def setUp(self):
+        self.repository = Repository([mkl_10_3_0, mkl_11_0_0, numpy_1_6_0])
+        self.view = FilteredRepository(self.repository, _not_mkl_11)
+
+    def test_simple(self):
+        view = self.view
+        self.assertEqual(set(view.iter_packages()), set([mkl_10_3_0, numpy_1_6_0]))
+        self.assertEqual(view.find_packages("mkl"), [mkl_10_3_0])
+        self.assertEqual(view.find_package("mkl", "10.3.0"), mkl_10_3_0)
+        self.assertTrue(view.find_package("mkl", "11.0.0") is None)
+        self.assertFalse(view.has_package(mkl_11_0_0))
+        self.assertTrue(view.has_package_name("numpy"))
+        self.assertFalse(hasattr(view, "find_providers"))
+
+        self.repository.add_package(numpy_1_7_0)
+        self.assertEqual(set(view.find_packages("numpy")), set([numpy_1_6_0, numpy_1_7_0]))
+
+    def test_pool(self):
+        pool = Pool([self.view])
+        self.assertEqual(pool.what_provides(R("mkl")), [mkl_10_3_0])
+
+        self.repository.remove_package(mkl_10_3_0)
+        self.repository.add_package(P("mkl-11.0.0; depends (numpy)"))
+        self.assertEqual(self.view.changes_since(3),
+                         [(REMOVE, mkl_10_3_0), (REMOVE, P("mkl-11.0.0; depends (numpy)"))])
+        pool.refresh()
+        self.assertEqual(pool.what_provides(R("mkl")), [])
+
+    def test_lazy(self):
+        repository = SQLiteRepository(":memory:", [mkl_10_3_0, mkl_11_0_0, nomkl_numpy_1_7_0])
+        view = FilteredRepository(repository, _not_mkl_11)
+        self.assertEqual(view.find_providers("numpy"), [nomkl_numpy_1_7_0])
+
+        pool = Pool([view])
+        self.assertEqual(len(pool._packages), 1)
+        self.assertEqual(pool.what_provides(R("mkl")), [mkl_10_3_0])
+
+class TestLayeredRepository(unittest.TestCase):
+    def setUp(self):
+        self.main = Repository([mkl_10_3_0, numpy_1_6_0, nomkl_numpy_1_7_0])
+        self.overlay = Repository([mkl_11_0_0, P("numpy-1.6.0")])
+
+    def test_shadow_name(self):
+        view = LayeredRepository([self.main, self.overlay])
+        self.assertEqual(set(view.iter_packages()),
+                         set([mkl_11_0_0, P("numpy-1.6.0"), nomkl_numpy_1_7_0]))
+        self.assertEqual(view.find_packages("mkl"), [mkl_11_0_0])
+        self.assertEqual(view.find_packages("nomkl_numpy"), [nomkl_numpy_1_7_0])
+        self.assertEqual(view.find_packages("scipy"), [])
+        self.assertTrue(view.find_package("mkl", "10.3.0") is None)
+        self.assertEqual(view.find_package("numpy", "1.6.0").package_string, "numpy-1.6.0")
+        self.assertTrue(view.has_package_name("nomkl_numpy"))
+        self.assertFalse(view.has_package(mkl_10_3_0))
+
+        pool = Pool([view])
+        self.assertEqual(pool.what_provides(R("mkl")), [mkl_11_0_0])
+
+    def test_shadow_version(self):
+        view = LayeredRepository([self.main, self.overlay], SHADOW_VERSION)
+        self.assertEqual(set(view.iter_packages()),
+                         set([mkl_10_3_0, mkl_11_0_0, P("numpy-1.6.0"), nomkl_numpy_1_7_0]))
+        self.assertEqual(len(view.list_packages()), 4)
+        self.assertEqual(set(view.find_packages("mkl")), set([mkl_10_3_0, mkl_11_0_0]))
+        self.assertEqual(view.find_packages("numpy")[0].package_string, "numpy-1.6.0")
+        self.assertEqual(view.find_package("mkl", "10.3.0"), mkl_10_3_0)
+
+        pool = Pool([view])
+        self.assertEqual(pool.what_provides(R("mkl")), [mkl_11_0_0, mkl_10_3_0])
+
+    def test_lazy(self):
+        main = SQLiteRepository(":memory:", self.main.iter_packages())
+        overlay = SQLiteRepository(":memory:", [P("nomkl_numpy-1.7.0")])
+        view = LayeredRepository([main, overlay])
+        self.assertEqual(view.find_providers("numpy"), [])
+
+        self.assertFalse(hasattr(LayeredRepository([main, self.overlay]), "find_providers"))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, LayeredRepository, [self.main], "floupi")
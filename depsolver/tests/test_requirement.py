@@ -1,17 +1,27 @@
+import copy
+import pickle
+import threading
 import unittest
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from depsolver.errors \
     import \
         DepSolverError
 from depsolver.requirement \
     import \
-        Requirement, RequirementParser
+        Requirement, RequirementParser, clear_requirement_cache, \
+        requirement_cache_info, set_requirement_cache_size, \
+        DEFAULT_REQUIREMENT_CACHE_SIZE
 from depsolver.requirement_parser \
     import \
         Any, Equal, GEQ, LEQ
 from depsolver.version \
     import \
-        Version
+        Version, VersionArray
 
 V = Version.from_string
 
@@ -107,8 +117,164 @@ class TestRequirementParser(unittest.TestCase):
         self.assertTrue(numpy_requirement.matches(R("numpy >= 1.3.0")))
         self.assertTrue(numpy_requirement.matches(R("numpy <= 1.4.0")))
 
+    def test_strict_operators(self):
+        R = Requirement.from_string
+
+        numpy_requirement = R("numpy > 1.3.0, numpy < 1.5.0, numpy != 1.4.0")
+        self.assertEqual(repr(numpy_requirement),
+                         "numpy > 1.3.0, numpy < 1.5.0, numpy != 1.4.0")
+        self.assertFalse(numpy_requirement.matches(R("numpy == 1.3.0")))
+        self.assertTrue(numpy_requirement.matches(R("numpy == 1.3.1")))
+        self.assertFalse(numpy_requirement.matches(R("numpy == 1.4.0")))
+        self.assertFalse(numpy_requirement.matches(R("numpy == 1.5.0")))
+        self.assertTrue(numpy_requirement.matches(R("numpy <= 1.3.5")))
+        self.assertFalse(numpy_requirement.matches(R("numpy <= 1.3.0")))
+
+        self.assertEqual(R("numpy >= 1.3.0, numpy <= 1.3.0"), R("numpy == 1.3.0"))
+        self.assertTrue(R("numpy > 1.3.0, numpy < 1.3.0")._cannot_match)
+
+    def test_matches_version(self):
+        R = Requirement.from_string
+
+        numpy_requirement = R("numpy >= 1.3.0, numpy != 1.4.0")
+        self.assertFalse(numpy_requirement.matches_version(V("1.2.0")))
+        self.assertTrue(numpy_requirement.matches_version(V("1.3.0")))
+        self.assertFalse(numpy_requirement.matches_version(V("1.4.0")))
+        self.assertTrue(numpy_requirement.matches_version(V("1.4.0+build")))
+
+        self.assertTrue(R("numpy").matches_version(V("0.0.0")))
+        self.assertFalse(R("numpy == 1.0.0, numpy == 1.1.0").matches_version(V("1.0.0")))
+
+    def test_filter(self):
+        R = Requirement.from_string
+
+        versions = [V(s) for s in ("1.4.0", "1.5.0", "1.2.0", "1.3.0", "1.4.0+build")]
+        numpy_requirement = R("numpy >= 1.3.0, numpy != 1.4.0")
+        self.assertEqual(numpy_requirement.filter(versions),
+                         [V("1.3.0"), V("1.4.0+build"), V("1.5.0")])
+        self.assertEqual(numpy_requirement.filter(sorted(versions), presorted=True),
+                         [V("1.3.0"), V("1.4.0+build"), V("1.5.0")])
+        self.assertEqual(R("numpy").filter(versions), sorted(versions))
+        self.assertEqual(R("numpy > 2.0.0").filter(versions), [])
+        self.assertEqual(R("numpy").filter([]), [])
+
+    @unittest.skipIf(numpy is None, "numpy is not available")
+    def test_filter_mask(self):
+        R = Requirement.from_string
+
+        versions = VersionArray.from_strings(["1.4.0", "1.5.0", "1.2.0", "1.3.0"])
+        numpy_requirement = R("numpy >= 1.3.0, numpy != 1.4.0")
+        self.assertEqual(numpy_requirement.filter_mask(versions).tolist(),
+                         [False, True, False, True])
+        self.assertEqual(numpy_requirement.filter(versions), [V("1.3.0"), V("1.5.0")])
+        self.assertEqual(R("numpy == 1.0.0, numpy == 1.1.0").filter_mask(versions).tolist(),
+                         [False] * 4)
+
     def test_matches_nomatch(self):
         R = Requirement.from_string
 
         numpy_requirement = R("numpy >= 1.3.0, numpy <= 1.2.0")
         self.assertFalse(numpy_requirement.matches(R("numpy")))
+
+    def test_parse_many(self):
+        parser = RequirementParser()
+
+        r_requirements = [
+                [Requirement("numpy", [GEQ("1.3.0"), LEQ("2.0.0")])],
+                [Requirement("mkl", [Any()]), Requirement("scipy", [Any()])],
+                [Requirement("numpy", [GEQ("1.3.0"), LEQ("2.0.0")])],
+        ]
+        requirements = parser.parse_many(["numpy >= 1.3.0, numpy <= 2.0.0",
+                                          "mkl, scipy",
+                                          "numpy >= 1.3.0, numpy <= 2.0.0"])
+        self.assertEqual([sorted(r, key=repr) for r in requirements], r_requirements)
+        self.assertRaises(DepSolverError, lambda: parser.parse_many(["numpy", "numpy >="]))
+
+class TestRequirementCache(unittest.TestCase):
+    def setUp(self):
+        clear_requirement_cache()
+
+    def tearDown(self):
+        set_requirement_cache_size(DEFAULT_REQUIREMENT_CACHE_SIZE)
+        clear_requirement_cache()
+
+    def test_shared(self):
+        R = Requirement.from_string
+
+        requirement = R("numpy >= 1.3.0")
+        self.assertTrue(R("numpy >= 1.3.0") is requirement)
+        self.assertEqual(R("numpy  >=  1.3.0"), requirement)
+
+    def test_statistics(self):
+        R = Requirement.from_string
+
+        R("numpy >= 1.3.0")
+        R("numpy >= 1.3.0")
+        R("scipy")
+
+        self.assertEqual(requirement_cache_info(), (1, 2, DEFAULT_REQUIREMENT_CACHE_SIZE, 2))
+
+        set_requirement_cache_size(1)
+        self.assertEqual(requirement_cache_info().currsize, 1)
+
+    def test_invalid_not_cached(self):
+        self.assertRaises(DepSolverError,
+                lambda: Requirement.from_string("numpy <= 1.2.0, scipy >= 2.3.2"))
+        self.assertEqual(requirement_cache_info().currsize, 0)
+
+    def test_immutable(self):
+        requirement = Requirement.from_string("numpy >= 1.3.0")
+
+        def _set():
+            requirement.name = "scipy"
+        self.assertRaises(AttributeError, _set)
+
+class TestRequirementHashConsing(unittest.TestCase):
+    def test_equivalent_spellings(self):
+        R = Requirement.from_string
+
+        self.assertTrue(R("numpy >= 1.0.0, numpy >= 1.0.0") is R("numpy >= 1.0.0"))
+        self.assertTrue(R("numpy >= 1.0.0, numpy <= 1.0.0") is R("numpy == 1.0.0"))
+        self.assertTrue(R("numpy >= 1.0.0, numpy >= 0.5.0") is R("numpy >= 1.0.0"))
+        self.assertTrue(Requirement("numpy", [GEQ("1.0.0"), Any()]) is R("numpy >= 1.0.0"))
+        self.assertTrue(R("numpy >= 1.0.0") is not R("scipy >= 1.0.0"))
+        self.assertTrue(R("numpy >= 1.0.0") is not R("numpy > 1.0.0"))
+
+    def test_from_range(self):
+        R = Requirement.from_string
+
+        requirement = R("numpy >= 1.0.0, numpy != 1.2.0")
+        self.assertTrue(Requirement.from_range("numpy", requirement.version_range) is requirement)
+
+    def test_from_range_threads(self):
+        """Threads creating the same requirement get the same instance."""
+        version_range = Requirement.from_string("threaded >= 1.0.0").version_range
+        start = threading.Event()
+        requirements = []
+        def create():
+            start.wait()
+            for i in range(100):
+                requirements.append(Requirement.from_range("threaded_%d" % i, version_range))
+
+        threads = [threading.Thread(target=create) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        start.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(requirements), 800)
+        self.assertEqual(len(set(id(requirement) for requirement in requirements)), 100)
+
+    def test_dedup(self):
+        R = Requirement.from_string
+
+        requirements = set([R("numpy >= 1.0.0"), R("numpy >= 1.0.0, numpy >= 1.0.0"),
+                            R("numpy >= 1.0.0, numpy >= 0.1.0")])
+        self.assertEqual(len(requirements), 1)
+
+    def test_copy_and_pickle(self):
+        requirement = Requirement.from_string("numpy >= 1.0.0, numpy != 1.2.0")
+
+        self.assertTrue(copy.copy(requirement) is requirement)
+        self.assertTrue(copy.deepcopy(requirement) is requirement)
+        self.assertTrue(pickle.loads(pickle.dumps(requirement)) is requirement)
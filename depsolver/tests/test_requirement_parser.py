@@ -2,14 +2,15 @@ import unittest
 
 from depsolver.constraints \
     import \
-        Equal, GEQ, LEQ
+        Any, Equal, GEQ, GT, LEQ, LT, NotEqual
 from depsolver.errors \
     import \
         DepSolverError
 from depsolver.requirement_parser \
     import \
         RawRequirementParser, CommaToken, DistributionNameToken, EqualToken, \
-        GEQToken, LEQToken, VersionToken
+        GEQToken, GTToken, LEQToken, LTToken, NotEqualToken, VersionToken, \
+        scan_requirement_string
 
 class TestRawRequirementParser(unittest.TestCase):
     def test_lexer_simple(self):
@@ -62,3 +63,50 @@ class TestRawRequirementParser(unittest.TestCase):
                         GEQ("1.3.0"), LEQ("2.0.0"),
                     ]
                 })
+
+    def test_parser_strict_operators(self):
+        parse_dict = RawRequirementParser().parse("numpy > 1.3.0, numpy < 2.0.0, numpy != 1.5.0")
+        self.assertEqual(dict(parse_dict), {
+                    "numpy": [
+                        GT("1.3.0"), LT("2.0.0"), NotEqual("1.5.0"),
+                    ]
+                })
+
+        r_tokens = [DistributionNameToken("numpy"), NotEqualToken("!="),
+                VersionToken("1.3.0"), CommaToken(","),
+                DistributionNameToken("numpy"), GTToken(">"),
+                VersionToken("1.0.0"), CommaToken(","),
+                DistributionNameToken("numpy"), LTToken("<"),
+                VersionToken("2.0.0")]
+        tokens = list(RawRequirementParser().tokenize("numpy != 1.3.0, numpy > 1.0.0, numpy < 2.0.0"))
+        self.assertEqual(tokens, r_tokens)
+
+    def test_parse_many(self):
+        parsed = RawRequirementParser().parse_many(["numpy >= 1.3.0", "mkl", "numpy >= 1.3.0"])
+        self.assertEqual([dict(p) for p in parsed], [
+                    {"numpy": [GEQ("1.3.0")]},
+                    {"mkl": [Any()]},
+                    {"numpy": [GEQ("1.3.0")]},
+                ])
+
+class TestScanRequirementString(unittest.TestCase):
+    def test_simple(self):
+        self.assertEqual(scan_requirement_string("numpy"), [("numpy", None, None)])
+        self.assertEqual(scan_requirement_string("numpy >= 1.3.0"), [("numpy", ">=", "1.3.0")])
+        self.assertEqual(scan_requirement_string("numpy<=1.3.0"), [("numpy", "<=", "1.3.0")])
+        self.assertEqual(scan_requirement_string("numpy == 1.3.0-rc1+build.2"),
+                         [("numpy", "==", "1.3.0-rc1+build.2")])
+        self.assertEqual(scan_requirement_string(""), [])
+        self.assertEqual(scan_requirement_string("numpy>1.0.0,numpy<2.0.0,numpy!=1.5.0"),
+                         [("numpy", ">", "1.0.0"), ("numpy", "<", "2.0.0"),
+                          ("numpy", "!=", "1.5.0")])
+
+    def test_compounds(self):
+        self.assertEqual(scan_requirement_string("numpy >= 1.3.0, numpy <= 2.0.0, mkl,"),
+                         [("numpy", ">=", "1.3.0"), ("numpy", "<=", "2.0.0"), ("mkl", None, None)])
+
+    def test_invalids(self):
+        invalids = ["numpy >= 1.2.3 | numpy <= 2.0.0", "numpy >= ", "numpy,,",
+                    "numpy numpy numpy", "numpy 1.0", ">= 1.0", "1.0 >= numpy"]
+        for invalid in invalids:
+            self.assertRaises(DepSolverError, lambda: scan_requirement_string(invalid))
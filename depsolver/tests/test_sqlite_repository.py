@@ -0,0 +1,139 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from depsolver.errors \
+    import \
+        InvalidRepositoryFile
+from depsolver.package \
+    import \
+        Package
+from depsolver.repository \
+    import \
+        AddedPackages
+from depsolver.requirement \
+    import \
+        Requirement
+from depsolver.sqlite_repository \
+    import \
+        SCHEMA_VERSION, SQLiteRepository
+from depsolver.version \
+    import \
+        Version
+
+P = Package.from_string
+R = Requirement.from_string
+V = Version.from_string
+
+mkl_10_3_0 = P("mkl-10.3.0")
+mkl_11_0_0 = P("mkl-11.0.0")
+numpy_1_6_0 = P("numpy-1.6.0; depends (mkl)")
+numpy_1_7_0 = P("numpy-1.7.0; depends (mkl >= 11.0.0, mkl != 11.0.1)")
+nomkl_numpy_1_7_0 = P("nomkl_numpy-1.7.0; provides (numpy == 1.7.0)")
+
+class TestSQLiteRepository(unittest.TestCase):
+    def setUp(self):
+        self.prefix = tempfile.mkdtemp()
+        self.path = os.path.join(self.prefix, "repository.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.prefix)
+
+    def test_simple(self):
+        packages = [numpy_1_7_0, mkl_11_0_0, numpy_1_6_0, mkl_10_3_0, nomkl_numpy_1_7_0]
+        with SQLiteRepository(self.path, packages) as repository:
+            self.assertEqual(len(repository), 5)
+
+        with SQLiteRepository(self.path) as repository:
+            self.assertEqual(repository.list_packages(),
+                             [mkl_11_0_0, mkl_10_3_0, nomkl_numpy_1_7_0, numpy_1_7_0,
+                              numpy_1_6_0])
+            self.assertEqual([p.package_string for p in repository.iter_packages()],
+                             [p.package_string for p in repository.list_packages()])
+
+    def test_find_package(self):
+        with SQLiteRepository(self.path, [mkl_10_3_0, numpy_1_7_0]) as repository:
+            self.assertEqual(repository.find_package("numpy", "1.7.0"), numpy_1_7_0)
+            self.assertEqual(repository.find_package("mkl", V("10.3.0")), mkl_10_3_0)
+            self.assertTrue(repository.find_package("mkl", "11.0.0") is None)
+            self.assertTrue(repository.find_package("floupi", "1.0.0") is None)
+
+            self.assertTrue(repository.has_package(numpy_1_7_0))
+            self.assertFalse(repository.has_package(numpy_1_6_0))
+
+            self.assertTrue(repository.has_package_name("mkl"))
+            self.assertFalse(repository.has_package_name("floupi"))
+
+    def test_find_packages(self):
+        packages = [mkl_11_0_0, mkl_10_3_0, nomkl_numpy_1_7_0]
+        with SQLiteRepository(self.path, packages) as repository:
+            self.assertEqual(repository.find_packages("mkl"), [mkl_10_3_0, mkl_11_0_0])
+            self.assertEqual(repository.find_packages("floupi"), [])
+            self.assertEqual(repository.find_providers("numpy"), [nomkl_numpy_1_7_0])
+            self.assertEqual(repository.find_providers("mkl"), [])
+
+    def test_add_packages(self):
+        with SQLiteRepository(self.path, [mkl_10_3_0, numpy_1_6_0]) as repository:
+            numpy_1_6_0_bis = P("numpy-1.6.0; depends (mkl >= 10.3.0)")
+            self.assertEqual(repository.add_packages([P("mkl-10.3.0"), numpy_1_6_0_bis,
+                                                      mkl_11_0_0]),
+                             AddedPackages(1, 1, 1))
+            self.assertEqual(len(repository), 3)
+            self.assertEqual(repository.find_package("numpy", "1.6.0").package_string,
+                             numpy_1_6_0_bis.package_string)
+
+            repository.add_package(nomkl_numpy_1_7_0)
+            repository.add_package(P("nomkl_numpy-1.7.0"))
+            self.assertEqual(repository.find_providers("numpy"), [])
+
+    def test_dotted_versions(self):
+        packages = [P("foo-1.0.0-alpha.1"), P("foo-1.0.0-alpha-1"), P("foo-1.0.0+build.1"),
+                    P("bar-1.0.0; depends (foo >= 1.0.0-rc.1, foo != 1.0.0+build.1)")]
+        with SQLiteRepository(self.path, packages) as repository:
+            self.assertEqual(len(repository), 4)
+        with SQLiteRepository(self.path) as repository:
+            self.assertEqual(repository.add_packages(packages), AddedPackages(0, 0, 4))
+            self.assertEqual(repository.find_package("foo", "1.0.0-alpha.1").version.parts,
+                             (1, 0, 0, ("alpha", "1")))
+            self.assertEqual(repository.find_package("foo", "1.0.0-alpha-1").version.parts,
+                             (1, 0, 0, ("alpha-1",)))
+            self.assertEqual(repository.find_package("foo", "1.0.0+build.1"), packages[2])
+            self.assertEqual(repository.find_package("bar", "1.0.0").package_string,
+                             packages[3].package_string)
+
+    def test_compound_requirement(self):
+        """A requirement with several constraints is read back as one
+        requirement."""
+        package = Package("numpy", V("1.7.0"),
+                          dependencies=[R("mkl >= 10.0.0, mkl < 11.0.0"), R("libgfortran")],
+                          provides=[R("blas >= 1.0.0, blas != 1.1.0")])
+        with SQLiteRepository(self.path, [package]) as repository:
+            pass
+        with SQLiteRepository(self.path) as repository:
+            stored = repository.find_package("numpy", "1.7.0")
+            self.assertEqual(stored.dependencies, package.dependencies)
+            self.assertEqual(stored.provides, package.provides)
+            self.assertEqual(stored.fingerprint, package.fingerprint)
+            self.assertEqual(repository.find_providers("blas"), [package])
+            self.assertEqual(repository.add_packages([package]), AddedPackages(0, 0, 1))
+
+    def test_schema_version(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute("CREATE TABLE packages (id INTEGER PRIMARY KEY)")
+        connection.close()
+        self.assertRaises(InvalidRepositoryFile, SQLiteRepository, self.path)
+
+        for schema_version in (1, SCHEMA_VERSION + 1):
+            connection = sqlite3.connect(self.path)
+            connection.execute("PRAGMA user_version = %d" % schema_version)
+            connection.close()
+            self.assertRaises(InvalidRepositoryFile, SQLiteRepository, self.path)
+
+    def test_cache(self):
+        with SQLiteRepository(self.path, [mkl_10_3_0, mkl_11_0_0], cache_size=1) as repository:
+            package = repository.find_package("mkl", "10.3.0")
+            self.assertTrue(repository.find_package("mkl", "10.3.0") is package)
+            repository.find_package("mkl", "11.0.0")
+            self.assertFalse(repository.find_package("mkl", "10.3.0") is package)
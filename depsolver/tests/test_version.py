@@ -1,3 +1,4 @@
+import pickle
 import sys
 
 if sys.version_info[:2] < (2, 7):
@@ -5,10 +6,16 @@ if sys.version_info[:2] < (2, 7):
 else:
     import unittest
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from depsolver.version \
     import \
         BuildVersion, MaxVersion, MinVersion, PreReleaseVersion, Version, \
-        is_version_valid
+        VersionArray, clear_version_cache, is_version_valid, parse_versions, \
+        set_version_cache_size, version_cache_info, DEFAULT_VERSION_CACHE_SIZE
 
 V = Version.from_string
 P = PreReleaseVersion.from_string
@@ -27,7 +34,7 @@ class TestVersionParsing(unittest.TestCase):
 
     def test_invalid_versions(self):
         versions = [
-            "1.2", "1.2.a",
+            "1.2", "1.2.a", "1a2b3",
         ]
         for version in versions:
             self.assertFalse(is_version_valid(version))
@@ -36,7 +43,8 @@ class TestVersion(unittest.TestCase):
     def test_construction_simple(self):
         r_v = V("1.2.0")
         v = Version(1, 2, 0)
-        self.assertEqual(v.__dict__, r_v.__dict__)
+        self.assertEqual(v.parts, r_v.parts)
+        self.assertEqual(v._key, r_v._key)
 
     def test_invalid_arguments(self):
         self.assertRaises(Exception, lambda: Version("a", 2, 0))
@@ -58,7 +66,8 @@ class TestVersion(unittest.TestCase):
             self.assertEqual(repr(version), r_version_string)
 
     def test_str(self):
-        r_version_strings = ["1.2.0", "1.2.0-alpha", "1.2.0+build"]
+        r_version_strings = ["1.2.0", "1.2.0-alpha", "1.2.0+build", "1.2.0-alpha.1+build.2",
+                             "1.2.0-alpha-1+build-2"]
         for r_version_string in r_version_strings:
             version = V(r_version_string)
             self.assertEqual(str(version), r_version_string)
@@ -141,6 +150,70 @@ class TestVersionComparison(unittest.TestCase):
             self.assertGreater(left, right)
             self.assertGreaterEqual(left, right)
 
+    def test_identifiers_precedence(self):
+        # numeric identifiers always have a lower precedence than
+        # alphanumeric ones, and are compared numerically
+        self.assertLess(V("1.0.0-1"), V("1.0.0-a"))
+        self.assertLess(V("1.0.0-alpha.2"), V("1.0.0-alpha.10"))
+        self.assertLess(V("1.0.0-alpha.1"), V("1.0.0-alpha.beta"))
+        self.assertGreater(V("1.0.0-1a"), V("1.0.0-1"))
+
+    def test_sort_key(self):
+        versions = [V("1.0.0+0.3.7"), V("1.0.0-rc.1"), V("0.9.0"),
+                    V("1.0.0"), V("1.0.0-alpha"), V("1.0.0-rc.1+build.1")]
+        r_sorted_versions = [V("0.9.0"), V("1.0.0-alpha"), V("1.0.0-rc.1"),
+                             V("1.0.0-rc.1+build.1"), V("1.0.0"), V("1.0.0+0.3.7")]
+
+        self.assertEqual(sorted(versions, key=lambda v: v._key), r_sorted_versions)
+        self.assertEqual(sorted(versions), r_sorted_versions)
+
+        key = V("1.2.0-alpha+build")._key
+        self.assertEqual(hash(key), hash(V("1.2.0-alpha+build")._key))
+
+class TestVersionHashing(unittest.TestCase):
+    def test_hash(self):
+        self.assertEqual(hash(Version(1, 2, 0)), hash(V("1.2.0")))
+        self.assertEqual(hash(P("alpha.1")), hash(P("alpha.1")))
+        self.assertEqual(hash(B("build.1")), hash(B("build.1")))
+
+    def test_dict_keys(self):
+        d = {V("1.2.0"): "a", V("1.2.0-alpha"): "b", V("1.2.0+build"): "c"}
+        self.assertEqual(d[Version(1, 2, 0)], "a")
+        self.assertEqual(d[Version(1, 2, 0, P("alpha"))], "b")
+        self.assertEqual(d[Version(1, 2, 0, build=B("build"))], "c")
+
+        self.assertEqual(len(set([V("1.2.0"), Version(1, 2, 0), MinVersion(),
+                                  MinVersion(), MaxVersion()])), 3)
+
+    def test_slots(self):
+        for version in (V("1.2.0-alpha+build"), P("alpha"), B("build"), MinVersion(),
+                        MaxVersion()):
+            self.assertFalse(hasattr(version, "__dict__"))
+
+    def test_pickle(self):
+        version = V("1.2.0-alpha+build")
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            self.assertTrue(pickle.loads(pickle.dumps(version, protocol)) is version)
+            for value in (P("alpha"), B("build"), MinVersion(), MaxVersion()):
+                unpickled = pickle.loads(pickle.dumps(value, protocol))
+                self.assertEqual(unpickled, value)
+                self.assertEqual(hash(unpickled), hash(value))
+
+    def test_pickle_dotted_parts(self):
+        """Pickles do not depend on the version string, nor on the cache."""
+        for version_string in ("1.0.0-alpha.1", "1.0.0+build.1", "1.0.0-rc.1+build.2.b"):
+            data = pickle.dumps(V(version_string))
+            clear_version_cache()
+            version = pickle.loads(data)
+            self.assertEqual(str(version), version_string)
+            self.assertTrue(version is V(version_string))
+        clear_version_cache()
+
+    def test_eq_other_types(self):
+        self.assertFalse(V("1.2.0") == "1.2.0")
+        self.assertTrue(V("1.2.0") != "1.2.0")
+        self.assertRaises(TypeError, lambda: V("1.2.0") < "1.2.0")
+
 class TestPreReleaseVersionComparison(unittest.TestCase):
     def test_simple_eq(self):
         self.assertTrue(V("1.2.0") == V("1.2.0"))
@@ -184,3 +257,161 @@ class TestMinMaxVersion(unittest.TestCase):
         self.assertTrue(max_version >= V("99.99.99"))
         self.assertFalse(max_version < V("99.99.99"))
         self.assertFalse(max_version <= V("99.99.99"))
+
+    def test_sentinels(self):
+        self.assertTrue(MinVersion() == MinVersion())
+        self.assertTrue(MaxVersion() == MaxVersion())
+        self.assertTrue(MinVersion() < MaxVersion())
+        self.assertTrue(MinVersion() < V("0.0.0-0"))
+        self.assertTrue(MaxVersion() > V("99999.0.0+build"))
+        self.assertFalse(MaxVersion() == V("99.99.99"))
+
+class TestVersionCache(unittest.TestCase):
+    def setUp(self):
+        clear_version_cache()
+
+    def tearDown(self):
+        set_version_cache_size(DEFAULT_VERSION_CACHE_SIZE)
+        clear_version_cache()
+
+    def test_interning(self):
+        self.assertTrue(V("1.2.0-alpha+build") is V("1.2.0-alpha+build"))
+        self.assertTrue(Version.from_loose_string("1.2") is V("1.2.0"))
+        self.assertTrue(Version.from_loose_string("1.2.0") is Version.from_loose_string("1.2"))
+
+    def test_interning_dotted_parts(self):
+        """Versions only differing by their identifiers separators are not
+        interned together, whatever the parsing order."""
+        for version_strings in (["1.0.0-alpha.1", "1.0.0-alpha-1"],
+                                ["1.0.0-alpha-1", "1.0.0-alpha.1"],
+                                ["1.0.0+build.1", "1.0.0+build-1"]):
+            clear_version_cache()
+            first, second = [V(s) for s in version_strings]
+            self.assertFalse(first is second)
+            self.assertNotEqual(first, second)
+            self.assertEqual(str(first), version_strings[0])
+            self.assertEqual(str(second), version_strings[1])
+        self.assertEqual(V("1.0.0-alpha.1").pre_release.parts, ("alpha", "1"))
+
+    def test_interning_leading_zeros(self):
+        """Numeric identifiers only differing by leading zeros are not interned
+        together, whatever the parsing order."""
+        for version_strings in (["1.0.0-rc.01", "1.0.0-rc.1"],
+                                ["1.0.0-rc.1", "1.0.0-rc.01"],
+                                ["1.0.0+build.007", "1.0.0+build.7"]):
+            clear_version_cache()
+            versions = [V(s) for s in version_strings]
+            self.assertNotEqual(versions[0], versions[1])
+            for version_string in version_strings:
+                self.assertEqual(str(V(version_string)), version_string)
+        self.assertTrue(V("1.0.0-rc.01") < V("1.0.0-rc.1") < V("1.0.0-rc.2"))
+        self.assertTrue(V("1.0.0-rc.9") < V("1.0.0-rc.010"))
+
+    def test_statistics(self):
+        V("1.2.0")
+        V("1.2.0")
+        V("1.3.0")
+
+        info = version_cache_info()
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.misses, 2)
+        self.assertEqual(info.currsize, 2)
+
+        clear_version_cache()
+        self.assertEqual(version_cache_info(), (0, 0, DEFAULT_VERSION_CACHE_SIZE, 0))
+
+    def test_invalid_not_cached(self):
+        self.assertRaises(Exception, lambda: V("1.2.a"))
+        self.assertEqual(version_cache_info().currsize, 0)
+
+    def test_bounded(self):
+        set_version_cache_size(2)
+        first = V("1.0.0")
+        V("2.0.0")
+        V("3.0.0")
+        self.assertEqual(version_cache_info().currsize, 2)
+        # evicted, hence a new (but equal) instance is created
+        self.assertFalse(V("1.0.0") is first)
+        self.assertEqual(V("1.0.0"), first)
+
+    def test_immutable(self):
+        version = V("1.2.0-alpha+build")
+
+        def _set(obj, name):
+            setattr(obj, name, 3)
+        self.assertRaises(AttributeError, lambda: _set(version, "major"))
+        self.assertRaises(AttributeError, lambda: _set(version.pre_release, "parts"))
+        self.assertRaises(AttributeError, lambda: _set(version.build, "parts"))
+
+class TestParseVersions(unittest.TestCase):
+    def test_simple(self):
+        version_strings = ["1.2.0", "1.2.0-alpha", "1.2", "1.2.0", "1.2.a", "1.2"]
+
+        versions, errors = parse_versions(version_strings)
+        self.assertEqual(versions, [V("1.2.0"), V("1.2.0-alpha"), V("1.2.0")])
+        self.assertTrue(versions[0] is versions[2])
+        self.assertTrue(versions[0] is V("1.2.0"))
+        self.assertEqual(errors, [(2, "1.2"), (4, "1.2.a"), (5, "1.2")])
+
+    def test_loose(self):
+        version_strings = iter(["1.2", "1", "1.2.3.4", "1.2-123+456", "a"])
+
+        versions, errors = parse_versions(version_strings, loose=True)
+        self.assertEqual(versions, [V("1.2.0"), V("1.0.0"), V("1.2.0-123+456")])
+        self.assertEqual(errors, [(2, "1.2.3.4"), (4, "a")])
+
+    def test_empty(self):
+        self.assertEqual(parse_versions([]), ([], []))
+
+    @unittest.skipIf(numpy is None, "numpy is not available")
+    def test_as_array(self):
+        versions, errors = parse_versions(["1.2.0", "1.2", "2.0.0"], as_array=True)
+        self.assertTrue(isinstance(versions, VersionArray))
+        self.assertEqual(list(versions), [V("1.2.0"), V("2.0.0")])
+        self.assertEqual(errors, [(1, "1.2")])
+
+@unittest.skipIf(numpy is None, "numpy is not available")
+class TestVersionArray(unittest.TestCase):
+    def setUp(self):
+        self.versions = [
+                V("0.9.0"), V("1.0.0-alpha"), V("1.0.0-alpha.1"),
+                V("1.0.0-rc.1"), V("1.0.0-rc.1+build.1"), V("1.0.0"),
+                V("1.0.0+0.3.7"), V("1.2.0"), V("1.10.0"), V("2.0.0"),
+        ]
+        self.bounds = self.versions + [
+                V("0.0.0"), V("1.0.0-beta"), V("1.0.0+build"), V("1.5.0"),
+                V("3.0.0"), MinVersion(), MaxVersion(),
+        ]
+
+    def test_construction(self):
+        array = VersionArray.from_strings(["1.2.0", "0.1.0-alpha"])
+        self.assertEqual(len(array), 2)
+        self.assertEqual(list(array), [V("1.2.0"), V("0.1.0-alpha")])
+        self.assertEqual(list(array.major), [1, 0])
+        self.assertEqual(list(array.minor), [2, 1])
+        self.assertEqual(list(array.patch), [0, 0])
+        self.assertTrue(array.rank[0] > array.rank[1])
+
+        array = VersionArray.from_strings(["1.2", "1"], loose=True)
+        self.assertEqual(list(array), [V("1.2.0"), V("1.0.0")])
+
+    def test_masks(self):
+        array = VersionArray(self.versions)
+        for bound in self.bounds:
+            self.assertEqual(list(array.eq_mask(bound)), [v == bound for v in self.versions])
+            self.assertEqual(list(array.ge_mask(bound)), [v >= bound for v in self.versions])
+            self.assertEqual(list(array.gt_mask(bound)), [v > bound for v in self.versions])
+            self.assertEqual(list(array.le_mask(bound)), [v <= bound for v in self.versions])
+            self.assertEqual(list(array.lt_mask(bound)), [v < bound for v in self.versions])
+
+    def test_range_mask(self):
+        array = VersionArray(self.versions)
+
+        mask = array.range_mask(V("1.0.0-rc.1"), V("1.0.0"))
+        self.assertEqual(array.select(mask),
+                         [V("1.0.0-rc.1"), V("1.0.0-rc.1+build.1"), V("1.0.0")])
+
+        mask = array.range_mask(max_bound=V("1.0.0-alpha"))
+        self.assertEqual(array.select(mask), [V("0.9.0"), V("1.0.0-alpha")])
+
+        self.assertTrue(array.range_mask().all())
@@ -0,0 +1,102 @@
+import unittest
+
+from depsolver.version \
+    import \
+        Version
+from depsolver.version_range \
+    import \
+        VersionRange
+
+V = Version.from_string
+
+def C(operator, version_string):
+    return VersionRange.from_constraint(operator, V(version_string))
+
+class TestVersionRange(unittest.TestCase):
+    def test_contains(self):
+        r = C(">=", "1.2.0") & C("<", "2.0.0")
+        self.assertFalse(r.contains(V("1.1.0")))
+        self.assertTrue(r.contains(V("1.2.0")))
+        self.assertTrue(r.contains(V("1.9.0")))
+        self.assertFalse(r.contains(V("2.0.0")))
+        self.assertTrue(r.contains(V("2.0.0-rc1")))
+
+        r = C("!=", "1.2.0")
+        self.assertTrue(r.contains(V("1.1.0")))
+        self.assertFalse(r.contains(V("1.2.0")))
+        self.assertTrue(r.contains(V("1.2.0+build")))
+
+        self.assertTrue(VersionRange.any().contains(V("0.0.0")))
+        self.assertFalse(VersionRange.empty().contains(V("0.0.0")))
+
+    def test_contains_many_intervals(self):
+        r = C("!=", "1.0.0") & C("!=", "2.0.0") & C("!=", "3.0.0") & C(">", "0.5.0")
+        self.assertEqual(len(r.intervals), 4)
+        for version_string in ("0.5.0", "1.0.0", "2.0.0", "3.0.0"):
+            self.assertFalse(r.contains(V(version_string)))
+        for version_string in ("0.6.0", "1.5.0", "2.5.0", "4.0.0"):
+            self.assertTrue(r.contains(V(version_string)))
+
+    def test_slices(self):
+        keys = [V(s)._key for s in ("1.0.0", "1.2.0", "1.3.0", "1.4.0", "2.0.0")]
+
+        r = C(">=", "1.2.0") & C("!=", "1.3.0") & C("<", "2.0.0")
+        self.assertEqual(r.slices(keys), [(1, 2), (3, 4)])
+        self.assertEqual(C(">", "1.2.0").slices(keys), [(2, 5)])
+        self.assertEqual(C("==", "1.1.0").slices(keys), [])
+        self.assertEqual(VersionRange.any().slices(keys), [(0, 5)])
+        self.assertEqual(VersionRange.empty().slices(keys), [])
+
+    def test_normalization(self):
+        self.assertEqual(C(">=", "1.0.0") & C(">=", "1.2.0"), C(">=", "1.2.0"))
+        self.assertEqual(C("<", "1.0.0") | C(">=", "1.0.0"), VersionRange.any())
+        self.assertEqual(C("<", "1.0.0") | C(">", "1.0.0"), C("!=", "1.0.0"))
+        self.assertEqual(C("<=", "1.0.0") & C(">=", "1.0.0"), C("==", "1.0.0"))
+        self.assertEqual(hash(C("<=", "1.0.0") & C(">=", "1.0.0")), hash(C("==", "1.0.0")))
+
+        self.assertTrue((C("<", "1.0.0") & C(">=", "1.0.0")).is_empty())
+        self.assertTrue((C("<", "1.0.0") & C(">", "1.0.0")).is_empty())
+        self.assertTrue((C("==", "1.0.0") & C("!=", "1.0.0")).is_empty())
+        self.assertTrue(VersionRange.any().is_any())
+        self.assertFalse(C(">=", "0.0.0").is_any())
+
+    def test_intersects(self):
+        self.assertTrue(C(">=", "1.0.0").intersects(C("<=", "1.0.0")))
+        self.assertFalse(C(">", "1.0.0").intersects(C("<=", "1.0.0")))
+        self.assertTrue(C("!=", "1.0.0").intersects(C("==", "1.1.0")))
+        self.assertFalse(C("!=", "1.0.0").intersects(C("==", "1.0.0")))
+        self.assertFalse(VersionRange.empty().intersects(VersionRange.any()))
+
+    def test_union(self):
+        r = C("<", "1.0.0") | C(">", "2.0.0")
+        self.assertEqual(len(r.intervals), 2)
+        self.assertTrue(r.contains(V("0.1.0")))
+        self.assertFalse(r.contains(V("1.5.0")))
+        self.assertTrue(r.contains(V("2.1.0")))
+
+        self.assertEqual(r | C("==", "1.5.0") | (C(">=", "1.0.0") & C("<=", "2.0.0")),
+                         VersionRange.any())
+
+    def test_as_version(self):
+        self.assertEqual(C("==", "1.0.0").as_version(), V("1.0.0"))
+        self.assertTrue(C(">=", "1.0.0").as_version() is None)
+        self.assertTrue(VersionRange.empty().as_version() is None)
+
+    def test_iter_constraints(self):
+        r = C(">", "1.0.0") & C("<=", "2.0.0") & C("!=", "1.5.0")
+        self.assertEqual(list(r.iter_constraints()),
+                         [(">", V("1.0.0")), ("<=", V("2.0.0")), ("!=", V("1.5.0"))])
+        self.assertEqual(list(C("==", "1.0.0").iter_constraints()), [("==", V("1.0.0"))])
+        self.assertEqual(list(VersionRange.any().iter_constraints()), [])
+
+        r = C("<", "1.0.0") | C(">", "2.0.0")
+        self.assertRaises(ValueError, lambda: list(r.iter_constraints()))
+
+    def test_repr(self):
+        self.assertEqual(repr(C(">=", "1.0.0") & C("!=", "1.2.0")),
+                         "VersionRange('>= 1.0.0, != 1.2.0')")
+        self.assertEqual(repr(VersionRange.any()), "VersionRange.any()")
+        self.assertEqual(repr(VersionRange.empty()), "VersionRange.empty()")
+
+    def test_invalid_operator(self):
+        self.assertRaises(ValueError, lambda: C("~=", "1.0.0"))
@@ -1,18 +1,22 @@
 """Simple module that implements the Semantic Version RFC  (v2.0.0.0-rc1 as
 this time: http://semver.org)."""
+import bisect
 import re
 
+from depsolver.cache \
+    import \
+        LRUCache
 from depsolver.errors \
     import \
         InvalidVersion
 
 PART = r"[0-9a-zA-Z-]+"
 
-_INT_PART_RE = re.compile("\d+")
+_INT_PART_RE = re.compile("\d+$")
 
 _VERSION_RE = re.compile(r"""
         ^
-        (?P<version>\d+.\d+.\d+)                                # minimum 'Major.Minor.Patch' (mandatory)
+        (?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)          # minimum 'Major.Minor.Patch' (mandatory)
         (-(?P<pre_release>[0-9a-zA-Z-]+(\.[0-9a-zA-Z-]+)*))?    # pre-release part (optional)
         (\+(?P<build>[0-9a-zA-Z-]+(\.[0-9a-zA-Z-]+)*))?         # build part (optional)
         $""", re.VERBOSE)
@@ -41,14 +45,34 @@ def is_version_valid(version_string):
 def _is_int_like(int_or_int_string):
     return _INT_PART_RE.match(int_or_int_string) is not None
 
-def _compute_comparable_parts(parts):
-    comparable_parts = []
+def _compute_identifiers_key(parts):
+    # Sort key of a sequence of dot-separated identifiers: numeric identifiers
+    # compare numerically, and always lower than alphanumeric ones (semver
+    # 2.0.0-rc1, 10.). A larger set of identifiers has a higher precedence if
+    # all the preceding ones are equal. Numeric identifiers keep their text
+    # after their value, so that e.g. "01" and "1" are different identifiers
+    # and the key identifies the identifiers exactly.
+    key = []
     for part in parts:
         if _is_int_like(part):
-            comparable_parts.append(int(part))
+            key.append((0, int(part), part))
         else:
-            comparable_parts.append(part)
-    return tuple(part for part in comparable_parts)
+            key.append((1, part))
+    return tuple(key)
+
+# Sort keys of the MinVersion and MaxVersion sentinels: every version key is a
+# tuple starting with a non-negative integer
+_MIN_KEY = (-1,)
+_MAX_KEY = (float("inf"),)
+
+# Keys for the pre-release and build parts of a version key: no pre-release >
+# pre-release, and no build < build
+_NO_PRE_RELEASE_KEY = (1,)
+_NO_BUILD_KEY = (0,)
+
+def _cannot_compare(left, right):
+    return TypeError("cannot compare %s and %s"
+                     % (type(left).__name__, type(right).__name__))
 
 class PreReleaseVersion(object):
     @classmethod
@@ -60,36 +84,44 @@ class PreReleaseVersion(object):
         else:
             raise InvalidVersion("String %r is not a valid pre release version" % (s,))
 
+    __slots__ = ("parts", "_key", "_hash")
+
     def __init__(self, parts):
-        self.parts = parts
-        self._comparable_parts = _compute_comparable_parts(parts)
+        _set = object.__setattr__
+        _set(self, "parts", tuple(parts))
+        _set(self, "_key", _compute_identifiers_key(parts))
+        _set(self, "_hash", hash(self._key))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PreReleaseVersion instances are immutable")
+
+    def __reduce__(self):
+        return (self.__class__, (self.parts,))
 
     def __repr__(self):
         return "PreReleaseVersion(%s)" % (", ".join(repr(part) for part in self.parts))
 
     def __str__(self):
-        return "-%s" % ("-".join(str(part) for part in self.parts))
+        return "-%s" % (".".join(str(part) for part in self.parts))
 
     # Comparison API
-    def _ensure_can_compare(self, other):
-        if other and not isinstance(other, PreReleaseVersion):
-            raise TypeError("cannot compare %s and %s"
-                    % (type(self).__name__, type(other).__name__))
-
     def __eq__(self, other):
-        if other is None:
-            return False
+        if isinstance(other, PreReleaseVersion):
+            return self._key == other._key
         else:
-            self._ensure_can_compare(other)
-            return self.parts == other.parts
+            return False
+
+    def __hash__(self):
+        return self._hash
 
     def __lt__(self, other):
         # No pre-release > pre-release
-        if  other is None:
+        if other is None:
             return True
+        elif isinstance(other, PreReleaseVersion):
+            return self._key < other._key
         else:
-            self._ensure_can_compare(other)
-            return self._comparable_parts < other._comparable_parts
+            raise _cannot_compare(self, other)
 
     def __ne__(self, other):
         return not self == other
@@ -113,35 +145,43 @@ class BuildVersion(object):
         else:
             raise InvalidVersion("String %r is not a valid valid version" % (s,))
 
+    __slots__ = ("parts", "_key", "_hash")
+
     def __init__(self, parts):
-        self.parts = parts
-        self._comparable_parts = _compute_comparable_parts(parts)
+        _set = object.__setattr__
+        _set(self, "parts", tuple(parts))
+        _set(self, "_key", _compute_identifiers_key(parts))
+        _set(self, "_hash", hash(self._key))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("BuildVersion instances are immutable")
+
+    def __reduce__(self):
+        return (self.__class__, (self.parts,))
 
     def __repr__(self):
         return "BuildVersion(%s)" % (", ".join(repr(part) for part in self.parts))
 
     def __str__(self):
-        return "+%s" % ("+".join(str(part) for part in self.parts))
+        return "+%s" % (".".join(str(part) for part in self.parts))
 
     # Comparison API
-    def _ensure_can_compare(self, other):
-        if other and not isinstance(other, BuildVersion):
-            raise TypeError("cannot compare %s and %s"
-                    % (type(self).__name__, type(other).__name__))
-
     def __eq__(self, other):
-        if other is None:
-            return False
+        if isinstance(other, BuildVersion):
+            return self._key == other._key
         else:
-            self._ensure_can_compare(other)
-            return self.parts == other.parts
+            return False
+
+    def __hash__(self):
+        return self._hash
 
     def __lt__(self, other):
         if other is None:
             return False
+        elif isinstance(other, BuildVersion):
+            return self._key < other._key
         else:
-            self._ensure_can_compare(other)
-            return self._comparable_parts < other._comparable_parts
+            raise _cannot_compare(self, other)
 
     def __ne__(self, other):
         return not self == other
@@ -155,6 +195,171 @@ class BuildVersion(object):
     def __gt__(self, other):
         return not self <= other
 
+#: Default maximum number of interned versions, for each of the strict and
+#: loose caches
+DEFAULT_VERSION_CACHE_SIZE = 2 ** 16
+
+_VERSION_CACHE = LRUCache(DEFAULT_VERSION_CACHE_SIZE)
+_LOOSE_VERSION_CACHE = LRUCache(DEFAULT_VERSION_CACHE_SIZE)
+# Version key -> interned version, shared by the strict and loose caches
+_VERSION_KEY_CACHE = LRUCache(DEFAULT_VERSION_CACHE_SIZE)
+
+def version_cache_info(loose=False):
+    """Return the (hits, misses, maxsize, currsize) statistics of the version
+    interning cache used by Version.from_string (or Version.from_loose_string
+    if loose is True)."""
+    if loose:
+        return _LOOSE_VERSION_CACHE.info()
+    else:
+        return _VERSION_CACHE.info()
+
+def set_version_cache_size(maxsize):
+    """Set the maximum number of versions kept by each interning cache."""
+    _VERSION_CACHE.resize(maxsize)
+    _LOOSE_VERSION_CACHE.resize(maxsize)
+    _VERSION_KEY_CACHE.resize(maxsize)
+
+def clear_version_cache():
+    """Empty the version interning caches, and reset their statistics."""
+    _VERSION_CACHE.clear()
+    _LOOSE_VERSION_CACHE.clear()
+    _VERSION_KEY_CACHE.clear()
+
+def _intern(version):
+    # Return the cached version equal to the given one, registering it under
+    # its key if none is cached yet. Keys, unlike strings, identify versions
+    # exactly.
+    key = version._key
+    cached = _VERSION_KEY_CACHE.get(key)
+    if cached is None:
+        _VERSION_KEY_CACHE.put(key, version)
+        return version
+    else:
+        return cached
+
+def _version_from_state(cls, major, minor, patch, pre_release, build):
+    # Unpickling helper: versions are pickled as their components, and go
+    # through the interning cache when unpickled
+    version = cls(major, minor, patch, pre_release, build)
+    if cls is Version:
+        version = _intern(version)
+    return version
+
+def _version_from_match(cls, m):
+    major, minor, patch, pre_release, build = \
+            m.group("major", "minor", "patch", "pre_release", "build")
+    # The version regex already validated the pre-release and build parts
+    if pre_release is not None:
+        pre_release = PreReleaseVersion(pre_release.split("."))
+    if build is not None:
+        build = BuildVersion(build.split("."))
+    return cls(major, minor, patch, pre_release, build)
+
+def _loose_version_from_match(cls, m):
+    version, pre_release, build = m.group("version", "pre_release", "build")
+    ndots = version.count(".")
+    if ndots == 2:
+        major, minor, patch = version.split(".")
+    elif ndots == 1:
+        major, minor = version.split(".")
+        patch = '0'
+    else:
+        major = version
+        minor = '0'
+        patch = '0'
+
+    if pre_release is not None:
+        pre_release = PreReleaseVersion(pre_release.split("."))
+    if build is not None:
+        build = BuildVersion(build.split("."))
+    return cls(major, minor, patch, pre_release, build)
+
+def _parse_version(cls, version_string):
+    m = _VERSION_RE.match(version_string)
+    if m is None:
+        raise InvalidVersion("Version string %r is not valid" % (version_string,))
+    return _version_from_match(cls, m)
+
+def _parse_loose_version(cls, version_string):
+    m = _LOOSE_VERSION_RE.match(version_string)
+    if m is None:
+        raise InvalidVersion("Version string %s is not a valid loose string" % (version_string,))
+    return _loose_version_from_match(cls, m)
+
+# Marker for invalid strings in parse_versions memo
+_INVALID = object()
+
+def parse_versions(version_strings, loose=False, as_array=False):
+    """Parse many version strings in one pass.
+
+    Invalid strings do not raise: they are collected with their position
+    instead. Repeated strings are only parsed once, and the returned versions
+    are shared with the Version.from_string interning cache.
+
+    Parameters
+    ----------
+    version_strings: iterable
+        Iterable of version strings
+    loose: bool
+        If True, parse the strings as loose versions (see
+        Version.from_loose_string)
+    as_array: bool
+        If True, return the parsed versions as a VersionArray (requires
+        numpy)
+
+    Returns
+    -------
+    versions: list or VersionArray
+        The versions parsed from the valid strings, in the input order
+    errors: list
+        List of (position, version_string) for every invalid string
+
+    Examples
+    --------
+    >>> versions, errors = parse_versions(["1.0.0", "1.2", "1.3.0-rc1"])
+    >>> versions
+    [Version(1, 0, 0), Version(1, 3, 0, PreReleaseVersion('rc1'))]
+    >>> errors
+    [(1, '1.2')]
+    """
+    if loose:
+        match = _LOOSE_VERSION_RE.match
+        from_match = _loose_version_from_match
+        cache = _LOOSE_VERSION_CACHE
+    else:
+        match = _VERSION_RE.match
+        from_match = _version_from_match
+        cache = _VERSION_CACHE
+    cache_get = cache.get
+
+    memo = {}
+    versions = []
+    errors = []
+    for i, version_string in enumerate(version_strings):
+        version = memo.get(version_string)
+        if version is None:
+            version = cache_get(version_string)
+            if version is None:
+                m = match(version_string)
+                if m is None:
+                    version = _INVALID
+                else:
+                    try:
+                        version = _intern(from_match(Version, m))
+                    except InvalidVersion:
+                        version = _INVALID
+                    else:
+                        cache.put(version_string, version)
+            memo[version_string] = version
+        if version is _INVALID:
+            errors.append((i, version_string))
+        else:
+            versions.append(version)
+
+    if as_array:
+        versions = VersionArray(versions)
+    return versions, errors
+
 class Version(object):
     """Create a Version instance
 
@@ -177,36 +382,34 @@ class Version(object):
     """
     @classmethod
     def from_loose_string(cls, version_string):
-        m = _LOOSE_VERSION_RE.match(version_string)
-        if m is None:
-            raise InvalidVersion("Version string %s is not a valid loose string" % (version_string,))
-        else:
-            version = m.group("version")
-            ndots = version.count(".")
-            if ndots == 2:
-                major, minor, patch = version.split(".")
-            elif ndots == 1:
-                major, minor = version.split(".")
-                patch = '0'
-            else:
-                major = version
-                minor = '0'
-                patch = '0'
-
-            pre_release = m.group("pre_release")
-            if pre_release is not None:
-                pre_release = PreReleaseVersion.from_string(pre_release)
-
-            build = m.group("build")
-            if build is not None:
-                build = BuildVersion.from_string(build)
-
-            return cls(major, minor, patch, pre_release, build)
+        """Creates a Version instance from a loose string, where minor and
+        patch numbers may be omitted.
+
+        Versions are interned: the same instance is returned for equivalent
+        strings.
+
+        Examples
+        --------
+        >>> Version.from_loose_string("1.2")
+        Version(1, 2, 0)
+        >>> Version.from_loose_string("1.2") is Version.from_string("1.2.0")
+        True
+        """
+        if cls is not Version:
+            return _parse_loose_version(cls, version_string)
+        version = _LOOSE_VERSION_CACHE.get(version_string)
+        if version is None:
+            version = _intern(_parse_loose_version(cls, version_string))
+            _LOOSE_VERSION_CACHE.put(version_string, version)
+        return version
 
     @classmethod
     def from_string(cls, version_string):
         """Creates a Version instance from a string specifiction
 
+        Versions are interned: the same (immutable) instance is returned for
+        equivalent strings.
+
         Arguments
         ---------
         version_string: str
@@ -216,59 +419,76 @@ class Version(object):
         --------
         >>> v = Version.from_string("1.3.1")
         >>> v = Version.from_string("1.3.1-dev2+post1")
+        >>> Version.from_string("1.3.1") is Version.from_string("1.3.1")
+        True
         """
-        if not is_version_valid(version_string):
-            raise InvalidVersion("Version string %r is not valid" % (version_string,))
-        else:
-            m = _VERSION_RE.match(version_string)
-            version = m.group("version")
-            major, minor, patch = version.split(".")
-            pre_release = m.group("pre_release")
-            if pre_release is not None:
-                pre_release = PreReleaseVersion.from_string(pre_release)
-            build = m.group("build")
-            if build is not None:
-                build = BuildVersion.from_string(build)
-
-            return cls(major, minor, patch, pre_release, build)
+        if cls is not Version:
+            return _parse_version(cls, version_string)
+        version = _VERSION_CACHE.get(version_string)
+        if version is None:
+            version = _intern(_parse_version(cls, version_string))
+            _VERSION_CACHE.put(version_string, version)
+        return version
+
+    __slots__ = ("major", "minor", "patch", "pre_release", "build", "_key", "_hash")
 
     def __init__(self, major, minor, patch, pre_release=None, build=None):
+        _set = object.__setattr__
         try:
             #: The major number version
-            self.major = int(major)
+            _set(self, "major", int(major))
         except ValueError:
             raise InvalidVersion("Invalid major version %r" % (major,))
 
         try:
             #: The minor number version
-            self.minor = int(minor)
+            _set(self, "minor", int(minor))
         except ValueError:
             raise InvalidVersion("Invalid minor version %r" % (minor,))
 
         try:
             #: The patch number version
-            self.patch = int(patch)
+            _set(self, "patch", int(patch))
         except ValueError:
             raise InvalidVersion("Invalid patch version %r" % (patch,))
 
         if pre_release and not isinstance(pre_release, PreReleaseVersion):
             raise InvalidVersion("pre_release expected to be a PreReleaseVersion instance: %r" % (pre_release,))
         #: The pre_release number version
-        self.pre_release = pre_release
+        _set(self, "pre_release", pre_release)
 
         if build and not isinstance(build, BuildVersion):
             raise InvalidVersion("build expected to be a BuildVersion instance: %r" % (build,))
-        self.build = build
+        _set(self, "build", build)
 
-        self.parts = [self.major, self.minor, self.patch]
         if self.pre_release:
-            self.parts.append(self.pre_release.parts)
+            pre_release_key = (0,) + self.pre_release._key
+        else:
+            pre_release_key = _NO_PRE_RELEASE_KEY
+        if self.build:
+            build_key = (1,) + self.build._key
+        else:
+            build_key = _NO_BUILD_KEY
+        # Total order sort key: comparing two versions is a single tuple
+        # comparison
+        _set(self, "_key", (self.major, self.minor, self.patch, pre_release_key, build_key))
+        _set(self, "_hash", hash(self._key))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Version instances are immutable")
+
+    @property
+    def parts(self):
+        parts = [self.major, self.minor, self.patch]
+        if self.pre_release:
+            parts.append(self.pre_release.parts)
         if self.build:
-            self.parts.append(self.build.parts)
+            parts.append(self.build.parts)
+        return tuple(parts)
 
-        self._comparable_parts = [self.major, self.minor, self.patch]
-        self._comparable_parts.append(self.pre_release)
-        self._comparable_parts.append(self.build)
+    def __reduce__(self):
+        return (_version_from_state, (self.__class__, self.major, self.minor, self.patch,
+                                      self.pre_release, self.build))
 
     def __repr__(self):
         s = "Version(%s, %s, %s" % (self.major, self.minor, self.patch)
@@ -288,48 +508,60 @@ class Version(object):
         return s
 
     # Comparison API
-    def _ensure_can_compare(self, other):
-        if not isinstance(other, Version):
-            raise TypeError("cannot compare %s and %s"
-                    % (type(self).__name__, type(other).__name__))
+    # Versions are immutable, and their hash is consistent with equality, so
+    # that they can be used as dict keys. Equality with a non-version is
+    # False (ordering comparisons raise a TypeError instead).
+    def __hash__(self):
+        return self._hash
 
     def __eq__(self, other):
-        self._ensure_can_compare(other)
-        return self._comparable_parts == other._comparable_parts
+        if isinstance(other, Version):
+            return self._key == other._key
+        else:
+            return False
 
     def __ne__(self, other):
-        return not self.__eq__(other)
+        if isinstance(other, Version):
+            return self._key != other._key
+        else:
+            return True
 
     def __lt__(self, other):
-        self._ensure_can_compare(other)
-        return self._comparable_parts < other._comparable_parts
+        if not isinstance(other, Version):
+            raise _cannot_compare(self, other)
+        return self._key < other._key
 
     def __le__(self, other):
-        return self < other or self == other
+        if not isinstance(other, Version):
+            raise _cannot_compare(self, other)
+        return self._key <= other._key
 
     def __gt__(self, other):
-        return not (self < other or self == other)
+        if not isinstance(other, Version):
+            raise _cannot_compare(self, other)
+        return self._key > other._key
 
     def __ge__(self, other):
-        return self > other or self == other
+        if not isinstance(other, Version):
+            raise _cannot_compare(self, other)
+        return self._key >= other._key
 
 class MinVersion(Version):
     """Subclass of Version such as MinVersion() < v for any Version instance v
     (unless v is MinVersion()."""
-    def __init__(self):
-        pass
+    __slots__ = ()
 
-    def __eq__(self, other):
-        return other.__class__ == self.__class__
+    _key = _MIN_KEY
+    _hash = hash(_MIN_KEY)
 
-    def __ne__(self, other):
-        return not self.__eq__(other)
+    def __init__(self):
+        pass
 
-    def __lt__(self, other):
-        return True
+    def __reduce__(self):
+        return (self.__class__, ())
 
-    def __gt__(self, other):
-        return False
+    def __repr__(self):
+        return "MinVersion()"
 
     def __str__(self):
         return "MinVersion"
@@ -337,20 +569,153 @@ class MinVersion(Version):
 class MaxVersion(Version):
     """Subclass of Version such as MaxVersion() > v for any Version instance v
     (unless v is MaxVersion()."""
-    def __init__(self):
-        pass
+    __slots__ = ()
 
-    def __eq__(self, other):
-        return other.__class__ == self.__class__
+    _key = _MAX_KEY
+    _hash = hash(_MAX_KEY)
 
-    def __ne__(self, other):
-        return not self.__eq__(other)
+    def __init__(self):
+        pass
 
-    def __lt__(self, other):
-        return False
+    def __reduce__(self):
+        return (self.__class__, ())
 
-    def __gt__(self, other):
-        return True
+    def __repr__(self):
+        return "MaxVersion()"
 
     def __str__(self):
         return "MaxVersion"
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("VersionArray requires numpy")
+    return numpy
+
+class VersionArray(object):
+    """Columnar array of versions, to evaluate version bounds over many
+    versions in one call.
+
+    The major, minor and patch numbers are stored as numpy arrays, together
+    with a rank which orders the pre-release and build parts of every version
+    in the array. Comparing the array to a version returns a boolean mask.
+
+    Parameters
+    ----------
+    versions: seq
+        Sequence of Version instances
+
+    Note
+    ----
+    numpy is required to use this class.
+    """
+    @classmethod
+    def from_strings(cls, version_strings, loose=False):
+        """Creates a VersionArray from a sequence of version strings."""
+        if loose:
+            factory = Version.from_loose_string
+        else:
+            factory = Version.from_string
+        return cls([factory(version_string) for version_string in version_strings])
+
+    def __init__(self, versions):
+        numpy = _import_numpy()
+
+        self._versions = list(versions)
+        n = len(self._versions)
+
+        #: Major numbers, as an int64 array
+        self.major = numpy.fromiter((v.major for v in self._versions), numpy.int64, n)
+        #: Minor numbers, as an int64 array
+        self.minor = numpy.fromiter((v.minor for v in self._versions), numpy.int64, n)
+        #: Patch numbers, as an int64 array
+        self.patch = numpy.fromiter((v.patch for v in self._versions), numpy.int64, n)
+
+        # Distinct (pre-release, build) sort keys, sorted. Versions in the
+        # array get odd ranks, so that a bound whose pre-release/build part is
+        # not in the array can be ranked in between with an even rank.
+        self._tail_keys = sorted(set(v._key[3:] for v in self._versions))
+        tail_key_to_rank = dict((key, 2 * i + 1) for i, key in enumerate(self._tail_keys))
+        #: Pre-release rank, as an int64 array
+        self.rank = numpy.fromiter((tail_key_to_rank[v._key[3:]] for v in self._versions),
+                                   numpy.int64, n)
+
+    def __len__(self):
+        return len(self._versions)
+
+    def __iter__(self):
+        return iter(self._versions)
+
+    def __getitem__(self, index):
+        return self._versions[index]
+
+    def __repr__(self):
+        return "VersionArray([%s])" % ", ".join(str(v) for v in self._versions)
+
+    def select(self, mask):
+        """Return the list of versions for which mask is True."""
+        versions = self._versions
+        return [versions[i] for i in mask.nonzero()[0]]
+
+    def _rank(self, version):
+        tail_key = version._key[3:]
+        i = bisect.bisect_left(self._tail_keys, tail_key)
+        if i < len(self._tail_keys) and self._tail_keys[i] == tail_key:
+            return 2 * i + 1
+        else:
+            return 2 * i
+
+    def _compare(self, version):
+        # Return the (greater, equal) masks of this array compared to the
+        # given version, comparing (major, minor, patch, rank)
+        # lexicographically
+        if not isinstance(version, Version):
+            raise _cannot_compare(self, version)
+        numpy = _import_numpy()
+        if isinstance(version, MinVersion):
+            return numpy.ones(len(self), bool), numpy.zeros(len(self), bool)
+        elif isinstance(version, MaxVersion):
+            return numpy.zeros(len(self), bool), numpy.zeros(len(self), bool)
+
+        greater = self.major > version.major
+        equal = self.major == version.major
+        for column, value in ((self.minor, version.minor),
+                              (self.patch, version.patch),
+                              (self.rank, self._rank(version))):
+            greater |= equal & (column > value)
+            equal &= column == value
+        return greater, equal
+
+    def eq_mask(self, version):
+        """Return the boolean mask of versions equal to the given version."""
+        return self._compare(version)[1]
+
+    def ge_mask(self, version):
+        """Return the boolean mask of versions >= the given version."""
+        greater, equal = self._compare(version)
+        return greater | equal
+
+    def gt_mask(self, version):
+        """Return the boolean mask of versions > the given version."""
+        return self._compare(version)[0]
+
+    def le_mask(self, version):
+        """Return the boolean mask of versions <= the given version."""
+        return ~self._compare(version)[0]
+
+    def lt_mask(self, version):
+        """Return the boolean mask of versions < the given version."""
+        greater, equal = self._compare(version)
+        return ~(greater | equal)
+
+    def range_mask(self, min_bound=None, max_bound=None):
+        """Return the boolean mask of versions v such as min_bound <= v <=
+        max_bound. A bound set to None is ignored."""
+        numpy = _import_numpy()
+        mask = numpy.ones(len(self), bool)
+        if min_bound is not None:
+            mask &= self.ge_mask(min_bound)
+        if max_bound is not None:
+            mask &= self.le_mask(max_bound)
+        return mask
@@ -0,0 +1,294 @@
+"""Sets of versions, represented as normalized unions of disjoint intervals."""
+import bisect
+
+from depsolver.version \
+    import \
+        MaxVersion, MinVersion, _import_numpy
+
+_MIN_VERSION = MinVersion()
+_MAX_VERSION = MaxVersion()
+
+# An interval is a (lower, lower_closed, upper, upper_closed) tuple of
+# versions. Unbounded intervals use MinVersion()/MaxVersion() as closed
+# bounds.
+
+def _lower_order(interval):
+    # Sort key of lower bounds: for a same version, a closed bound starts
+    # before an open one
+    return (interval[0]._key, not interval[1])
+
+def _upper_order(interval):
+    # Sort key of upper bounds: for a same version, an open bound ends before
+    # a closed one
+    return (interval[2]._key, interval[3])
+
+def _is_empty_interval(interval):
+    lower, lower_closed, upper, upper_closed = interval
+    if lower._key < upper._key:
+        return False
+    elif lower._key == upper._key:
+        return not (lower_closed and upper_closed)
+    else:
+        return True
+
+def _normalize(intervals):
+    # Sort intervals, drop empty ones and merge the ones that overlap or touch
+    intervals = sorted((interval for interval in intervals
+                        if not _is_empty_interval(interval)), key=_lower_order)
+    merged = []
+    for interval in intervals:
+        if len(merged) > 0:
+            last = merged[-1]
+            last_upper_key = last[2]._key
+            lower_key = interval[0]._key
+            if lower_key < last_upper_key \
+                    or (lower_key == last_upper_key and (last[3] or interval[1])):
+                if _upper_order(interval) > _upper_order(last):
+                    merged[-1] = (last[0], last[1], interval[2], interval[3])
+                continue
+        merged.append(interval)
+    return tuple(merged)
+
+def _intersect(left, right):
+    # Intersection of two normalized interval sequences, in O(len(left) +
+    # len(right))
+    ret = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        a, b = left[i], right[j]
+        lower = a if _lower_order(a) >= _lower_order(b) else b
+        if _upper_order(a) <= _upper_order(b):
+            upper = a
+            i += 1
+        else:
+            upper = b
+            j += 1
+        interval = (lower[0], lower[1], upper[2], upper[3])
+        if not _is_empty_interval(interval):
+            ret.append(interval)
+    return tuple(ret)
+
+class VersionRange(object):
+    """A set of versions, stored as a union of disjoint, sorted intervals.
+
+    VersionRange instances are immutable. They are usually built from
+    constraints with from_constraint, and combined through intersection (&)
+    and union (|).
+
+    Parameters
+    ----------
+    intervals: seq
+        Sequence of (lower, lower_closed, upper, upper_closed) tuples, where
+        lower and upper are Version instances (use MinVersion()/MaxVersion()
+        for unbounded intervals). The intervals do not need to be sorted nor
+        disjoint.
+
+    Examples
+    --------
+    >>> from depsolver.version import Version
+    >>> V = Version.from_string
+    >>> r = VersionRange.from_constraint(">=", V("1.2.0")) \\
+    ...     & VersionRange.from_constraint("!=", V("1.3.0"))
+    >>> r
+    VersionRange('>= 1.2.0, != 1.3.0')
+    >>> r.contains(V("1.3.0")), r.contains(V("1.4.0"))
+    (False, True)
+    """
+    @classmethod
+    def any(cls):
+        """Range containing every version."""
+        return cls([(_MIN_VERSION, True, _MAX_VERSION, True)])
+
+    @classmethod
+    def empty(cls):
+        """Range containing no version."""
+        return cls([])
+
+    @classmethod
+    def from_constraint(cls, operator, version):
+        """Range of the versions v such as 'v operator version' is True.
+
+        Parameters
+        ----------
+        operator: str
+            One of '==', '!=', '>=', '>', '<=', '<'
+        version: Version
+            The version to compare to
+        """
+        if operator == "==":
+            intervals = [(version, True, version, True)]
+        elif operator == "!=":
+            intervals = [(_MIN_VERSION, True, version, False),
+                         (version, False, _MAX_VERSION, True)]
+        elif operator == ">=":
+            intervals = [(version, True, _MAX_VERSION, True)]
+        elif operator == ">":
+            intervals = [(version, False, _MAX_VERSION, True)]
+        elif operator == "<=":
+            intervals = [(_MIN_VERSION, True, version, True)]
+        elif operator == "<":
+            intervals = [(_MIN_VERSION, True, version, False)]
+        else:
+            raise ValueError("Unsupported operator %r" % (operator,))
+        return cls(intervals)
+
+    def __init__(self, intervals):
+        intervals = _normalize(intervals)
+        self._intervals = intervals
+        self._lower_keys = [interval[0]._key for interval in intervals]
+        self._key = tuple((lower._key, lower_closed, upper._key, upper_closed)
+                          for lower, lower_closed, upper, upper_closed in intervals)
+
+    @property
+    def intervals(self):
+        """The (lower, lower_closed, upper, upper_closed) disjoint intervals of
+        this range, sorted."""
+        return self._intervals
+
+    def is_empty(self):
+        return len(self._intervals) == 0
+
+    def is_any(self):
+        return self._key == _ANY_KEY
+
+    def as_version(self):
+        """Return the version v if this range is exactly {v}, None
+        otherwise."""
+        if len(self._intervals) == 1:
+            lower, lower_closed, upper, upper_closed = self._intervals[0]
+            if lower._key == upper._key:
+                return lower
+        return None
+
+    def contains(self, version):
+        """Return True if the given version is in this range."""
+        key = version._key
+        intervals = self._intervals
+        if len(intervals) == 1:
+            lower, lower_closed, upper, upper_closed = intervals[0]
+        else:
+            i = bisect.bisect_right(self._lower_keys, key) - 1
+            if i < 0:
+                return False
+            lower, lower_closed, upper, upper_closed = intervals[i]
+        if lower_closed:
+            if key < lower._key:
+                return False
+        elif key <= lower._key:
+            return False
+        if upper_closed:
+            return key <= upper._key
+        else:
+            return key < upper._key
+
+    def slices(self, sorted_keys):
+        """Return the (start, stop) slices of the given sorted list of version
+        keys that are in this range, one per interval (empty slices are
+        skipped).
+
+        Each interval bound is located by binary search, so this costs
+        O(len(self.intervals) * log(len(sorted_keys))).
+        """
+        ret = []
+        for lower, lower_closed, upper, upper_closed in self._intervals:
+            if lower_closed:
+                start = bisect.bisect_left(sorted_keys, lower._key)
+            else:
+                start = bisect.bisect_right(sorted_keys, lower._key)
+            if upper_closed:
+                stop = bisect.bisect_right(sorted_keys, upper._key, start)
+            else:
+                stop = bisect.bisect_left(sorted_keys, upper._key, start)
+            if start < stop:
+                ret.append((start, stop))
+        return ret
+
+    def mask(self, version_array):
+        """Return the boolean mask of the versions of the given VersionArray
+        which are in this range."""
+        mask = None
+        for lower, lower_closed, upper, upper_closed in self._intervals:
+            if lower_closed:
+                interval_mask = version_array.ge_mask(lower)
+            else:
+                interval_mask = version_array.gt_mask(lower)
+            if upper_closed:
+                interval_mask &= version_array.le_mask(upper)
+            else:
+                interval_mask &= version_array.lt_mask(upper)
+            if mask is None:
+                mask = interval_mask
+            else:
+                mask |= interval_mask
+        if mask is None:
+            mask = _import_numpy().zeros(len(version_array), dtype=bool)
+        return mask
+
+    def intersects(self, other):
+        """Return True if this range and the other one share at least one
+        version."""
+        return len(_intersect(self._intervals, other._intervals)) > 0
+
+    def intersection(self, other):
+        return VersionRange(_intersect(self._intervals, other._intervals))
+
+    def union(self, other):
+        return VersionRange(self._intervals + other._intervals)
+
+    def __and__(self, other):
+        return self.intersection(other)
+
+    def __or__(self, other):
+        return self.union(other)
+
+    def __eq__(self, other):
+        return isinstance(other, VersionRange) and self._key == other._key
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def iter_constraints(self):
+        """Yield (operator, version) constraints whose conjunction is this
+        range.
+
+        Raises a ValueError if the range cannot be expressed as a conjunction
+        of constraints, i.e. if two of its intervals are separated by more than
+        one version.
+        """
+        intervals = self._intervals
+        if len(intervals) == 0:
+            raise ValueError("Empty range cannot be expressed as constraints")
+
+        version = self.as_version()
+        if version is not None:
+            yield "==", version
+            return
+
+        lower, lower_closed = intervals[0][:2]
+        if not isinstance(lower, MinVersion):
+            yield (">=" if lower_closed else ">"), lower
+        upper, upper_closed = intervals[-1][2:]
+        if not isinstance(upper, MaxVersion):
+            yield ("<=" if upper_closed else "<"), upper
+
+        for left, right in zip(intervals[:-1], intervals[1:]):
+            if left[2]._key != right[0]._key:
+                raise ValueError("Range cannot be expressed as constraints")
+            yield "!=", left[2]
+
+    def __repr__(self):
+        if self.is_empty():
+            return "VersionRange.empty()"
+        elif self.is_any():
+            return "VersionRange.any()"
+        try:
+            constraints = list(self.iter_constraints())
+        except ValueError:
+            return "VersionRange(%r)" % (self._intervals,)
+        return "VersionRange(%r)" % ", ".join("%s %s" % (operator, version)
+                                              for operator, version in constraints)
+
+_ANY_KEY = VersionRange.any()._key